@@ -1,10 +1,28 @@
-from typing import List
+import asyncio
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional
 
-from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import Response
+from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
 
-from services.library_service import LibraryService
+from config import Settings
+from models.book_model import Book
+from services.catalog_indexes import parse_title_cursor, title_cursor
+from services.change_log import ResyncRequired
+from services.ingest import Ingestor, Job, JobStatus, JobStore
+from services.library_service import AddResult, LibraryService
+from services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from services.metrics import Metrics
+from services.profiling import (SORT_KEYS, Profiler, ProfilerBusy, format_memory, format_stats, profiled,
+                                tracing)
 
 
 class IsbnIn(BaseModel):
@@ -17,35 +35,356 @@ class BookOut(BaseModel):
     isbn: str
 
 
-app = FastAPI(title="Library API", version="3.0.0")
-app.state.library = LibraryService()
+class BatchIn(BaseModel):
+    isbns: List[str]
+
+
+class BatchItemOut(BaseModel):
+    isbn: str
+    status: AddResult
+    book: Optional[BookOut] = None
+
+
+class BatchOut(BaseModel):
+    results: List[BatchItemOut]
+
+
+class ChangeOut(BaseModel):
+    seq: int
+    op: str
+    isbn: str
+    book: Optional[BookOut] = None
+
+
+class ChangesOut(BaseModel):
+    epoch: str
+    changes: List[ChangeOut]
+    next: int
+    latest: int
+
+
+class JobOut(BaseModel):
+    id: str
+    isbn: str
+    status: JobStatus
+    result: Optional[AddResult] = None
+    book: Optional[BookOut] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Loads the catalog on start-up instead of at import time.
+
+    A library already placed on ``app.state`` (tests, benchmarks, embedding
+    applications) is used as is and not closed on shutdown. An owned
+    library builds its indexes in a background thread right away, so the
+    first search does not pay for it. With ``LIBRARY_INGEST=1`` the
+    ingestion workers are started here as well.
+    """
+    settings: Settings = app.state.settings
+    owned = getattr(app.state, "library", None) is None
+    if owned:
+        app.state.library = await run_in_threadpool(LibraryService.from_settings, settings,
+                                                    app.state.metrics)
+        if settings.index_on_start:
+            app.state.library.build_indexes_in_background()
+    owns_ingest = settings.ingest and getattr(app.state, "ingest", None) is None
+    if owns_ingest:
+        app.state.ingest = Ingestor(app.state.library, JobStore(settings.ingest_path),
+                                    workers=settings.ingest_workers, batch_size=settings.batch_size).start()
+    try:
+        yield
+    finally:
+        if owns_ingest:
+            await run_in_threadpool(app.state.ingest.stop)
+            app.state.ingest.store.close()
+            app.state.ingest = None
+        if owned:
+            await app.state.library.aclose()
+            app.state.library = None
+
+
+class MetricsMiddleware:
+    """Times every HTTP request into ``app.state.metrics``, labeled by the
+    matched route template; a plain pass-through while metrics are disabled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        metrics: Metrics = scope["app"].state.metrics if scope["type"] == "http" else None
+        if metrics is None or not metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            metrics.observe_request(scope["method"], route.path if route else "unmatched",
+                                    status_code, time.perf_counter() - start)
+
+
+class ProfilingMiddleware:
+    """Traces every HTTP request into ``app.state.profiler`` (slow traces are
+    kept) and CPU-profiles requests sent with ``X-Profile: cpu`` and a valid
+    ``X-Admin-Token``, answering with ``X-Profile-Id``; a plain pass-through
+    while profiling is disabled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        profiler: Profiler = scope["app"].state.profiler if scope["type"] == "http" else None
+        if profiler is None or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        cpu = headers.get("x-profile") == "cpu" and profiler.is_admin(headers.get("x-admin-token"))
+        trace = profiler.start_trace(scope["method"], scope["path"], cpu=cpu)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                if trace.requested:
+                    MutableHeaders(scope=message).append("X-Profile-Id", trace.id)
+            await send(message)
+
+        with tracing(trace):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.finish(trace)
+
+
+class ProfiledRoute(APIRoute):
+    """Runs sync endpoints under the request's CPU profile; they execute in
+    the threadpool, where the middleware's profiler would not see them.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+app = FastAPI(title="Library API", version="3.0.0", lifespan=lifespan)
+app.router.route_class = ProfiledRoute
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.state.settings = Settings.from_env()
+app.state.metrics = Metrics(enabled=app.state.settings.metrics)
+app.state.profiler = Profiler(enabled=app.state.settings.profiling, admin_token=app.state.settings.admin_token,
+                              slow_threshold=app.state.settings.slow_request)
+app.state.library = None
+app.state.ingest = None
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 @app.get("/books", response_model=List[BookOut])
-def get_books(request: Request) -> List[BookOut]:
+def get_books(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="Bu ISBN'den sonraki kitaplar (cursor)"),
+    output: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$"),
+    sort: str = Query("isbn", pattern="^(isbn|title)$"),
+):
+    """Without parameters returns the whole catalog as before.
+
+    With ``limit``/``offset``/``after`` returns one page in ISBN order; the
+    cursor for the next page is sent in ``X-Next-After``. ``sort=title``
+    pages in title order instead (always paginated; its cursor is opaque).
+    ``format=ndjson`` (or ``Accept: application/x-ndjson``) streams every
+    book as one JSON line without building the full response in memory.
+    """
     library: LibraryService = request.app.state.library
-    books = library.list_books()
+    if output == "ndjson" or (output is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")):
+        headers = _change_headers(library)
+        return StreamingResponse(_stream_ndjson(library), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    if sort == "title":
+        return _title_page(response, library, after, offset, limit or DEFAULT_PAGE_SIZE)
+
+    if limit is None and offset == 0 and after is None:
+        snapshot = _catalog_snapshot(request, library)
+        headers = {"ETag": snapshot.etag, **snapshot.change_headers}
+        if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+    page_size = limit or DEFAULT_PAGE_SIZE
+    books = library.page_books(after=after, offset=offset, limit=page_size)
+    response.headers["X-Total-Count"] = str(library.count_books())
+    if len(books) == page_size:
+        response.headers["X-Next-After"] = books[-1].isbn
     return [BookOut(title=b.title, author=b.author, isbn=b.isbn) for b in books]
 
 
-@app.post("/books", response_model=BookOut, status_code=status.HTTP_201_CREATED)
-def create_book(payload: IsbnIn, request: Request) -> BookOut:
+@app.get("/authors/{name}/books", response_model=List[BookOut])
+def get_author_books(
+    name: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="Önceki sayfanın X-Next-After değeri"),
+) -> List[BookOut]:
+    """Books by one author (case-insensitive) in title order, paginated."""
+    library: LibraryService = request.app.state.library
+    total = library.count_books_by_author(name)
+    if total == 0:
+        raise HTTPException(status_code=404, detail="Yazar bulunamadı")
+
+    books = library.books_by_author(name, after=_parse_cursor(after), offset=offset, limit=limit)
+    _set_page_headers(response, total, books, limit)
+    return [BookOut(title=b.title, author=b.author, isbn=b.isbn) for b in books]
+
+
+def _title_page(response: Response, library: LibraryService, after: Optional[str],
+                offset: int, limit: int) -> List[BookOut]:
+    books = library.page_books_by_title(after=_parse_cursor(after), offset=offset, limit=limit)
+    _set_page_headers(response, library.count_books(), books, limit)
+    return [BookOut(title=b.title, author=b.author, isbn=b.isbn) for b in books]
+
+
+def _parse_cursor(after: Optional[str]):
+    if after is None:
+        return None
+    try:
+        return parse_title_cursor(after)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+
+def _set_page_headers(response: Response, total: int, books, limit: int) -> None:
+    response.headers["X-Total-Count"] = str(total)
+    if len(books) == limit:
+        response.headers["X-Next-After"] = title_cursor(books[-1])
+
+
+# Sürüm sayaçları süreç başına sıfırdan başlar; ETag'ler yeniden başlatmada çakışmasın
+_BOOT_ID = uuid.uuid4().hex[:12]
+
+
+class CatalogSnapshot(NamedTuple):
+    library: LibraryService
+    version: int
+    etag: str
+    body: bytes
+    change_headers: dict
+
+
+def _catalog_snapshot(request: Request, library: LibraryService) -> CatalogSnapshot:
+    """Returns the serialized catalog for the current version, encoding it
+    only when the catalog has changed since the last call.
+    """
+    cached: Optional[CatalogSnapshot] = getattr(request.app.state, "catalog_snapshot", None)
+    version = library.version
+    if cached is not None and cached.library is library and cached.version == version:
+        return cached
+
+    # Değişiklik konumu kopyadan önce okunur; arada gelen değişiklikler /changes ile tekrar uygulanır
+    change_headers = _change_headers(library)
+    books = library.list_books()
+    body = json.dumps([b.to_dict() for b in books], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    snapshot = CatalogSnapshot(library, version, f'"{_BOOT_ID}-{version}"', body, change_headers)
+    # Kopyalama sırasında katalog değiştiyse bu gövde bir sonraki sürüme ait olabilir
+    if library.version == version:
+        request.app.state.catalog_snapshot = snapshot
+    return snapshot
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _stream_ndjson(library: LibraryService, lines_per_chunk: int = 500) -> Iterator[bytes]:
+    lines = []
+    for book in library.iter_books():
+        lines.append(json.dumps(book.to_dict(), ensure_ascii=False))
+        if len(lines) == lines_per_chunk:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+MAX_SEARCH_RESULTS = 100
+
+
+@app.get("/books/search", response_model=List[BookOut])
+def search_books(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Başlık veya yazar kelimelerinin başı"),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+) -> List[BookOut]:
+    """Prefix search over title and author words; every term must match."""
     library: LibraryService = request.app.state.library
+    return [BookOut(title=b.title, author=b.author, isbn=b.isbn) for b in library.search_books(q, limit=limit)]
+
+
+@app.post("/books", response_model=BookOut, status_code=status.HTTP_201_CREATED,
+          responses={status.HTTP_202_ACCEPTED: {"model": JobOut}})
+async def create_book(payload: IsbnIn, request: Request):
+    """Adds a book by ISBN. In ingestion mode the ISBN is queued instead and
+    the job is returned with 202 and ``Location: /jobs/{id}``.
+    """
+    library: LibraryService = request.app.state.library
+    ingest: Optional[Ingestor] = request.app.state.ingest
+    settings: Settings = request.app.state.settings
     isbn = payload.isbn.strip()
 
     if not isbn:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ISBN boş olamaz")
 
-    # Duplicate kontrolü
-    existing = library.find_book(isbn)
+    # Duplicate kontrolü; find_book paylaşılan depolamada kilit alıp journal okuyabilir
+    existing = await run_in_threadpool(library.find_book, isbn)
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Bu ISBN ile kitap zaten mevcut")
 
-    added = library.add_book(isbn)
-    if not added:
+    if ingest is not None:
+        if not Book._validate_isbn(isbn):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Geçersiz ISBN")
+        job = await run_in_threadpool(ingest.submit, isbn)
+        job_out = await run_in_threadpool(_job_out, library, job)
+        return JSONResponse(jsonable_encoder(job_out),
+                            status_code=status.HTTP_202_ACCEPTED, headers={"Location": f"/jobs/{job.id}"})
+
+    if settings.async_fetch:
+        result = await library.add_book_result_async(isbn)
+    else:
+        result = await run_in_threadpool(library.add_book_result, isbn)
+    if result is AddResult.DUPLICATE:
+        # Aynı ISBN için eşzamanlı başka bir istek önce eklemiş
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Bu ISBN ile kitap zaten mevcut")
+    if result is AddResult.UPSTREAM_ERROR:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Open Library'ye şu anda ulaşılamıyor, lütfen daha sonra tekrar deneyin")
+    if result is not AddResult.CREATED:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kitap bulunamadı veya eklenemedi")
 
-    created = library.find_book(isbn)
+    created = await run_in_threadpool(library.find_book, isbn)
     if not created:
         # Beklenmeyen durum
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Kitap ekleme başarısız")
@@ -53,6 +392,194 @@ def create_book(payload: IsbnIn, request: Request) -> BookOut:
     return BookOut(title=created.title, author=created.author, isbn=created.isbn)
 
 
+@app.post("/books/batch", response_model=BatchOut)
+async def create_books_batch(payload: BatchIn, request: Request) -> BatchOut:
+    library: LibraryService = request.app.state.library
+    settings: Settings = request.app.state.settings
+    isbns = [isbn.strip() for isbn in payload.isbns]
+
+    outcomes = await library.add_books_by_isbn_async(isbns, concurrency=settings.batch_concurrency)
+    created = await run_in_threadpool(_find_books, library,
+                                      [isbn for isbn, outcome in outcomes.items() if outcome is AddResult.CREATED])
+
+    results = []
+    seen = set()
+    for isbn in isbns:
+        outcome = outcomes[isbn]
+        if isbn in seen and outcome is not AddResult.INVALID:
+            outcome = AddResult.DUPLICATE
+        seen.add(isbn)
+        book = created.get(isbn) if outcome is AddResult.CREATED else None
+        results.append(BatchItemOut(
+            isbn=isbn,
+            status=outcome,
+            book=BookOut(title=book.title, author=book.author, isbn=book.isbn) if book else None,
+        ))
+    return BatchOut(results=results)
+
+
+def _find_books(library: LibraryService, isbns: List[str]) -> Dict[str, Book]:
+    books = {}
+    for isbn in isbns:
+        book = library.find_book(isbn)
+        if book is not None:
+            books[isbn] = book
+    return books
+
+
+MAX_CHANGES = 10_000
+MAX_CHANGES_WAIT = 60.0
+
+
+@app.get("/changes", response_model=ChangesOut,
+         responses={status.HTTP_410_GONE: {"description": "Tam senkronizasyon gerekli"}})
+async def get_changes(
+    request: Request,
+    since: int = Query(..., ge=0, description="Son uygulanan sıra numarası (X-Change-Seq veya next)"),
+    epoch: Optional[str] = Query(None, description="X-Change-Epoch / önceki yanıtın epoch değeri"),
+    limit: int = Query(1000, ge=1, le=MAX_CHANGES),
+    wait: float = Query(0, ge=0, le=MAX_CHANGES_WAIT, description="Değişiklik yoksa beklenecek süre (sn)"),
+) -> ChangesOut:
+    """Adds and removes after ``since``, oldest first.
+
+    With ``wait`` the request is held until a change arrives (long poll).
+    410 means the position is outside the retained log (or from another
+    epoch): reload ``GET /books``, whose ``X-Change-Epoch``/``X-Change-Seq``
+    headers give the position to continue from. Changes are keyed by ISBN,
+    so replaying one that is already applied is harmless.
+    """
+    library = request.app.state.library
+    # Diğer süreçlerin yazdıkları da bu sürecin değişiklik geçmişine girer
+    await library.sync_async()
+    log = library.changes
+    try:
+        if wait:
+            await log.wait(since, wait, epoch)
+        batch = log.since(since, limit, epoch)
+    except ResyncRequired as exc:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=f"Tam senkronizasyon gerekli: {exc}") from None
+    return ChangesOut(
+        epoch=batch.epoch,
+        changes=[ChangeOut(seq=change.seq, op=change.op, isbn=change.isbn,
+                           book=BookOut(title=change.book.title, author=change.book.author,
+                                        isbn=change.book.isbn) if change.book else None)
+                 for change in batch.changes],
+        next=batch.changes[-1].seq if batch.changes else since,
+        latest=batch.latest,
+    )
+
+
+def _change_headers(library: LibraryService) -> dict:
+    epoch, seq = library.changes.position()
+    return {"X-Change-Epoch": epoch, "X-Change-Seq": str(seq)}
+
+
+@app.get("/jobs/{job_id}", response_model=JobOut)
+def get_job(job_id: str, request: Request) -> JobOut:
+    ingest: Optional[Ingestor] = request.app.state.ingest
+    job = ingest.store.get(job_id) if ingest is not None else None
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="İş bulunamadı")
+    return _job_out(request.app.state.library, job)
+
+
+def _job_out(library: LibraryService, job: Job) -> JobOut:
+    book = library.find_book(job.isbn) if job.result is AddResult.CREATED else None
+    return JobOut(id=job.id, isbn=job.isbn, status=job.status, result=job.result,
+                  book=BookOut(title=book.title, author=book.author, isbn=book.isbn) if book else None)
+
+
+@app.get("/cache/stats")
+def get_cache_stats(request: Request) -> dict:
+    library: LibraryService = request.app.state.library
+    cache = library.open_library.cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/metrics")
+def get_metrics(request: Request) -> Response:
+    """Prometheus text exposition of the service metrics (LIBRARY_METRICS=1)."""
+    metrics: Metrics = request.app.state.metrics
+    if not metrics.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrikler kapalı")
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+MAX_PROFILE_SECONDS = 300.0
+
+
+def _admin_profiler(request: Request) -> Profiler:
+    """The profiler, if profiling is on and the caller sent the admin token."""
+    profiler: Profiler = request.app.state.profiler
+    if not profiler.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profil araçları kapalı")
+    if not profiler.is_admin(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Geçersiz yönetici anahtarı")
+    return profiler
+
+
+@app.post("/admin/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    request: Request,
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    sort: str = Query("cumulative", pattern=f"^({'|'.join(SORT_KEYS)})$"),
+    limit: int = Query(40, ge=1, le=500),
+) -> str:
+    """CPU-profiles every request that starts in the next ``seconds`` and
+    returns the merged cProfile table.
+    """
+    profiler = _admin_profiler(request)
+    try:
+        window = await profiler.profile_cpu(seconds)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from None
+    return f"Profillenen istek: {window.requests}\n" + format_stats(window.stats, sort, limit)
+
+
+@app.post("/admin/profile/memory", response_class=PlainTextResponse)
+async def profile_memory(
+    request: Request,
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    limit: int = Query(25, ge=1, le=500),
+    frames: int = Query(1, ge=1, le=50),
+) -> str:
+    """Allocation growth by source line over the next ``seconds``
+    (tracemalloc runs only during the window).
+    """
+    profiler = _admin_profiler(request)
+    try:
+        diff = await profiler.trace_memory(seconds, limit=limit, frames=frames)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from None
+    return format_memory(diff)
+
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(
+    profile_id: str,
+    request: Request,
+    sort: str = Query("cumulative", pattern=f"^({'|'.join(SORT_KEYS)})$"),
+    limit: int = Query(40, ge=1, le=500),
+) -> str:
+    """cProfile table of a request sent with ``X-Profile: cpu``."""
+    stats = _admin_profiler(request).profile(profile_id)
+    if stats is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profil bulunamadı")
+    return format_stats(stats, sort, limit)
+
+
+@app.get("/admin/traces")
+def get_traces(request: Request) -> dict:
+    """Traces of the last requests slower than LIBRARY_SLOW_REQUEST, newest
+    first, with the LibraryService phases they spent their time in.
+    """
+    profiler = _admin_profiler(request)
+    return {"threshold": profiler.slow_threshold,
+            "traces": [trace.to_dict() for trace in profiler.slow_traces()]}
+
+
 @app.delete("/books/{isbn}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_book(isbn: str, request: Request) -> Response:
     library: LibraryService = request.app.state.library
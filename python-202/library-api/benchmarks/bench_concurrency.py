@@ -0,0 +1,107 @@
+"""Read throughput while writers add books, with and without the RW lock.
+
+"exclusive" gives readers and writers one shared mutex (a coarse lock);
+"rwlock" is LibraryService's ReadWriteLock, where snapshot writes only
+hold the read side. Writers use a fake Open Library client with a fixed
+latency and the JSON backend, which rewrites the whole file per add.
+
+Usage (from library-api/):
+    python -m benchmarks.bench_concurrency --size 20000 --readers 8 --writers 4
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_find_book import make_books
+from services.library_service import LibraryService
+from services.rw_lock import ReadWriteLock
+
+
+class ExclusiveLock:
+    """ReadWriteLock stand-in where reads are exclusive too."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def read(self):
+        with self._lock:
+            yield
+
+    write = read
+
+
+class FakeOpenLibrary:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def fetch_book(self, isbn):
+        time.sleep(self.latency)
+        return f"Yeni {isbn}", "Yazar"
+
+    def close(self):
+        pass
+
+
+def run(mode: str, size: int, readers: int, writers: int, adds: int, latency: float) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        service = LibraryService(os.path.join(directory, "library.json"), open_library=FakeOpenLibrary(latency))
+        for book in make_books(size):
+            service.books.append(book)
+        service._lock = ExclusiveLock() if mode == "exclusive" else ReadWriteLock()
+
+        stop = threading.Event()
+        reads = [0] * readers
+        latencies = []
+
+        def read_loop(slot: int):
+            while not stop.is_set():
+                start = time.perf_counter()
+                service.page_books(offset=size // 2, limit=100)
+                latencies.append(time.perf_counter() - start)
+                reads[slot] += 1
+                time.sleep(0.001)
+
+        threads = [threading.Thread(target=read_loop, args=(i,)) for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            list(pool.map(service.add_book_result, (f"979{i:010d}" for i in range(adds))))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        return {
+            "mode": mode,
+            "reads_per_s": sum(reads) / elapsed,
+            "read_p99_ms": latencies[int(len(latencies) * 0.99)] * 1e3,
+            "writes_per_s": adds / elapsed,
+            "books": service.count_books(),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--adds", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f"{'mod':>10} {'okuma/sn':>10} {'okuma p99 (ms)':>15} {'yazma/sn':>10}")
+    for mode in ("exclusive", "rwlock"):
+        r = run(mode, args.size, args.readers, args.writers, args.adds, args.latency)
+        assert r["books"] == args.size + args.adds
+        print(f"{r['mode']:>10} {r['reads_per_s']:>10.0f} {r['read_p99_ms']:>15.1f} {r['writes_per_s']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
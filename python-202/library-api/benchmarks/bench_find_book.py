@@ -0,0 +1,58 @@
+"""Compares ISBN lookups on a plain list scan against the BookCatalog index.
+
+Usage (from library-api/):
+    python -m benchmarks.bench_find_book --sizes 1000 100000
+"""
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from models.book_catalog import BookCatalog
+from models.book_model import Book
+
+
+def make_books(count: int) -> List[Book]:
+    return [Book(f"Kitap {i}", f"Yazar {i % 1000}", f"978{i:010d}") for i in range(count)]
+
+
+def linear_find(books: List[Book], isbn: str) -> Optional[Book]:
+    for book in books:
+        if book.isbn == isbn:
+            return book
+    return None
+
+
+def time_lookups(find, isbns: List[str]) -> float:
+    """Returns the mean lookup time in microseconds."""
+    start = time.perf_counter()
+    for isbn in isbns:
+        find(isbn)
+    return (time.perf_counter() - start) / len(isbns) * 1e6
+
+
+def run(size: int, lookups: int) -> dict:
+    books = make_books(size)
+    catalog = BookCatalog(books)
+    isbns = [books[random.randrange(size)].isbn for _ in range(lookups)]
+    return {
+        "size": size,
+        "list_scan_us": time_lookups(lambda isbn: linear_find(books, isbn), isbns),
+        "catalog_index_us": time_lookups(catalog.get, isbns),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'kitap':>10} {'liste (us)':>14} {'indeks (us)':>14}")
+    for size in args.sizes:
+        result = run(size, args.lookups)
+        print(f"{result['size']:>10} {result['list_scan_us']:>14.2f} {result['catalog_index_us']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Compares GET /books modes: full list, one page, and NDJSON streaming.
+
+"title" pages through the incrementally maintained title index
+(sort=title) instead of sorting the catalog per request.
+
+"full" is served from the per-version serialized snapshot after the first
+call; "full_cold" changes the catalog before every request, and
+"not_modified" revalidates with If-None-Match.
+
+Reports p50/p99 latency for each mode and, for one request, the resident
+set size growth (peak RSS during the request minus RSS before it) and the
+peak Python heap allocated (tracemalloc). RSS includes allocator and
+C-extension memory the heap figure misses. The per-request peak needs
+Linux (``/proc/self/clear_refs``); elsewhere the process-wide peak RSS
+from ``getrusage`` is reported instead.
+
+Usage (from library-api/):
+    python -m benchmarks.bench_get_books --size 100000 --requests 20
+"""
+import argparse
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fastapi.testclient import TestClient
+
+from api import app
+from benchmarks.bench_find_book import make_books
+from services.library_service import LibraryService
+
+MODES = {
+    "full_cold": {},
+    "full": {},
+    "not_modified": {},
+    "page": {"limit": 100, "offset": 5000},
+    "cursor": {"limit": 100, "after": "9780000050000"},
+    "title": {"sort": "title", "limit": 100, "offset": 5000},
+    "ndjson": {"format": "ndjson"},
+}
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _reset_peak_rss() -> bool:
+    """Resets VmHWM to the current RSS; False where that is not supported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def max_rss_mb() -> float:
+    """Peak RSS of the whole process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux kB, macOS bayt döner
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def measure_memory(request) -> dict:
+    """Runs ``request`` once; returns its RSS growth and peak heap in MB."""
+    if _reset_peak_rss():
+        before = _status_kb("VmRSS")
+        request()
+        rss = max(0, _status_kb("VmHWM") - before) / 1e3
+    else:
+        request()
+        rss = max_rss_mb()
+    tracemalloc.start()
+    request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rss_mb": rss, "heap_mb": peak / 1e6}
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run(size: int, requests: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        library = LibraryService(os.path.join(directory, "library.json"))
+        for book in make_books(size):
+            library.books.append(book)
+        app.state.library = library
+        client = TestClient(app)
+
+        results = {"size": size}
+        for mode, params in MODES.items():
+            headers = {}
+            if mode == "not_modified":
+                headers["If-None-Match"] = client.get("/books").headers["ETag"]
+            client.get("/books", params=params)
+            latencies = []
+            for _ in range(requests):
+                if mode == "full_cold":
+                    library.books.append(library.books[0])
+                start = time.perf_counter()
+                resp = client.get("/books", params=params, headers=headers)
+                resp.content
+                latencies.append((time.perf_counter() - start) * 1e3)
+
+            def request():
+                if mode == "full_cold":
+                    library.books.append(library.books[0])
+                client.get("/books", params=params, headers=headers).content
+
+            results[mode] = {
+                "p50_ms": statistics.median(latencies),
+                "p99_ms": percentile(latencies, 0.99),
+                **measure_memory(request),
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    results = run(args.size, args.requests)
+    print(f"{args.size} kitap")
+    print(f"{'mod':>12} {'p50 (ms)':>10} {'p99 (ms)':>10} {'RSS artışı (MB)':>16} {'heap tepe (MB)':>15}")
+    for mode in MODES:
+        r = results[mode]
+        print(f"{mode:>12} {r['p50_ms']:>10.1f} {r['p99_ms']:>10.1f} {r['rss_mb']:>16.1f} {r['heap_mb']:>15.1f}")
+    print(f"Sürecin tepe RSS değeri: {max_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
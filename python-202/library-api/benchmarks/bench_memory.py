@@ -0,0 +1,74 @@
+"""Reports bytes per book and load time for the Book representation.
+
+"legacy" rebuilds the previous Book (per-instance __dict__, no interning,
+validated on every construction); "validated" and "trusted" use the
+slotted Book through create_book_from_dict without and with the trusted
+fast path that storage loaders use. Books are decoded from JSON first so
+author strings are distinct objects, as they are after json.load.
+
+Usage (from library-api/):
+    python -m benchmarks.bench_memory --sizes 100000 1000000
+"""
+import argparse
+import gc
+import json
+import re
+import time
+import tracemalloc
+
+from benchmarks.bench_find_book import make_books
+from models.book_model import create_book_from_dict
+
+
+class LegacyBook:
+    def __init__(self, title: str, author: str, isbn: str):
+        clean_isbn = re.sub(r'[-\s]', '', isbn)
+        if len(clean_isbn) not in [10, 13] or not clean_isbn[:-1].isdigit():
+            raise ValueError("Geçersiz ISBN formatı")
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+
+
+BUILDERS = {
+    "legacy": lambda data: LegacyBook(data["title"], data["author"], data["isbn"]),
+    "validated": lambda data: create_book_from_dict(data),
+    "trusted": lambda data: create_book_from_dict(data, trusted=True),
+}
+
+
+def run(size: int) -> dict:
+    payload = json.dumps([book.to_dict() for book in make_books(size)])
+    results = {"size": size}
+    for name, build in BUILDERS.items():
+        gc.collect()
+        tracemalloc.start()
+        records = json.loads(payload)
+        start = time.perf_counter()
+        books = [build(data) for data in records]
+        elapsed = time.perf_counter() - start
+        # Kaynak kayıtlar silinince yalnız kitapların tuttuğu bellek kalır
+        del records
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {"bytes_per_book": retained / size, "load_s": elapsed}
+        del books
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    args = parser.parse_args()
+
+    print(f"{'kitap':>10} {'temsil':>10} {'bayt/kitap':>12} {'yükleme (s)':>12}")
+    for size in args.sizes:
+        result = run(size)
+        for name in BUILDERS:
+            r = result[name]
+            print(f"{size:>10} {name:>10} {r['bytes_per_book']:>12.0f} {r['load_s']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compares Open Library fetch strategies against the local stub server.
+
+- fresh: a new httpx.Client per ISBN and serial author lookups (old behaviour)
+- pooled: one long-lived OpenLibraryClient
+- async: OpenLibraryClient.fetch_book_async with concurrent author lookups
+- batch: OpenLibraryClient.fetch_books through the multi-bibkey /api/books endpoint
+
+Usage (from library-api/):
+    python -m benchmarks.bench_open_library --books 50 --authors 3 --latency 0.02
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from services.open_library import HEADERS, OpenLibraryClient
+from tests.stub_server import OpenLibraryStub
+
+
+def make_stub(books: int, authors: int, latency: float, error_rate: float = 0.0,
+              prefix: str = "978") -> OpenLibraryStub:
+    author_keys = [f"/authors/OL{i}A" for i in range(authors)]
+    return OpenLibraryStub(
+        books={f"{prefix}{i:010d}": {"title": f"Kitap {i}", "authors": author_keys} for i in range(books)},
+        authors={key: f"Yazar {key}" for key in author_keys},
+        latency=latency,
+        error_rate=error_rate,
+    )
+
+
+def fetch_fresh(base_url: str, isbn: str) -> None:
+    with httpx.Client(timeout=10.0, headers=HEADERS) as client:
+        data = client.get(f"{base_url}/isbn/{isbn}.json").json()
+        for author in data.get("authors", []):
+            client.get(f"{base_url}{author['key']}.json")
+
+
+def run(books: int, authors: int, latency: float) -> dict:
+    with make_stub(books, authors, latency) as stub:
+        isbns = list(stub.books)
+        result = {"books": books, "authors_per_book": authors, "latency_s": latency}
+
+        start = time.perf_counter()
+        for isbn in isbns:
+            fetch_fresh(stub.base_url, isbn)
+        result["fresh_ms"] = (time.perf_counter() - start) / books * 1e3
+
+        client = OpenLibraryClient(base_url=stub.base_url)
+        start = time.perf_counter()
+        for isbn in isbns:
+            client.fetch_book(isbn)
+        result["pooled_ms"] = (time.perf_counter() - start) / books * 1e3
+        client.close()
+
+        async def fetch_all_async() -> None:
+            for isbn in isbns:
+                await client.fetch_book_async(isbn)
+            await client.aclose()
+
+        start = time.perf_counter()
+        asyncio.run(fetch_all_async())
+        result["async_ms"] = (time.perf_counter() - start) / books * 1e3
+
+        stub.requests.clear()
+        client = OpenLibraryClient(base_url=stub.base_url)
+        start = time.perf_counter()
+        client.fetch_books(isbns)
+        result["batch_ms"] = (time.perf_counter() - start) / books * 1e3
+        result["batch_requests"] = len(stub.requests)
+        client.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=50)
+    parser.add_argument("--authors", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    result = run(args.books, args.authors, args.latency)
+    for key in ("fresh_ms", "pooled_ms", "async_ms", "batch_ms"):
+        print(f"{key:>10}: {result[key]:8.2f} ms / kitap")
+    print(f"batch modunda {result['batch_requests']} istek "
+          f"(ISBN başına yolda {args.books * (1 + args.authors)} istek yerine)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Measures per-mutation persistence latency for each storage backend.
+
+Usage (from library-api/):
+    python -m benchmarks.bench_persistence --sizes 1000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_find_book import make_books
+from models.book_model import Book
+from services.library_service import LibraryService
+from services.storage import STORAGE_BACKENDS, create_storage
+
+
+def time_writes(service: LibraryService, writes: int) -> float:
+    """Returns the mean latency of one persisted add, in milliseconds."""
+    start = time.perf_counter()
+    for i in range(writes):
+        book = Book("Yeni Kitap", "Yazar", f"979{i:010d}")
+        service.books.append(book)
+        service.storage.record_add(book, service.books)
+    return (time.perf_counter() - start) / writes * 1e3
+
+
+def run(size: int, writes: int) -> dict:
+    result = {"size": size}
+    for kind in STORAGE_BACKENDS:
+        with tempfile.TemporaryDirectory() as directory:
+            service = LibraryService(storage=create_storage(kind, os.path.join(directory, "library")))
+            for book in make_books(size):
+                service.books.append(book)
+            service.save_books()
+            result[kind] = time_writes(service, writes)
+            service.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--writes", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'kitap':>10}" + "".join(f"{kind + ' (ms)':>14}" for kind in STORAGE_BACKENDS))
+    for size in args.sizes:
+        result = run(size, args.writes)
+        print(f"{result['size']:>10}" + "".join(f"{result[kind]:>14.3f}" for kind in STORAGE_BACKENDS))
+
+
+if __name__ == "__main__":
+    main()
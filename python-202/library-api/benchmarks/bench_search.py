@@ -0,0 +1,84 @@
+"""Compares title/author search by scanning every book against the SearchIndex.
+
+Usage (from library-api/):
+    python -m benchmarks.bench_search --sizes 100000 1000000
+"""
+import argparse
+import time
+from typing import List
+
+from benchmarks.bench_find_book import make_books
+from models.book_catalog import BookCatalog
+from models.book_model import Book
+from services.catalog_indexes import TitleIndex
+from services.search_index import SearchIndex, tokenize
+
+QUERIES = ["kitap 4242", "yazar 17", "yaz 99", "kitap 1234 yazar 234", "bulunmayan"]
+# Bir-iki karakterlik önekler kataloğun büyük kısmıyla eşleşir
+SHORT_QUERIES = ["k", "ya", "1", "17", "y 1"]
+
+
+def scan_search(books: List[Book], query: str, limit: int = 20) -> List[Book]:
+    terms = tokenize(query)
+    found = []
+    for book in books:
+        tokens = tokenize(book.title) + tokenize(book.author)
+        if all(any(token.startswith(term) for token in tokens) for term in terms):
+            found.append(book)
+    return sorted(found, key=lambda book: book.title.casefold())[:limit]
+
+
+def time_queries(search, repeat: int, queries: List[str] = QUERIES) -> float:
+    """Returns the mean query time in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            search(query)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1e3
+
+
+def run(size: int, repeat: int) -> dict:
+    books = make_books(size)
+    catalog = BookCatalog(books)
+    index, titles = SearchIndex(), TitleIndex()
+
+    start = time.perf_counter()
+    catalog.add_index(index)
+    catalog.add_index(titles)
+    index.search("kitap", catalog.get, limit=1, titles=titles)
+    build_s = time.perf_counter() - start
+
+    # LibraryService.build_indexes'in açılışta yaptığı gibi kısa önekler sıralanır
+    start = time.perf_counter()
+    for prefix in index.all_short_prefixes():
+        index.prepare(prefix, catalog.get, titles)
+    prepare_s = time.perf_counter() - start
+
+    def search(query: str) -> List[Book]:
+        return index.search(query, catalog.get, titles=titles)
+
+    return {
+        "size": size,
+        "build_s": build_s,
+        "prepare_s": prepare_s,
+        "scan_ms": time_queries(lambda query: scan_search(books, query), 1),
+        "index_ms": time_queries(search, repeat),
+        "short_ms": time_queries(search, repeat, SHORT_QUERIES),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'kitap':>10} {'kurulum (s)':>12} {'önekler (s)':>12} {'tarama (ms)':>12} "
+          f"{'indeks (ms)':>12} {'kısa (ms)':>10}")
+    for size in args.sizes:
+        result = run(size, args.repeat)
+        print(f"{result['size']:>10} {result['build_s']:>12.2f} {result['prepare_s']:>12.2f} "
+              f"{result['scan_ms']:>12.2f} {result['index_ms']:>12.3f} {result['short_ms']:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measures cold-start cost: importing api.py and loading the catalog.
+
+Times LibraryService start-up (load plus title/author indexes) on a JSON
+catalog and on the binary snapshot format, including the one-time
+JSON -> binary conversion, and reports file sizes.
+
+Usage (from library-api/):
+    python -m benchmarks.bench_startup --sizes 100000 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_find_book import make_books
+from services.library_service import LibraryService
+from services.storage import BinarySnapshotStorage, JsonFileStorage
+
+
+def startup_seconds(storage) -> float:
+    start = time.perf_counter()
+    LibraryService(storage=storage)
+    return time.perf_counter() - start
+
+
+def import_api_seconds() -> float:
+    """Time to import api.py in a fresh interpreter (no catalog is loaded)."""
+    code = "import time; s = time.perf_counter(); import api; print(time.perf_counter() - s)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip())
+
+
+def run(size: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "library.json")
+        binary_path = os.path.join(directory, "library.bin")
+        JsonFileStorage(json_path).save(make_books(size))
+
+        return {
+            "size": size,
+            "json_s": startup_seconds(JsonFileStorage(json_path)),
+            "convert_s": startup_seconds(BinarySnapshotStorage(binary_path)),
+            "binary_s": startup_seconds(BinarySnapshotStorage(binary_path)),
+            "json_mb": os.path.getsize(json_path) / 1e6,
+            "binary_mb": os.path.getsize(binary_path) / 1e6,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    args = parser.parse_args()
+
+    print(f"import api: {import_api_seconds() * 1e3:.0f} ms")
+    print(f"{'kitap':>10} {'JSON (s)':>10} {'dönüşüm (s)':>12} {'ikili (s)':>10} {'JSON MB':>9} {'ikili MB':>9}")
+    for size in args.sizes:
+        r = run(size)
+        print(f"{r['size']:>10} {r['json_s']:>10.2f} {r['convert_s']:>12.2f} {r['binary_s']:>10.2f} "
+              f"{r['json_mb']:>9.1f} {r['binary_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Runs the benchmark suite and writes the results to a JSON file.
+
+Covers find_book, load_books/save_books per storage backend, GET /books,
+POST /books and bulk imports at each catalog size. Open Library traffic
+goes to the local stub server (tests/stub_server.py) with configurable
+latency and error rate, so no network access is needed and runs are
+repeatable. With --compare, p50 values are checked against an earlier
+results file and regressions above --threshold are reported (exit code 1).
+
+Usage (from library-api/):
+    python -m benchmarks.run_suite --sizes 1000 100000 1000000 --output bench-results.json
+    python -m benchmarks.run_suite --sizes 1000 --latency 0.02 --error-rate 0.05 --compare bench-results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.testclient import TestClient
+
+from api import app
+from benchmarks.bench_find_book import make_books
+from benchmarks.bench_get_books import percentile
+from benchmarks.bench_open_library import make_stub
+from services.library_service import LibraryService
+from services.open_library import OpenLibraryClient
+from services.storage import create_storage, write_json_atomic
+
+SCENARIOS = ("find_book", "load_books", "save_books", "get_books", "post_books", "bulk_import")
+
+GET_MODES = {
+    "page": {"limit": 100},
+    "title": {"sort": "title", "limit": 100},
+    "full": {},
+}
+
+
+def summarize(name: str, size: int, samples: List[float], unit: str = "ms",
+              variant: str = "", **extra) -> dict:
+    return {
+        "name": name,
+        "variant": variant,
+        "size": size,
+        "unit": unit,
+        "n": len(samples),
+        "mean": sum(samples) / len(samples),
+        "p50": percentile(samples, 0.50),
+        "p99": percentile(samples, 0.99),
+        **extra,
+    }
+
+
+def timed(fn: Callable[[], object], scale: float = 1e3) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * scale
+
+
+def filled_service(directory: str, kind: str, size: int,
+                   open_library: Optional[OpenLibraryClient] = None) -> LibraryService:
+    service = LibraryService(storage=create_storage(kind, os.path.join(directory, f"library-{kind}")),
+                             open_library=open_library)
+    service.import_books(make_books(size), chunk_size=max(size, 1))
+    return service
+
+
+def bench_find_book(service: LibraryService, size: int, args) -> List[dict]:
+    rng = random.Random(0)
+    isbns = [f"978{rng.randrange(size):010d}" for _ in range(args.lookups)]
+    samples = [timed(lambda: service.find_book(isbn), scale=1e6) for isbn in isbns]
+    return [summarize("find_book", size, samples, unit="us")]
+
+
+def bench_storage(directory: str, size: int, args) -> List[dict]:
+    results = []
+    for kind in args.backends:
+        service = filled_service(directory, kind, size)
+        saves = [timed(service.save_books) for _ in range(args.repeat)]
+        loads = [timed(service.load_books) for _ in range(args.repeat)]
+        service.close()
+        if "save_books" in args.scenarios:
+            results.append(summarize("save_books", size, saves, variant=kind))
+        if "load_books" in args.scenarios:
+            results.append(summarize("load_books", size, loads, variant=kind))
+    return results
+
+
+def bench_get_books(client: TestClient, size: int, args) -> List[dict]:
+    results = []
+    for mode, params in GET_MODES.items():
+        if mode == "full" and size > args.full_list_max:
+            continue
+        params = dict(params, offset=size // 2) if "limit" in params else params
+        client.get("/books", params=params)
+        samples = [timed(lambda: client.get("/books", params=params)) for _ in range(args.requests)]
+        results.append(summarize("get_books", size, samples, variant=mode))
+    return results
+
+
+def bench_post_books(client: TestClient, service: LibraryService, size: int, args) -> List[dict]:
+    with make_stub(args.posts, args.authors, args.latency, args.error_rate, prefix="979") as stub:
+        service.open_library = OpenLibraryClient(base_url=stub.base_url)
+        statuses: Counter = Counter()
+        samples = []
+        for isbn in stub.books:
+            start = time.perf_counter()
+            response = client.post("/books", json={"isbn": isbn})
+            samples.append((time.perf_counter() - start) * 1e3)
+            statuses[str(response.status_code)] += 1
+        service.open_library.close()
+        upstream = {"upstream_requests": len(stub.requests), "upstream_errors": stub.errors}
+    return [summarize("post_books", size, samples, statuses=dict(statuses),
+                      error_rate=round(1 - statuses["201"] / len(samples), 4), **upstream)]
+
+
+def bench_bulk_import(directory: str, size: int, args) -> List[dict]:
+    with make_stub(args.import_count, args.authors, args.latency, args.error_rate, prefix="979") as stub:
+        service = filled_service(directory, args.storage, size,
+                                 open_library=OpenLibraryClient(base_url=stub.base_url))
+        outcomes: Dict[str, int] = {}
+        elapsed = timed(lambda: outcomes.update(Counter(service.add_books_by_isbn(list(stub.books)).values())))
+        service.close()
+        api = summarize("bulk_import", size, [elapsed], variant="open_library",
+                        books=args.import_count, created=outcomes.get("created", 0),
+                        upstream_requests=len(stub.requests), upstream_errors=stub.errors)
+
+    service = LibraryService(storage=create_storage(args.storage, os.path.join(directory, "offline")))
+    books = make_books(size)
+    offline = summarize("bulk_import", size, [timed(lambda: service.import_books(books))],
+                        variant="offline", books=size)
+    service.close()
+    return [api, offline]
+
+
+def run(size: int, args) -> List[dict]:
+    scenarios = set(args.scenarios)
+    results: List[dict] = []
+    with tempfile.TemporaryDirectory() as directory:
+        if scenarios & {"find_book", "get_books", "post_books"}:
+            service = filled_service(directory, args.storage, size)
+            if "find_book" in scenarios:
+                results += bench_find_book(service, size, args)
+            app.state.library = service
+            client = TestClient(app)
+            if "get_books" in scenarios:
+                results += bench_get_books(client, size, args)
+            if "post_books" in scenarios:
+                results += bench_post_books(client, service, size, args)
+            app.state.library = None
+            service.close()
+        if scenarios & {"load_books", "save_books"}:
+            results += bench_storage(directory, size, args)
+        if "bulk_import" in scenarios:
+            results += bench_bulk_import(directory, size, args)
+    return results
+
+
+def environment(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+    }
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[Tuple[dict, float]]:
+    """Returns (result, relative p50 change) for every result that got slower than ``threshold``."""
+    previous = {(r["name"], r["variant"], r["size"]): r for r in baseline}
+    regressions = []
+    print(f"\n{'ölçüm':<28} {'kitap':>9} {'önceki p50':>12} {'şimdi p50':>12} {'değişim':>9}")
+    for result in results:
+        old = previous.get((result["name"], result["variant"], result["size"]))
+        if old is None or not old["p50"]:
+            continue
+        change = result["p50"] / old["p50"] - 1
+        label = f"{result['name']}/{result['variant']}" if result["variant"] else result["name"]
+        flag = "  <- yavaşladı" if change > threshold else ""
+        print(f"{label:<28} {result['size']:>9} {old['p50']:>12.3f} {result['p50']:>12.3f} {change:>+8.0%}{flag}")
+        if change > threshold:
+            regressions.append((result, change))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--storage", default="journal", help="find_book/GET/POST/bulk_import için arka uç")
+    parser.add_argument("--backends", nargs="+", default=["json", "journal", "sqlite", "binary"],
+                        help="load_books/save_books için arka uçlar")
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--full-list-max", type=int, default=100_000,
+                        help="Tam listenin (GET /books) ölçüleceği en büyük katalog")
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--import-count", type=int, default=500)
+    parser.add_argument("--authors", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub gecikmesi (sn)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub'ın 503 döndürme oranı")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Gerileme sayılan p50 artışı (0.2 = %%20)")
+    args = parser.parse_args()
+
+    results: List[dict] = []
+    print(f"{'ölçüm':<28} {'kitap':>9} {'p50':>12} {'p99':>12} {'birim':>6}")
+    for size in args.sizes:
+        for result in run(size, args):
+            label = f"{result['name']}/{result['variant']}" if result["variant"] else result["name"]
+            print(f"{label:<28} {size:>9} {result['p50']:>12.3f} {result['p99']:>12.3f} {result['unit']:>6}")
+            results.append(result)
+
+    write_json_atomic(args.output, {"environment": environment(args), "results": results})
+    print(f"\nSonuçlar yazıldı: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from services.open_library import OPEN_LIBRARY_URL
+
+
+DEFAULT_PATHS = {
+    "json": "library.json",
+    "journal": "library.json",
+    "shared": "library.json",
+    "sqlite": "library.db",
+    "binary": "library.bin",
+    "binary-journal": "library.bin",
+    "sharded": "library.json",
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Runtime configuration shared by api.py and main.py.
+
+    Values come from environment variables so the same code runs locally,
+    in tests and in deployments:
+
+    - LIBRARY_STORAGE: "json" (default), "journal", "shared", "sqlite", "binary",
+      "binary-journal" or "sharded"
+    - LIBRARY_SHARDS / LIBRARY_SHARD_BACKEND: shard count and per-shard storage for "sharded"
+    - LIBRARY_SHARD_DIRS: comma-separated directories the shard files are spread over
+    - LIBRARY_PATH: data file; defaults to library.json / library.db / library.bin
+    - OPEN_LIBRARY_URL: Open Library base URL (e.g. a local stub)
+    - OPEN_LIBRARY_TIMEOUT: seconds per Open Library request
+    - OPEN_LIBRARY_DEADLINE: seconds for one ISBN lookup including retries (unset: no limit)
+    - OPEN_LIBRARY_RETRIES: attempts per request for timeouts, 429 and 5xx
+    - OPEN_LIBRARY_BREAKER_THRESHOLD / OPEN_LIBRARY_BREAKER_RESET: consecutive
+      failures that open the circuit breaker / seconds before it probes again
+    - OPEN_LIBRARY_HEDGE_AFTER: seconds after which a slow request is sent again (unset: off)
+    - LIBRARY_ASYNC_FETCH: "1" makes POST /books await the async client
+    - OPEN_LIBRARY_BATCH_SIZE: ISBNs per multi-bibkey /api/books request
+    - LIBRARY_BATCH_CONCURRENCY: Open Library requests in flight for POST /books/batch
+    - METADATA_CACHE_SIZE: cached Open Library records (0 disables the cache)
+    - METADATA_CACHE_TTL / METADATA_CACHE_NEGATIVE_TTL: seconds to keep hits / 404s
+    - METADATA_CACHE_PATH: optional file that keeps the cache across restarts
+    - LIBRARY_METRICS: "1" enables instrumentation and GET /metrics
+    - LIBRARY_PROFILING: "1" records request traces and opens the /admin/profile* endpoints
+    - LIBRARY_ADMIN_TOKEN: X-Admin-Token value those endpoints require (unset: closed)
+    - LIBRARY_SLOW_REQUEST: seconds after which a request's trace is kept
+    - LIBRARY_CHANGE_LOG_SIZE: adds/removes kept for GET /changes
+    - LIBRARY_INGEST: "1" makes POST /books enqueue the ISBN and answer 202
+    - LIBRARY_INGEST_PATH: SQLite file holding the ingestion queue
+    - LIBRARY_INGEST_WORKERS: background threads adding queued ISBNs
+    - LIBRARY_INDEX_ON_START: "0" leaves the search/title/author indexes to
+      be built on first use instead of by a background thread at start-up
+    """
+
+    storage: str = "json"
+    library_path: str = "library.json"
+    shards: int = 4
+    shard_backend: str = "journal"
+    shard_dirs: Optional[Tuple[str, ...]] = None
+    open_library_url: str = OPEN_LIBRARY_URL
+    open_library_timeout: float = 10.0
+    open_library_deadline: Optional[float] = None
+    open_library_retries: int = 3
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+    hedge_after: Optional[float] = None
+    async_fetch: bool = False
+    batch_size: int = 50
+    batch_concurrency: int = 4
+    cache_size: int = 10_000
+    cache_ttl: float = 24 * 3600
+    cache_negative_ttl: float = 600
+    cache_path: Optional[str] = None
+    metrics: bool = False
+    profiling: bool = False
+    admin_token: Optional[str] = None
+    slow_request: float = 1.0
+    change_log_size: int = 10_000
+    ingest: bool = False
+    ingest_path: str = "ingest_jobs.db"
+    ingest_workers: int = 2
+    index_on_start: bool = True
+
+    def storage_options(self) -> dict:
+        """Extra constructor arguments for the configured storage backend."""
+        if self.storage != "sharded":
+            return {}
+        return {"shards": self.shards, "backend": self.shard_backend,
+                "directories": list(self.shard_dirs) if self.shard_dirs else None}
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        storage = os.environ.get("LIBRARY_STORAGE", "json").strip().lower()
+        library_path = os.environ.get("LIBRARY_PATH") or DEFAULT_PATHS.get(storage, "library.json")
+        return cls(
+            storage=storage,
+            library_path=library_path,
+            shards=int(os.environ.get("LIBRARY_SHARDS", "4")),
+            shard_backend=os.environ.get("LIBRARY_SHARD_BACKEND", "journal").strip().lower(),
+            shard_dirs=_env_list("LIBRARY_SHARD_DIRS"),
+            open_library_url=os.environ.get("OPEN_LIBRARY_URL", OPEN_LIBRARY_URL),
+            open_library_timeout=float(os.environ.get("OPEN_LIBRARY_TIMEOUT", "10")),
+            open_library_deadline=_env_seconds("OPEN_LIBRARY_DEADLINE"),
+            open_library_retries=int(os.environ.get("OPEN_LIBRARY_RETRIES", "3")),
+            breaker_threshold=int(os.environ.get("OPEN_LIBRARY_BREAKER_THRESHOLD", "5")),
+            breaker_reset=float(os.environ.get("OPEN_LIBRARY_BREAKER_RESET", "30")),
+            hedge_after=_env_seconds("OPEN_LIBRARY_HEDGE_AFTER"),
+            async_fetch=_env_flag("LIBRARY_ASYNC_FETCH"),
+            batch_size=int(os.environ.get("OPEN_LIBRARY_BATCH_SIZE", "50")),
+            batch_concurrency=int(os.environ.get("LIBRARY_BATCH_CONCURRENCY", "4")),
+            cache_size=int(os.environ.get("METADATA_CACHE_SIZE", "10000")),
+            cache_ttl=float(os.environ.get("METADATA_CACHE_TTL", str(24 * 3600))),
+            cache_negative_ttl=float(os.environ.get("METADATA_CACHE_NEGATIVE_TTL", "600")),
+            cache_path=os.environ.get("METADATA_CACHE_PATH") or None,
+            metrics=_env_flag("LIBRARY_METRICS"),
+            profiling=_env_flag("LIBRARY_PROFILING"),
+            admin_token=os.environ.get("LIBRARY_ADMIN_TOKEN") or None,
+            slow_request=float(os.environ.get("LIBRARY_SLOW_REQUEST", "1")),
+            change_log_size=int(os.environ.get("LIBRARY_CHANGE_LOG_SIZE", "10000")),
+            ingest=_env_flag("LIBRARY_INGEST"),
+            ingest_path=os.environ.get("LIBRARY_INGEST_PATH", "ingest_jobs.db"),
+            ingest_workers=int(os.environ.get("LIBRARY_INGEST_WORKERS", "2")),
+            index_on_start=_env_flag("LIBRARY_INDEX_ON_START", default=True),
+        )
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name, "").strip().lower()
+    return value in ("1", "true", "yes", "on") if value else default
+
+
+def _env_seconds(name: str) -> Optional[float]:
+    value = os.environ.get(name, "").strip()
+    return float(value) if value else None
+
+
+def _env_list(name: str) -> Optional[Tuple[str, ...]]:
+    values = tuple(value.strip() for value in os.environ.get(name, "").split(",") if value.strip())
+    return values or None
@@ -1,19 +1,93 @@
-from services.library_service import LibraryService
-
-
-def main() -> None:
+import argparse
+import sys
+from typing import List, Optional
+
+from config import Settings
+from services.isbn_import import Checkpoint, export_books, import_isbns, iter_lines
+from services.library_service import AddResult, LibraryService
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Runs the interactive menu, or the ``import``/``export`` subcommand."""
+    parser = argparse.ArgumentParser(description="Kütüphane yönetim sistemi")
+    commands = parser.add_subparsers(dest="command")
+
+    import_parser = commands.add_parser("import", help="Dosyadaki ISBN'leri toplu ekler")
+    import_parser.add_argument("source", help="Satır başına bir ISBN içeren dosya, stdin için -")
+    import_parser.add_argument("--workers", type=int, default=8,
+                               help="Aynı anda yapılan Open Library isteği")
+    import_parser.add_argument("--batch-size", type=int, default=500,
+                               help="Tek yazımla kaydedilen ISBN sayısı")
+    import_parser.add_argument("--checkpoint",
+                               help="İlerleme dosyası (varsayılan: <source>.checkpoint; stdin'de yok)")
+    import_parser.add_argument("--failures", help="Eklenemeyen ISBN'lerin yazılacağı dosya")
+
+    export_parser = commands.add_parser("export", help="Kataloğu dosyaya veya stdout'a yazar")
+    export_parser.add_argument("target", nargs="?", default="-", help="Çıktı dosyası, stdout için -")
+    export_parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+
+    args = parser.parse_args(argv)
+    library = LibraryService.from_settings(Settings.from_env())
+    try:
+        if args.command == "import":
+            return import_command(library, args)
+        if args.command == "export":
+            return export_command(library, args)
+        interactive(library)
+        return 0
+    finally:
+        library.close()
+
+
+def import_command(library: LibraryService, args: argparse.Namespace) -> int:
+    """Exits with 1 if Open Library could not be reached for some ISBNs, so
+    the run can simply be repeated.
+    """
+    from_stdin = args.source == "-"
+    checkpoint = Checkpoint(args.checkpoint or (None if from_stdin else f"{args.source}.checkpoint"),
+                            source=args.source)
+    resumed = checkpoint.load().lines
+    if resumed:
+        print(f"Kaldığı yerden devam ediliyor: {resumed}. satır", file=sys.stderr)
+
+    source = sys.stdin if from_stdin else open(args.source, encoding="utf-8")
+    failures = open(args.failures, "a", encoding="utf-8") if args.failures else None
+    try:
+        summary = import_isbns(library, iter_lines(source, skip=resumed), checkpoint,
+                               batch_size=args.batch_size, workers=args.workers, failures=failures)
+    finally:
+        if not from_stdin:
+            source.close()
+        if failures is not None:
+            failures.close()
+    checkpoint.clear()
+    print(summary.report(), file=sys.stderr)
+    return 1 if summary.counts[AddResult.UPSTREAM_ERROR] else 0
+
+
+def export_command(library: LibraryService, args: argparse.Namespace) -> int:
+    out = sys.stdout if args.target == "-" else open(args.target, "w", encoding="utf-8", newline="")
+    try:
+        count = export_books(library, out, args.format)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{count} kitap yazıldı", file=sys.stderr)
+    return 0
+
+
+def interactive(library: LibraryService) -> None:
     """Main application loop."""
-    library = LibraryService()
-
     while True:
         print("\n=== KÜTÜPHANE YÖNETİM SİSTEMİ ===")
         print("1. Kitap Ekle (ISBN ile)")
         print("2. Kitap Sil")
         print("3. Kitapları Listele")
         print("4. Kitap Ara")
-        print("5. Çıkış")
+        print("5. Kitap Ara (Başlık/Yazar)")
+        print("6. Çıkış")
 
-        choice = input("\nSeçiminizi yapın (1-5): ").strip()
+        choice = input("\nSeçiminizi yapın (1-6): ").strip()
 
         if choice == "1":
             add_book_interface(library)
@@ -24,10 +98,12 @@ def main() -> None:
         elif choice == "4":
             find_book_interface(library)
         elif choice == "5":
+            search_books_interface(library)
+        elif choice == "6":
             print("Program sonlandırılıyor...")
             break
         else:
-            print("Geçersiz seçim! Lütfen 1-5 arası bir sayı girin.")
+            print("Geçersiz seçim! Lütfen 1-6 arası bir sayı girin.")
 
 
 def add_book_interface(library: LibraryService) -> None:
@@ -39,9 +115,11 @@ def add_book_interface(library: LibraryService) -> None:
         print("ISBN boş olamaz!")
         return
 
-    success = library.add_book_by_isbn(isbn)
-    if success:
+    result = library.add_book_result(isbn)
+    if result is AddResult.CREATED:
         print("Kitap başarıyla eklendi.")
+    elif result is AddResult.UPSTREAM_ERROR:
+        print("Open Library'ye şu anda ulaşılamıyor, lütfen daha sonra tekrar deneyin.")
     else:
         print("Kitap bulunamadı veya eklenemedi.")
 
@@ -81,5 +159,22 @@ def find_book_interface(library: LibraryService) -> None:
         print("Bu ISBN ile kitap bulunamadı!")
 
 
+def search_books_interface(library: LibraryService) -> None:
+    """Searches books by the beginning of title or author words."""
+    print("\n--- BAŞLIK/YAZAR ARAMA ---")
+    query = input("Aranacak kelimeler: ").strip()
+
+    if not query:
+        print("Arama metni boş olamaz!")
+        return
+
+    books = library.search_books(query)
+    if not books:
+        print("Eşleşen kitap bulunamadı.")
+    else:
+        for i, book in enumerate(books, 1):
+            print(f"{i}. {book}")
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
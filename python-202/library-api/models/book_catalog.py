@@ -0,0 +1,162 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from itertools import count, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.book_model import Book, normalize_isbn
+
+# Process-wide so that a reloaded catalog never reuses an earlier version.
+_versions = count(1)
+
+
+class CatalogIndex(ABC):
+    """Secondary index kept in sync by BookCatalog.
+
+    ``add``/``remove`` are called with the normalized ISBN key on every
+    change; replacing a book is a remove followed by an add.
+    """
+
+    @abstractmethod
+    def add(self, key: str, book: Book) -> None:
+        ...
+
+    @abstractmethod
+    def remove(self, key: str, book: Book) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class BookCatalog:
+    """Insertion-ordered collection of books indexed by normalized ISBN.
+
+    Behaves like the plain list it replaces (append, remove, len, iteration,
+    positional access) while lookups, duplicate checks and deletes by ISBN
+    are constant time. ``page`` serves pages in normalized-ISBN order from a
+    sorted key list that is built on first use and then kept up to date.
+
+    ``version`` changes on every mutation, so derived data (e.g. a serialized
+    response) can be cached per version. Indexes registered with
+    ``add_index`` are updated incrementally on every change.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()):
+        self._books: Dict[str, Book] = {}
+        self._sorted_keys: Optional[List[str]] = None
+        self._indexes: List[CatalogIndex] = []
+        self.version = next(_versions)
+        # Henüz indeks yok; toplu yüklemede append'in ek işlerine gerek yok
+        self._books.update((normalize_isbn(book.isbn), book) for book in books)
+
+    def append(self, book: Book) -> None:
+        """Adds a book; an existing entry with the same ISBN is replaced."""
+        key = normalize_isbn(book.isbn)
+        previous = self._books.get(key)
+        if previous is None and self._sorted_keys is not None:
+            insort(self._sorted_keys, key)
+        self._books[key] = book
+        for index in self._indexes:
+            if previous is not None:
+                index.remove(key, previous)
+            index.add(key, book)
+        self.version = next(_versions)
+
+    def remove(self, book: Book) -> None:
+        """Removes the given book, raising ValueError like list.remove."""
+        key = normalize_isbn(book.isbn)
+        if self._books.get(key) is not book:
+            raise ValueError("Kitap katalogda bulunamadı")
+        self._discard(key)
+
+    def get(self, isbn: str) -> Optional[Book]:
+        return self._books.get(normalize_isbn(isbn))
+
+    def pop(self, isbn: str) -> Optional[Book]:
+        """Removes and returns the book with the given ISBN, if any."""
+        return self._discard(normalize_isbn(isbn))
+
+    def page(self, after: Optional[str] = None, offset: int = 0, limit: int = 100) -> List[Book]:
+        """Returns up to ``limit`` books in normalized-ISBN order.
+
+        ``after`` is a keyset cursor: the page starts right after that ISBN,
+        whether or not it is still in the catalog. ``offset`` is applied
+        after the cursor. Cost is O(log n + limit).
+        """
+        keys = self._ordered_keys()
+        start = bisect_right(keys, normalize_isbn(after)) if after else 0
+        window = keys[start + offset:start + offset + limit]
+        return [book for book in map(self._books.get, window) if book is not None]
+
+    def add_index(self, index: CatalogIndex) -> None:
+        """Registers a secondary index and fills it with the current books."""
+        index.clear()
+        for key, book in self._books.items():
+            index.add(key, book)
+        self._indexes.append(index)
+
+    def entries(self) -> Dict[str, Book]:
+        """A copy of the normalized ISBN -> book mapping, e.g. to fill an
+        index without holding the caller's lock; see ``attach_index``.
+        """
+        return dict(self._books)
+
+    def attach_index(self, index: CatalogIndex, filled_from: Dict[str, Book]) -> None:
+        """Registers an index that was filled from ``filled_from``, an earlier
+        ``entries()`` copy; changes made since then are applied to it first.
+        """
+        for key, book in filled_from.items():
+            current = self._books.get(key)
+            if current is not book:
+                index.remove(key, book)
+                if current is not None:
+                    index.add(key, current)
+        for key, book in self._books.items():
+            if key not in filled_from:
+                index.add(key, book)
+        self._indexes.append(index)
+
+    def clear(self) -> None:
+        self._books.clear()
+        self._sorted_keys = None
+        for index in self._indexes:
+            index.clear()
+        self.version = next(_versions)
+
+    def copy(self) -> List[Book]:
+        return list(self._books.values())
+
+    def items(self) -> Iterator[Tuple[str, Book]]:
+        """(normalized ISBN, book) pairs in insertion order."""
+        return iter(self._books.items())
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __iter__(self) -> Iterator[Book]:
+        return iter(self._books.values())
+
+    def __getitem__(self, index: int) -> Book:
+        """Positional access; O(index), meant for tests and small catalogs."""
+        if index < 0:
+            index += len(self._books)
+        if index < 0 or index >= len(self._books):
+            raise IndexError("Katalog indeksi aralık dışında")
+        return next(islice(self._books.values(), index, None))
+
+    def _discard(self, key: str) -> Optional[Book]:
+        book = self._books.pop(key, None)
+        if book is None:
+            return None
+        if self._sorted_keys is not None:
+            del self._sorted_keys[bisect_left(self._sorted_keys, key)]
+        for index in self._indexes:
+            index.remove(key, book)
+        self.version = next(_versions)
+        return book
+
+    def _ordered_keys(self) -> List[str]:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._books)
+        return self._sorted_keys
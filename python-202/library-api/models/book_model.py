@@ -1,22 +1,53 @@
 import re
+import sys
+
+_ISBN_SEPARATORS = re.compile(r'[-\s]')
+
+
+def normalize_isbn(isbn: str) -> str:
+    """Strips hyphens and whitespace so that equivalent ISBNs share one key."""
+    if isbn.isdigit():
+        return isbn
+    if isbn.isalnum():
+        return isbn.upper()
+    return _ISBN_SEPARATORS.sub('', isbn).upper()
+
 
 class Book:
-    """Represents a single book in our library."""
+    """Represents a single book in our library.
+
+    Slotted to keep large catalogs small; author names repeat across many
+    books and are interned so each distinct name is stored once.
+    """
+
+    __slots__ = ("title", "author", "isbn")
     
     def __init__(self, title: str, author: str, isbn: str):
         if not self._validate_isbn(isbn):
             raise ValueError("Geçersiz ISBN formatı")
         
         self.title = title
-        self.author = author
+        self.author = sys.intern(author)
         self.isbn = isbn
+
+    @classmethod
+    def trusted(cls, title: str, author: str, isbn: str) -> "Book":
+        """Builds a book without ISBN validation, for records this library
+        wrote itself (storage snapshots, journals, database rows).
+        """
+        book = cls.__new__(cls)
+        book.title = title
+        book.author = sys.intern(author)
+        book.isbn = isbn
+        return book
     
-    def _validate_isbn(self, isbn: str) -> bool:
+    @staticmethod
+    def _validate_isbn(isbn: str) -> bool:
         """Validates ISBN format (10 or 13 digits, supports ISBN-10 with 'X')."""
         if not isbn or not isbn.strip():
             return False
         
-        clean_isbn = re.sub(r'[-\s]', '', isbn)
+        clean_isbn = _ISBN_SEPARATORS.sub('', isbn)
         
         if len(clean_isbn) not in [10, 13]:
             return False
@@ -42,8 +73,10 @@ class Book:
             "isbn": self.isbn
         }
 
-def create_book_from_dict(data: dict) -> Book:
-    return Book(
+def create_book_from_dict(data: dict, trusted: bool = False) -> Book:
+    """Builds a book from its to_dict() form; ``trusted`` skips validation."""
+    factory = Book.trusted if trusted else Book
+    return factory(
         title=data["title"],
         author=data["author"],
         isbn=data["isbn"]
@@ -0,0 +1,170 @@
+import base64
+import binascii
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models.book_catalog import CatalogIndex
+from models.book_model import Book, normalize_isbn
+
+# (case-folded title, normalized ISBN); the ISBN breaks ties between equal titles
+SortKey = Tuple[str, str]
+
+_CURSOR_SEPARATOR = "|"
+
+
+def title_sort_key(key: str, book: Book) -> SortKey:
+    return book.title.casefold(), key
+
+
+def title_cursor(book: Book) -> str:
+    """Opaque cursor for the position right after ``book`` in title order.
+
+    It carries the sort key itself, so it stays valid after the book is
+    deleted. The key is base64url-encoded because it is sent in a response
+    header, and header values must be latin-1 ("Şeker Portakalı" is not).
+    """
+    title, key = title_sort_key(normalize_isbn(book.isbn), book)
+    raw = f"{title}{_CURSOR_SEPARATOR}{key}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def parse_title_cursor(cursor: str) -> SortKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Geçersiz cursor") from None
+    title, separator, key = raw.rpartition(_CURSOR_SEPARATOR)
+    if not separator or not key:
+        raise ValueError("Geçersiz cursor")
+    return title, key
+
+
+def split_authors(author: str) -> List[str]:
+    """Splits the comma-joined ``Book.author`` into individual names."""
+    return [name.strip() for name in author.split(",") if name.strip()]
+
+
+def author_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class SortedEntries:
+    """Sort keys kept in order for keyset pagination.
+
+    Like BookCatalog's key list, entries are appended unsorted until the
+    first read, which sorts them once; after that each change is an
+    insort/bisect. Loading a catalog therefore costs one sort instead of
+    n insertions.
+    """
+
+    def __init__(self):
+        self._entries: List[SortKey] = []
+        self._sorted = False
+
+    def add(self, entry: SortKey) -> None:
+        if self._sorted:
+            insort(self._entries, entry)
+        else:
+            self._entries.append(entry)
+
+    def remove(self, entry: SortKey) -> None:
+        entries = self._ordered()
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def page(self, after: Optional[SortKey] = None, offset: int = 0, limit: int = 100) -> List[str]:
+        """Returns the ISBN keys of one page; O(log n + limit)."""
+        entries = self._ordered()
+        start = bisect_right(entries, after) if after else 0
+        return [key for _, key in entries[start + offset:start + offset + limit]]
+
+    def keys(self) -> Iterator[str]:
+        """ISBN keys in order."""
+        return (key for _, key in self._ordered())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _ordered(self) -> List[SortKey]:
+        if not self._sorted:
+            self._entries.sort()
+            self._sorted = True
+        return self._entries
+
+
+class TitleIndex(CatalogIndex):
+    """Books in case-insensitive title order, updated on every change."""
+
+    def __init__(self):
+        self._order = SortedEntries()
+
+    def add(self, key: str, book: Book) -> None:
+        self._order.add(title_sort_key(key, book))
+
+    def remove(self, key: str, book: Book) -> None:
+        self._order.remove(title_sort_key(key, book))
+
+    def clear(self) -> None:
+        self._order = SortedEntries()
+
+    def page(self, after: Optional[SortKey] = None, offset: int = 0, limit: int = 100) -> List[str]:
+        return self._order.page(after=after, offset=offset, limit=limit)
+
+    def keys(self) -> Iterator[str]:
+        return self._order.keys()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class AuthorIndex(CatalogIndex):
+    """Maps each individual author name to that author's books in title order.
+
+    Names are compared case-insensitively with whitespace collapsed, so
+    "frank  herbert" finds the books of "Frank Herbert".
+    """
+
+    def __init__(self):
+        self._by_author: Dict[str, SortedEntries] = {}
+
+    def add(self, key: str, book: Book) -> None:
+        entry = title_sort_key(key, book)
+        for name in self._names(book):
+            entries = self._by_author.get(name)
+            if entries is None:
+                entries = self._by_author[name] = SortedEntries()
+            entries.add(entry)
+
+    def remove(self, key: str, book: Book) -> None:
+        entry = title_sort_key(key, book)
+        for name in self._names(book):
+            entries = self._by_author.get(name)
+            if entries is None:
+                continue
+            entries.remove(entry)
+            if not entries:
+                del self._by_author[name]
+
+    def clear(self) -> None:
+        self._by_author.clear()
+
+    def count(self, name: str) -> int:
+        entries = self._by_author.get(author_key(name))
+        return len(entries) if entries is not None else 0
+
+    def page(self, name: str, after: Optional[SortKey] = None, offset: int = 0, limit: int = 100) -> List[str]:
+        entries = self._by_author.get(author_key(name))
+        if entries is None:
+            return []
+        return entries.page(after=after, offset=offset, limit=limit)
+
+    @staticmethod
+    def _names(book: Book) -> Tuple[str, ...]:
+        return _author_keys(book.author)
+
+
+@lru_cache(maxsize=65536)
+def _author_keys(author: str) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(author_key(name) for name in split_authors(author)))
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import uuid
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Tuple
+
+from models.book_model import Book
+
+
+class ResyncRequired(Exception):
+    """The requested position is no longer (or not yet) in the log; the
+    consumer has to reload the full catalog.
+    """
+
+
+class Change(NamedTuple):
+    seq: int
+    op: str  # "add" veya "remove"
+    isbn: str
+    book: Optional[Book]
+
+
+class ChangeBatch(NamedTuple):
+    epoch: str
+    latest: int
+    changes: List[Change]
+
+
+class ChangeLog:
+    """Bounded, in-memory log of catalog changes with increasing sequence
+    numbers.
+
+    Only the last ``max_entries`` changes are kept. ``epoch`` identifies one
+    continuous history: it changes on ``reset`` (catalog reloaded) and with
+    every process start, so positions from another epoch are rejected.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._entries: Deque[Change] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def position(self) -> Tuple[str, int]:
+        """(epoch, last sequence number); a full read taken after this call
+        plus the changes since it gives the current catalog.
+        """
+        with self._lock:
+            return self.epoch, self.seq
+
+    def record_add(self, book: Book) -> None:
+        self._record([Change(0, "add", book.isbn, book)])
+
+    def record_add_many(self, books: List[Book]) -> None:
+        self._record([Change(0, "add", book.isbn, book) for book in books])
+
+    def record_remove(self, isbn: str) -> None:
+        self._record([Change(0, "remove", isbn, None)])
+
+    def reset(self) -> None:
+        """Starts a new epoch, e.g. after the catalog was reloaded from storage.
+
+        The sequence number skips one, so consumers that do not send the
+        epoch are also told to resync.
+        """
+        with self._lock:
+            self.epoch = uuid.uuid4().hex[:12]
+            self.seq += 1
+            self._entries.clear()
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+
+    def since(self, seq: int, limit: int = 1000, epoch: Optional[str] = None) -> ChangeBatch:
+        """Changes after ``seq``, oldest first, at most ``limit``, together
+        with the epoch and last sequence number they were read at.
+
+        Raises ResyncRequired if ``epoch`` is not the current one, if ``seq``
+        lies in the future, or if changes after it were already dropped.
+        """
+        with self._lock:
+            self._check(seq, epoch)
+            # Girdiler ardışık numaralı; ilk istenen kaydın yeri doğrudan hesaplanır
+            start = len(self._entries) - (self.seq - seq)
+            changes = [self._entries[i] for i in range(start, min(start + limit, len(self._entries)))]
+            return ChangeBatch(self.epoch, self.seq, changes)
+
+    async def wait(self, seq: int, timeout: float, epoch: Optional[str] = None) -> None:
+        """Returns once there are changes after ``seq`` or ``timeout`` passes."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._check(seq, epoch)
+            if seq < self.seq:
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+    def _check(self, seq: int, epoch: Optional[str]) -> None:
+        if epoch is not None and epoch != self.epoch:
+            raise ResyncRequired("Değişiklik geçmişi yeniden başlatıldı")
+        if seq > self.seq:
+            raise ResyncRequired("Bilinmeyen sıra numarası")
+        if seq < self.seq - len(self._entries):
+            raise ResyncRequired("İstenen değişiklikler artık tutulmuyor")
+
+    def _record(self, changes: List[Change]) -> None:
+        if not changes:
+            return
+        with self._lock:
+            for change in changes:
+                self.seq += 1
+                self._entries.append(change._replace(seq=self.seq))
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+
+    @staticmethod
+    def _wake(waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]) -> None:
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
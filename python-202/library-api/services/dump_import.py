@@ -0,0 +1,227 @@
+"""Seeds the library or the metadata cache from Open Library dump files.
+
+Open Library publishes its data as (gzipped) TSV dumps with one record per
+line: ``type, key, revision, last_modified, JSON``. Plain JSON lines with a
+``type`` field are accepted too. Files are streamed line by line; author
+names are resolved through an on-disk SQLite lookup built from the authors
+dump, so neither dump is ever held in memory.
+
+Usage (from library-api/):
+    python -m services.dump_import --authors ol_dump_authors.txt.gz \\
+        --editions ol_dump_editions.txt.gz --isbns seed_isbns.txt --target cache
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from models.book_model import Book, normalize_isbn
+from services.metadata_cache import MetadataCache
+from services.open_library import BookMetadata, OpenLibraryClient
+
+AUTHOR_TYPE = "/type/author"
+EDITION_TYPE = "/type/edition"
+
+
+class Edition(NamedTuple):
+    isbns: List[str]
+    title: str
+    authors: str
+
+    @property
+    def metadata(self) -> BookMetadata:
+        return self.title, self.authors
+
+
+def open_dump(path: str) -> IO[str]:
+    """Opens a dump for line-by-line reading, gunzipping ``.gz`` files."""
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_dump(path: str, record_type: str) -> Iterator[dict]:
+    """Yields the JSON payload of every record of ``record_type``; malformed
+    lines are skipped.
+    """
+    with open_dump(path) as file:
+        for line in file:
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                kind = record.get("type")
+                if (kind.get("key") if isinstance(kind, dict) else kind) == record_type:
+                    yield record
+                continue
+
+            columns = line.rstrip("\n").split("\t", 4)
+            if len(columns) != 5 or columns[0] != record_type:
+                continue
+            try:
+                record = json.loads(columns[4])
+            except json.JSONDecodeError:
+                continue
+            record.setdefault("key", columns[1])
+            yield record
+
+
+class AuthorLookup:
+    """Author key -> name table in a SQLite file (``WITHOUT ROWID``, keyed
+    by the short ``OL…A`` id) that stays on disk instead of in memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS authors (key TEXT PRIMARY KEY, name TEXT NOT NULL) WITHOUT ROWID"
+        )
+
+    def build(self, records: Iterable[dict], batch_size: int = 50_000) -> int:
+        """Loads author records; returns how many were stored."""
+        rows = ((_short_key(record.get("key", "")), record["name"])
+                for record in records if record.get("key") and record.get("name"))
+        count = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return count
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO authors VALUES (?, ?)", batch)
+            count += len(batch)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Returns names for the given author keys (``/authors/OL1A`` or ``OL1A``)."""
+        wanted = list({_short_key(key) for key in keys})
+        names: Dict[str, str] = {}
+        # SQLite parametre sınırının (999) altında kalmak için parça parça sorgulanır
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            names.update(self._conn.execute(
+                f"SELECT key, name FROM authors WHERE key IN ({placeholders})", chunk))
+        return names
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM authors").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def iter_editions(path: str, authors: AuthorLookup, wanted: Optional[Set[str]] = None,
+                  chunk_size: int = 5000) -> Iterator[Edition]:
+    """Yields editions with a title and at least one valid ISBN.
+
+    With ``wanted`` (normalized ISBNs) only matching editions are kept and
+    only the matching ISBNs are reported. Author keys are resolved one
+    chunk of editions at a time.
+    """
+    chunk = []
+    for record in iter_dump(path, EDITION_TYPE):
+        isbns = _edition_isbns(record, wanted)
+        if isbns and record.get("title"):
+            chunk.append((isbns, record))
+        if len(chunk) >= chunk_size:
+            yield from _resolve_authors(chunk, authors)
+            chunk = []
+    yield from _resolve_authors(chunk, authors)
+
+
+def import_into_library(library, editions: Iterable[Edition], chunk_size: int = 10_000) -> int:
+    """Adds one book per edition (its first ISBN); returns how many were new."""
+    books = (Book(edition.title, edition.authors, edition.isbns[0]) for edition in editions)
+    return library.import_books(books, chunk_size=chunk_size)
+
+
+def import_into_cache(cache: MetadataCache, editions: Iterable[Edition], ttl: Optional[float] = None) -> int:
+    """Stores every ISBN of every edition under the key OpenLibraryClient
+    looks up first, so later adds of these ISBNs need no network call.
+    """
+    items = ((OpenLibraryClient._isbn_key(isbn), edition.metadata)
+             for edition in editions for isbn in edition.isbns)
+    return cache.put_many(items, ttl=ttl)
+
+
+def read_isbn_list(path: str) -> Set[str]:
+    """One ISBN per line; blank lines and ``#`` comments are ignored."""
+    with open_dump(path) as file:
+        return {normalize_isbn(line.strip()) for line in file if line.strip() and not line.startswith("#")}
+
+
+def _edition_isbns(record: dict, wanted: Optional[Set[str]]) -> List[str]:
+    isbns = []
+    for isbn in (record.get("isbn_13") or []) + (record.get("isbn_10") or []):
+        if not isinstance(isbn, str) or not Book._validate_isbn(isbn):
+            continue
+        key = normalize_isbn(isbn)
+        if (wanted is None or key in wanted) and key not in isbns:
+            isbns.append(key)
+    return isbns
+
+
+def _author_keys(record: dict) -> List[str]:
+    keys = []
+    for author in record.get("authors") or []:
+        key = author.get("key") if isinstance(author, dict) else None
+        if key:
+            keys.append(key)
+    return keys
+
+
+def _short_key(key: str) -> str:
+    return key.rsplit("/", 1)[-1]
+
+
+def _resolve_authors(chunk: List[tuple], authors: AuthorLookup) -> Iterator[Edition]:
+    names = authors.get_many(key for _, record in chunk for key in _author_keys(record))
+    for isbns, record in chunk:
+        resolved = [names[key] for key in map(_short_key, _author_keys(record)) if key in names]
+        yield Edition(isbns, record["title"], ", ".join(resolved))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from config import Settings
+    from services.library_service import LibraryService
+
+    parser = argparse.ArgumentParser(description="Open Library dump dosyasından katalog/önbellek doldurur")
+    parser.add_argument("--authors", help="Yazar dump'ı (.txt, .txt.gz); --lookup yoksa veya boşsa okunur")
+    parser.add_argument("--editions", required=True, help="Baskı (edition) dump'ı")
+    parser.add_argument("--lookup", default="authors.lookup.db", help="Yazar arama tablosu (SQLite)")
+    parser.add_argument("--isbns", help="Yalnız bu dosyadaki ISBN'ler alınır (satır başına bir ISBN)")
+    parser.add_argument("--target", choices=("library", "cache"), default="library")
+    parser.add_argument("--cache-ttl", type=float, default=365 * 24 * 3600,
+                        help="Önbelleğe yazılan kayıtların ömrü (sn)")
+    args = parser.parse_args(argv)
+
+    lookup = AuthorLookup(args.lookup)
+    if args.authors and not len(lookup):
+        print(f"Yazarlar yükleniyor: {args.authors}")
+        print(f"{lookup.build(iter_dump(args.authors, AUTHOR_TYPE))} yazar")
+    wanted = read_isbn_list(args.isbns) if args.isbns else None
+    editions = iter_editions(args.editions, lookup, wanted=wanted)
+
+    settings = Settings.from_env()
+    if args.target == "cache":
+        if not settings.cache_path:
+            parser.error("--target cache için METADATA_CACHE_PATH ayarlanmalı")
+        cache = MetadataCache(max_entries=settings.cache_size, ttl=settings.cache_ttl,
+                              negative_ttl=settings.cache_negative_ttl, path=settings.cache_path)
+        print(f"{import_into_cache(cache, editions, ttl=args.cache_ttl)} ISBN önbelleğe yazıldı: "
+              f"{os.path.abspath(settings.cache_path)}")
+    else:
+        library = LibraryService.from_settings(settings)
+        print(f"{import_into_library(library, editions)} kitap eklendi")
+        library.close()
+    lookup.close()
+
+
+if __name__ == "__main__":
+    main()
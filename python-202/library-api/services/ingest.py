@@ -0,0 +1,279 @@
+"""Background ingestion: POST /books enqueues an ISBN and returns at once.
+
+Jobs live in a small SQLite table so a restart loses nothing; a fixed pool
+of worker threads claims queued jobs in batches and adds them through
+``LibraryService.add_books_by_isbn`` (one batched Open Library lookup and
+one storage write per batch).
+"""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+from models.book_model import normalize_isbn
+from services.library_service import AddResult
+
+if TYPE_CHECKING:
+    from services.library_service import LibraryService
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(NamedTuple):
+    id: str
+    isbn: str
+    status: JobStatus
+    result: Optional[AddResult]
+    created_at: float
+    finished_at: Optional[float]
+    attempts: int = 0
+
+
+class JobStore:
+    """SQLite-backed job queue.
+
+    At most one unfinished job exists per normalized ISBN: enqueueing an
+    ISBN that is already queued or running returns that job. Enqueue and
+    claim run in ``BEGIN IMMEDIATE`` transactions, so several processes can
+    share one store without claiming the same job twice.
+
+    A claim records its owner (host, pid and store) and time. ``close``
+    queues the store's unfinished claims again. Claims of a process on this
+    host that no longer exists (a crash) and claims older than ``lease``
+    seconds are queued again when a store opens or claims; running jobs of
+    live stores are left alone.
+
+    A job whose lookup failed because Open Library was unreachable
+    (UPSTREAM_ERROR, or an exception) is queued again after
+    ``retry_delay`` seconds, doubling per attempt, until it has run
+    ``max_attempts`` times; then it is marked failed.
+    """
+
+    _COLUMNS = "id, isbn, status, result, created_at, finished_at, attempts"
+
+    def __init__(self, path: str = "ingest_jobs.db", max_attempts: int = 5, retry_delay: float = 30.0,
+                 lease: float = 600.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    isbn TEXT NOT NULL,
+                    isbn_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    run_after REAL NOT NULL DEFAULT 0,
+                    claimed_by TEXT,
+                    claimed_at REAL
+                )
+                """
+            )
+            # Önceki sürümlerin tablosu
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in (("attempts", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("run_after", "REAL NOT NULL DEFAULT 0"),
+                                       ("claimed_by", "TEXT"), ("claimed_at", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, isbn_key)")
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._requeue_stale()
+
+    def enqueue(self, isbn: str) -> Job:
+        key = normalize_isbn(isbn)
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE isbn_key = ? AND status IN (?, ?)",
+                (key, JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchone()
+            if row:
+                return self._job(row)
+            job = Job(uuid.uuid4().hex, isbn, JobStatus.QUEUED, None, time.time(), None)
+            self._conn.execute(
+                "INSERT INTO jobs (id, isbn, isbn_key, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job.id, isbn, key, job.status.value, job.created_at))
+        return job
+
+    def claim(self, limit: int) -> List[Job]:
+        """Marks up to ``limit`` of the oldest queued jobs that are due
+        running and returns them.
+        """
+        with self._lock, self._conn:
+            # Seçme ve işaretleme tek yazma işleminde; başka bir süreç aynı işleri alamaz
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._requeue_stale()
+            now = time.time()
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE status = ? AND run_after <= ? ORDER BY rowid LIMIT ?",
+                (JobStatus.QUEUED.value, now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, claimed_by = ?, claimed_at = ? WHERE id = ?",
+                [(JobStatus.RUNNING.value, self.owner, now, row[0]) for row in rows])
+        return [self._job(row)._replace(status=JobStatus.RUNNING, attempts=row[-1] + 1) for row in rows]
+
+    def finish(self, results: Dict[str, Optional[AddResult]]) -> None:
+        """Records job id -> outcome. Upstream errors and None outcomes
+        (the batch raised) are retried later while attempts remain; after
+        the last attempt the job is marked failed.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for job_id, result in results.items():
+                if result is not None and result is not AddResult.UPSTREAM_ERROR:
+                    self._conn.execute("UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+                                       (JobStatus.DONE.value, result.value, now, job_id))
+                    continue
+                row = self._conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                attempts = row[0] if row else self.max_attempts
+                if attempts < self.max_attempts:
+                    self._conn.execute("UPDATE jobs SET status = ?, run_after = ? WHERE id = ?",
+                                       (JobStatus.QUEUED.value, now + self.retry_delay * 2 ** (attempts - 1),
+                                        job_id))
+                else:
+                    self._conn.execute("UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+                                       (JobStatus.FAILED.value, result.value if result else None, now, job_id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)",
+                                      (JobStatus.QUEUED.value, JobStatus.RUNNING.value)).fetchone()[0]
+
+    def purge(self, finished_before: float) -> int:
+        """Deletes jobs that finished before the given time; returns how many."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (finished_before,)
+            ).rowcount
+
+    def close(self) -> None:
+        """Queues this store's unfinished claims again and closes the database."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("UPDATE jobs SET status = ? WHERE status = ? AND claimed_by = ?",
+                                   (JobStatus.QUEUED.value, JobStatus.RUNNING.value, self.owner))
+            self._conn.close()
+
+    def _requeue_stale(self) -> None:
+        """Queues running jobs whose lease expired or whose owner process is
+        gone; runs inside the caller's transaction.
+        """
+        expired = time.time() - self.lease
+        host = socket.gethostname()
+        stale = []
+        for job_id, owner, claimed_at in self._conn.execute(
+                "SELECT id, claimed_by, claimed_at FROM jobs WHERE status = ?", (JobStatus.RUNNING.value,)):
+            if owner is None or claimed_at is None or claimed_at < expired or not _owner_alive(owner, host):
+                stale.append((JobStatus.QUEUED.value, job_id))
+        self._conn.executemany("UPDATE jobs SET status = ? WHERE id = ?", stale)
+
+    @staticmethod
+    def _job(row) -> Job:
+        job_id, isbn, job_status, result, created_at, finished_at, attempts = row
+        return Job(job_id, isbn, JobStatus(job_status), AddResult(result) if result else None,
+                   created_at, finished_at, attempts)
+
+
+def _owner_alive(owner: str, host: str) -> bool:
+    owner_host, _, rest = owner.rpartition(":")[0].rpartition(":")
+    if owner_host != host:
+        return True  # başka makinedeki süreç yalnız kira süresiyle anlaşılır
+    try:
+        os.kill(int(rest), 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, ValueError):
+        pass
+    return True
+
+
+class Ingestor:
+    """Fixed pool of ``workers`` threads draining a JobStore.
+
+    Each worker claims up to ``batch_size`` jobs at a time. Finished jobs
+    are kept for ``retention`` seconds so clients can read their outcome.
+    """
+
+    def __init__(self, library: "LibraryService", store: JobStore, workers: int = 2,
+                 batch_size: int = 50, poll_interval: float = 1.0, retention: float = 24 * 3600):
+        self.library = library
+        self.store = store
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "Ingestor":
+        self.store.purge(time.time() - self.retention)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"ingest-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Lets running batches finish; queued jobs stay for the next start."""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, isbn: str) -> Job:
+        job = self.store.enqueue(isbn)
+        self._wake.set()
+        return job
+
+    def run_once(self) -> int:
+        """Processes one batch in the calling thread; returns the number of jobs."""
+        jobs = self.store.claim(self.batch_size)
+        if not jobs:
+            return 0
+        try:
+            outcomes = self.library.add_books_by_isbn([job.isbn for job in jobs])
+        except Exception:
+            logger.exception("Toplu ekleme başarısız (%d iş)", len(jobs))
+            outcomes = {}
+        self.store.finish({job.id: outcomes.get(job.isbn) for job in jobs})
+        return len(jobs)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            if self.run_once():
+                continue
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
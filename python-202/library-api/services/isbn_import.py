@@ -0,0 +1,167 @@
+"""Non-interactive ISBN import and catalog export used by ``main.py``.
+
+An import streams ISBNs from a file (or stdin) and adds them in batches
+through ``LibraryService.add_books_by_isbn_async``, so each batch costs a
+few concurrent Open Library requests and one storage write. After every
+batch the number of consumed input lines is written to a checkpoint file;
+a rerun with the same checkpoint skips those lines.
+"""
+import asyncio
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional
+
+from models.book_model import Book, normalize_isbn
+from services.library_service import AddResult, LibraryService
+from services.storage import write_json_atomic
+
+# Özet ve hata dosyasında "başarısız" sayılan sonuçlar
+FAILED_RESULTS = (AddResult.NOT_FOUND, AddResult.INVALID, AddResult.UPSTREAM_ERROR)
+
+
+@dataclass
+class ImportSummary:
+    lines: int = 0
+    counts: Dict[AddResult, int] = field(default_factory=lambda: {result: 0 for result in AddResult})
+    elapsed: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def failed(self) -> int:
+        return sum(self.counts[result] for result in FAILED_RESULTS)
+
+    def rate(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict:
+        return {"lines": self.lines, "elapsed": self.elapsed,
+                "counts": {result.value: count for result, count in self.counts.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ImportSummary":
+        summary = cls(lines=data["lines"], elapsed=data["elapsed"])
+        for value, count in data["counts"].items():
+            summary.counts[AddResult(value)] = count
+        return summary
+
+    def report(self) -> str:
+        counts = self.counts
+        return "\n".join([
+            f"İşlenen satır: {self.lines}",
+            f"Eklendi: {counts[AddResult.CREATED]}, zaten vardı: {counts[AddResult.DUPLICATE]}, "
+            f"bulunamadı: {counts[AddResult.NOT_FOUND]}, geçersiz: {counts[AddResult.INVALID]}, "
+            f"Open Library hatası: {counts[AddResult.UPSTREAM_ERROR]}",
+            f"Süre: {self.elapsed:.1f} sn, {self.rate():.0f} ISBN/sn",
+        ])
+
+
+class Checkpoint:
+    """Progress of one import, stored as JSON next to the input by default.
+
+    A checkpoint written for another source is ignored.
+    """
+
+    def __init__(self, path: Optional[str], source: str):
+        self.path = path
+        self.source = source
+
+    def load(self) -> ImportSummary:
+        if not self.path or not os.path.exists(self.path):
+            return ImportSummary()
+        with open(self.path, encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("source") != self.source:
+            return ImportSummary()
+        return ImportSummary.from_dict(data)
+
+    def save(self, summary: ImportSummary) -> None:
+        if self.path:
+            write_json_atomic(self.path, {"source": self.source, **summary.to_dict()})
+
+    def clear(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def iter_lines(file: IO[str], skip: int = 0) -> Iterator[str]:
+    """Yields stripped input lines after the first ``skip``; blank lines and
+    ``#`` comments are yielded as empty strings so line counts stay exact.
+    """
+    for line in islice(file, skip, None):
+        line = line.strip()
+        yield "" if line.startswith("#") else line
+
+
+def import_isbns(library: LibraryService, lines: Iterable[str], checkpoint: Checkpoint,
+                 batch_size: int = 500, workers: int = 8,
+                 failures: Optional[IO[str]] = None) -> ImportSummary:
+    """Adds the ISBNs in ``lines`` batch by batch, continuing the summary
+    stored in ``checkpoint``. ISBNs repeated within this run are counted as
+    DUPLICATE without a lookup; failed ISBNs are written to ``failures``.
+    """
+    summary = checkpoint.load()
+    seen = set()
+    start = time.perf_counter() - summary.elapsed
+
+    async def run() -> None:
+        try:
+            await add_batches()
+        finally:
+            # Async istemcinin bağlantıları bu loop'a ait; asyncio.run bitmeden kapatılır
+            await library.open_library.aclose()
+
+    async def add_batches() -> None:
+        iterator = iter(lines)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            isbns: List[str] = []
+            for isbn in filter(None, batch):
+                if not Book._validate_isbn(isbn):
+                    _record(summary, failures, isbn, AddResult.INVALID)
+                elif normalize_isbn(isbn) in seen:
+                    summary.counts[AddResult.DUPLICATE] += 1
+                else:
+                    seen.add(normalize_isbn(isbn))
+                    isbns.append(isbn)
+            outcomes = await library.add_books_by_isbn_async(isbns, concurrency=workers)
+            for isbn, result in outcomes.items():
+                _record(summary, failures, isbn, result)
+            if failures is not None:
+                failures.flush()
+            summary.lines += len(batch)
+            summary.elapsed = time.perf_counter() - start
+            checkpoint.save(summary)
+
+    asyncio.run(run())
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def export_books(library: LibraryService, out: IO[str], output_format: str = "ndjson") -> int:
+    """Writes the catalog page by page as NDJSON or CSV; returns the count."""
+    count = 0
+    writer = csv.writer(out) if output_format == "csv" else None
+    if writer is not None:
+        writer.writerow(["title", "author", "isbn"])
+    for book in library.iter_books():
+        if writer is not None:
+            writer.writerow([book.title, book.author, book.isbn])
+        else:
+            out.write(json.dumps(book.to_dict(), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _record(summary: ImportSummary, failures: Optional[IO[str]], isbn: str, result: AddResult) -> None:
+    summary.counts[result] += 1
+    if failures is not None and result in FAILED_RESULTS:
+        failures.write(f"{isbn}\t{result.value}\n")
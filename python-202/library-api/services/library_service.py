@@ -1,120 +1,513 @@
-import json
-import os
-from typing import List, Optional
+import asyncio
+import gc
+import threading
+from contextlib import contextmanager
+from enum import Enum
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import httpx
+from models.book_catalog import BookCatalog, CatalogIndex
+from models.book_model import Book, normalize_isbn
+from services.catalog_indexes import AuthorIndex, SortKey, TitleIndex
+from services.change_log import ChangeLog
+from services.metadata_cache import MetadataCache
+from services.metrics import NO_METRICS, Metrics
+from services.open_library import BookMetadata, OpenLibraryClient
+from services.profiling import span
+from services.resilience import CircuitBreaker, RetryPolicy, UpstreamUnavailable
+from services.rw_lock import ReadWriteLock
+from services.search_index import SearchIndex
+from services.single_flight import AsyncSingleFlight, SingleFlight
+from services.storage import JournalStorage, JsonFileStorage, StorageBackend, create_storage
 
-from models.book_model import Book, create_book_from_dict
+if TYPE_CHECKING:
+    from config import Settings
+
+
+@contextmanager
+def _gc_paused():
+    """Pauses the cyclic GC during bulk loads.
+
+    Every loaded book survives, so collections triggered by the allocations
+    only rescan a growing heap; for millions of books that adds seconds.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class AddResult(str, Enum):
+    """Outcome of adding one ISBN."""
+
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    NOT_FOUND = "not_found"
+    INVALID = "invalid"
+    UPSTREAM_ERROR = "upstream_error"
 
 
 class LibraryService:
-    """Manages library operations and book storage."""
+    """Manages library operations and book storage.
+
+    Concurrency model (sync handlers run in a threadpool):
+
+    - Open Library fetches happen before any lock is taken.
+    - Writers are serialized by ``_persist_lock`` (see ``_writing``). The catalog change itself
+      runs under the write side of ``_lock``; the storage write afterwards
+      only needs the read side, so reads continue while a snapshot is
+      written.
+    - Multi-step reads (listing, paging, searching) hold the read side.
+      Single-key lookups and counts are one dict operation and lock-free.
+    - With storage shared between processes, writers also hold
+      ``storage.locked()`` and first apply other processes' changes;
+      readers call ``sync`` which does the same only when the storage
+      reports a change.
+    - On partitioned (sharded) storage, adds and removes lock only the
+      shards of their ISBNs instead (see ``_writing``).
+    """
 
-    def __init__(self, filename: str = "library.json"):
-        self.filename = filename
-        self.books: List[Book] = []
+    def __init__(self, filename: str = "library.json", journal: bool = False,
+                 storage: Optional[StorageBackend] = None,
+                 open_library: Optional[OpenLibraryClient] = None, metrics: Metrics = NO_METRICS,
+                 change_log_size: int = 10_000):
+        """Persistence is delegated to ``storage``; without one, ``filename`` is
+        used as a JSON file (journaled when ``journal`` is True). Storage calls
+        and the catalog size are reported to ``metrics``. The last
+        ``change_log_size`` adds and removes are kept in ``changes``.
+        """
+        if storage is None:
+            storage = JournalStorage(filename) if journal else JsonFileStorage(filename)
+        self.storage = storage
+        self.open_library = open_library or OpenLibraryClient()
+        self.filename = storage.path
+        self.metrics = metrics
+        self.changes = ChangeLog(change_log_size)
+        self.books = BookCatalog()
+        metrics.track_catalog(lambda: len(self.books))
+        # İkincil indeksler açılışı yavaşlatmasın diye ilk kullanımda veya
+        # build_indexes ile arka planda kurulur
+        self.search_index = SearchIndex()
+        self.title_index = TitleIndex()
+        self.author_index = AuthorIndex()
+        # İndeks adı -> (bağlı olduğu katalog, indeks)
+        self._indexed: Dict[str, Tuple[BookCatalog, CatalogIndex]] = {}
+        self._index_build_lock = threading.Lock()
+        self._lock = ReadWriteLock()
+        self._persist_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
         self.load_books()
 
+    @classmethod
+    def from_settings(cls, settings: "Settings", metrics: Metrics = NO_METRICS) -> "LibraryService":
+        cache = None
+        if settings.cache_size > 0:
+            cache = MetadataCache(max_entries=settings.cache_size, ttl=settings.cache_ttl,
+                                  negative_ttl=settings.cache_negative_ttl, path=settings.cache_path)
+        storage = create_storage(settings.storage, settings.library_path, **settings.storage_options())
+        return cls(storage=storage,
+                   open_library=OpenLibraryClient(base_url=settings.open_library_url,
+                                                  timeout=settings.open_library_timeout,
+                                                  batch_size=settings.batch_size, cache=cache,
+                                                  metrics=metrics,
+                                                  deadline=settings.open_library_deadline,
+                                                  retry=RetryPolicy(attempts=settings.open_library_retries),
+                                                  breaker=CircuitBreaker(
+                                                      failure_threshold=settings.breaker_threshold,
+                                                      reset_timeout=settings.breaker_reset),
+                                                  hedge_after=settings.hedge_after),
+                   metrics=metrics, change_log_size=settings.change_log_size)
+
     def add_book_by_isbn(self, isbn: str) -> bool:
         """Fetches book data by ISBN via Open Library and saves it.
         Returns True if added, False otherwise.
         """
-        if self.find_book(isbn):
-            return False
+        return self.add_book_result(isbn) is AddResult.CREATED
 
-        fetched = self._fetch_book_from_open_library(isbn)
-        if not fetched:
-            return False
+    def add_book_result(self, isbn: str) -> AddResult:
+        """Adds one ISBN and reports why it was or was not added.
 
-        title, author = fetched
-        book = Book(title=title, author=author, isbn=isbn)
-        self.books.append(book)
-        self.save_books()
-        return True
+        Concurrent calls for the same ISBN share a single Open Library fetch
+        and only the first insert wins; the others get DUPLICATE. If Open
+        Library cannot be reached the result is UPSTREAM_ERROR, not NOT_FOUND.
+        """
+        if not Book._validate_isbn(isbn):
+            return AddResult.INVALID
+        with span("duplicate_check"):
+            existing = self.find_book(isbn)
+        if existing:
+            return AddResult.DUPLICATE
+
+        try:
+            with span("upstream_fetch"):
+                fetched = self._flight.do(normalize_isbn(isbn), lambda: self._fetch_book_from_open_library(isbn))
+        except UpstreamUnavailable:
+            return AddResult.UPSTREAM_ERROR
+        return self._insert(isbn, fetched)
+
+    async def add_book_by_isbn_async(self, isbn: str) -> bool:
+        """Same as add_book_by_isbn, but awaits the async Open Library client."""
+        return await self.add_book_result_async(isbn) is AddResult.CREATED
+
+    async def add_book_result_async(self, isbn: str) -> AddResult:
+        if not Book._validate_isbn(isbn):
+            return AddResult.INVALID
+        with span("duplicate_check"):
+            await self.sync_async()
+            existing = self.books.get(isbn)
+        if existing:
+            return AddResult.DUPLICATE
+
+        try:
+            with span("upstream_fetch"):
+                fetched = await self._async_flight.do(normalize_isbn(isbn),
+                                                      lambda: self.open_library.fetch_book_async(isbn))
+        except UpstreamUnavailable:
+            return AddResult.UPSTREAM_ERROR
+        # Kilitler ve depolama yazımı olay döngüsünü bekletmesin
+        return await asyncio.to_thread(self._insert, isbn, fetched)
 
     def add_book(self, isbn: str) -> bool:
         return self.add_book_by_isbn(isbn)
 
+    def add_books_by_isbn(self, isbns: Iterable[str]) -> Dict[str, AddResult]:
+        """Adds many ISBNs using batched Open Library lookups and a single write.
+
+        Invalid ISBNs and ISBNs already in the catalog (or repeated in the
+        input) are not fetched. Returns the outcome for each given ISBN.
+        """
+        self.sync()
+        results, pending = self._plan_batch(isbns)
+        with span("upstream_fetch"):
+            fetched = self.open_library.fetch_books(pending.values())
+        self._apply_batch(results, pending, fetched)
+        return results
+
+    async def add_books_by_isbn_async(self, isbns: Iterable[str],
+                                      concurrency: int = 4) -> Dict[str, AddResult]:
+        """Async variant of add_books_by_isbn with at most ``concurrency``
+        Open Library requests in flight; the write runs in a worker thread.
+        """
+        await self.sync_async()
+        results, pending = self._plan_batch(isbns)
+        with span("upstream_fetch"):
+            fetched = await self.open_library.fetch_books_async(pending.values(), concurrency=concurrency)
+        await asyncio.to_thread(self._apply_batch, results, pending, fetched)
+        return results
+
+    def import_books(self, books: Iterable[Book], chunk_size: int = 10_000) -> int:
+        """Adds already-resolved books (e.g. from a dump) without any network
+        call, persisting one ``record_add_many`` per chunk. Books already in
+        the catalog are skipped; returns the number added.
+
+        Chunks grow with the catalog: a chunk may make the journal compact,
+        which rewrites the whole catalog, so fixed-size chunks would make a
+        large import quadratic.
+        """
+        added_total = 0
+        iterator = iter(books)
+        while True:
+            chunk = list(islice(iterator, max(chunk_size, len(self.books))))
+            if not chunk:
+                return added_total
+            with self._writing(book.isbn for book in chunk):
+                added: List[Book] = []
+                with self._lock.write(), _gc_paused():
+                    for book in chunk:
+                        if self.books.get(book.isbn) is None:
+                            self.books.append(book)
+                            added.append(book)
+                    self.changes.record_add_many(added)
+                if added:
+                    with self._lock.read(), self.metrics.storage_timer("record_add_many", self.storage):
+                        self.storage.record_add_many(added, self.books)
+            added_total += len(added)
+
     def remove_book(self, isbn: str) -> bool:
-        book = self.find_book(isbn)
-        if book:
-            self.books.remove(book)
-            self.save_books()
-            return True
-        return False
+        with self._writing([isbn]):
+            with self._lock.write():
+                book = self.books.pop(isbn)
+                if book is not None:
+                    self.changes.record_remove(book.isbn)
+            if book is None:
+                return False
+            with self._lock.read(), self.metrics.storage_timer("record_remove", self.storage):
+                self.storage.record_remove(book.isbn, self.books)
+        return True
 
     def list_books(self) -> List[Book]:
-        return self.books.copy()
+        self.sync()
+        with self._lock.read():
+            return self.books.copy()
 
     def find_book(self, isbn: str) -> Optional[Book]:
-        for book in self.books:
-            if book.isbn == isbn:
-                return book
-        return None
+        self.sync()
+        return self.books.get(isbn)
+
+    def count_books(self) -> int:
+        self.sync()
+        return len(self.books)
+
+    @property
+    def version(self) -> int:
+        """Catalog version; changes on every add and remove (and on reload)."""
+        self.sync()
+        return self.books.version
+
+    def sync(self) -> None:
+        """Picks up changes other processes made to shared storage.
+
+        Costs one ``has_changes`` check when nothing changed; otherwise the
+        new journal records are applied to the in-memory catalog (or it is
+        reloaded after another process compacted the journal).
+        """
+        if self.storage.has_changes():
+            with self._persist_lock, self.storage.locked():
+                self._catch_up()
+
+    async def sync_async(self) -> None:
+        """Like ``sync`` for coroutines: only the ``has_changes`` check runs
+        on the event loop; catching up (storage lock, journal replay or
+        reload) happens in a worker thread.
+        """
+        if self.storage.has_changes():
+            await asyncio.to_thread(self.sync)
+
+    def page_books(self, after: Optional[str] = None, offset: int = 0, limit: int = 100) -> List[Book]:
+        """One page of books in normalized-ISBN order; see BookCatalog.page."""
+        self.sync()
+        with self._lock.read():
+            return self.books.page(after=after, offset=offset, limit=limit)
+
+    def page_books_by_title(self, after: Optional[SortKey] = None, offset: int = 0,
+                            limit: int = 100) -> List[Book]:
+        """One page of books in case-insensitive title order.
+
+        ``after`` is a (folded title, ISBN key) cursor, see catalog_indexes.title_cursor.
+        """
+        self.sync()
+        books, (titles,) = self._indexed_catalog("title_index")
+        with self._lock.read():
+            return self._resolve(books, titles.page(after=after, offset=offset, limit=limit))
+
+    def books_by_author(self, name: str, after: Optional[SortKey] = None, offset: int = 0,
+                        limit: int = 100) -> List[Book]:
+        """One page of an author's books in title order; co-authored books are included."""
+        self.sync()
+        books, (authors,) = self._indexed_catalog("author_index")
+        with self._lock.read():
+            return self._resolve(books, authors.page(name, after=after, offset=offset, limit=limit))
+
+    def count_books_by_author(self, name: str) -> int:
+        self.sync()
+        _, (authors,) = self._indexed_catalog("author_index")
+        return authors.count(name)
+
+    def iter_books(self, chunk_size: int = 1000) -> Iterator[Book]:
+        """Yields every book in ISBN order, one page at a time.
+
+        Only ``chunk_size`` books are materialized at once, and concurrent
+        adds/removes do not break the iteration.
+        """
+        after: Optional[str] = None
+        while True:
+            page = self.page_books(after=after, limit=chunk_size)
+            yield from page
+            if len(page) < chunk_size:
+                return
+            after = page[-1].isbn
+
+    def search_books(self, query: str, limit: int = 20) -> List[Book]:
+        """Finds books whose title or author words start with every query term."""
+        self.sync()
+        books, (index, titles) = self._indexed_catalog("search_index", "title_index")
+        with self._lock.read():
+            return index.search(query, books.get, limit=limit, titles=titles)
+
+    def build_indexes(self) -> None:
+        """Builds the search, title-order and author indexes of the current
+        catalog now instead of on first use, then ranks every short search
+        prefix (see SearchIndex.prepare). Requests needing an index meanwhile
+        wait for it instead of building it themselves.
+        """
+        books, (index, titles, _) = self._indexed_catalog("search_index", "title_index", "author_index")
+        with self._lock.read():
+            prefixes = index.all_short_prefixes()
+        for prefix in prefixes:
+            # Önek başına kısa bir okuma kilidi: yazıcılar arada ilerler
+            with self._lock.read():
+                if self.books is not books:
+                    return
+                index.prepare(prefix, books.get, titles)
+
+    def build_indexes_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.build_indexes, name="library-indexes", daemon=True)
+        thread.start()
+        return thread
 
     def load_books(self) -> None:
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    self.books = []
-                    for book_data in data:
-                        self.books.append(create_book_from_dict(book_data))
-            except (json.JSONDecodeError, FileNotFoundError):
-                self.books = []
-        else:
-            self.books = []
+        with _gc_paused(), self.metrics.storage_timer("load", self.storage):
+            books = self.storage.load()
+        with self._lock.write():
+            self.books = books
+            self.changes.reset()
+        if self._indexed:
+            self.build_indexes_in_background()
 
     def save_books(self) -> None:
-        data = []
-        for book in self.books:
-            data.append(book.to_dict())
-        with open(self.filename, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
-
-    def _fetch_book_from_open_library(self, isbn: str) -> Optional[tuple[str, str]]:
-        base_url = f"https://openlibrary.org/isbn/{isbn}.json"
-        try:
-            headers = {
-                "User-Agent": "python-202-library-api/1.0",
-                "Accept": "application/json",
-            }
-            with httpx.Client(timeout=10.0, headers=headers, follow_redirects=True) as client:
-                resp = client.get(base_url)
-                if resp.status_code == 404:
-                    return None
-                resp.raise_for_status()
-                try:
-                    data = resp.json()
-                except json.JSONDecodeError:
-                    return None
-
-                title = data.get("title")
-                authors_field = data.get("authors", [])
-
-                authors: List[str] = []
-                for a in authors_field:
-                    key = a.get("key")
-                    if not key:
-                        continue
-                    a_resp = client.get(f"https://openlibrary.org{key}.json")
-                    if a_resp.status_code == 404:
-                        continue
-                    try:
-                        a_resp.raise_for_status()
-                        a_data = a_resp.json()
-                        name = a_data.get("name")
-                        if name:
-                            authors.append(name)
-                    except (httpx.HTTPError, json.JSONDecodeError):
+        """Writes a full snapshot of the catalog through the storage backend."""
+        with self._writing(), self._lock.read(), self.metrics.storage_timer("save", self.storage):
+            self.storage.save(self.books)
+
+    def close(self) -> None:
+        self.storage.close()
+        self.open_library.close()
+
+    async def aclose(self) -> None:
+        """close() for coroutines: also closes the async Open Library client,
+        which has to happen on the event loop it was used on.
+        """
+        await self.open_library.aclose()
+        await asyncio.to_thread(self.close)
+
+    @contextmanager
+    def _writing(self, isbns: Optional[Iterable[str]] = None) -> Iterator[None]:
+        """Serializes writers in this process and, for shared storage, across
+        processes; the catalog is brought up to date before the caller
+        changes it.
+
+        A writer that only touches ``isbns`` on partitioned storage locks
+        just the parts holding them (``storage.locked_for``) instead of
+        ``_persist_lock`` and the whole storage.
+        """
+        if isbns is not None and self.storage.partitioned:
+            with self.storage.locked_for(isbns):
+                self._catch_up()
+                yield
+            return
+        with self._persist_lock, self.storage.locked():
+            self._catch_up()
+            yield
+
+    def _catch_up(self) -> None:
+        if not self.storage.has_changes():
+            return
+        with self._lock.write():
+            with self.metrics.storage_timer("refresh", self.storage):
+                refreshed = self.storage.refresh(self.books, self.changes)
+            if not refreshed:
+                with _gc_paused(), self.metrics.storage_timer("load", self.storage):
+                    self.books = self.storage.load()
+                # Yeniden yüklenen katalogun hangi kayıtlarla değiştiği bilinmiyor
+                self.changes.reset()
+                if self._indexed:
+                    self.build_indexes_in_background()
+
+    def _indexed_catalog(self, *names: str) -> Tuple[BookCatalog, List[CatalogIndex]]:
+        """Returns the current catalog and the named indexes (``search_index``,
+        ``title_index``, ``author_index``) attached to it.
+
+        A missing index is built on first use, unless ``build_indexes`` got
+        to it first; after a reload of a catalog that had indexes they are
+        rebuilt in the background. An index is filled from a copy of the catalog without holding the catalog
+        lock, so adds and reads go on meanwhile; the write lock is only
+        taken to apply the changes made during the build and attach it.
+        """
+        books = self.books
+        indexed = [self._indexed.get(name) for name in names]
+        if all(entry is not None and entry[0] is books for entry in indexed):
+            return books, [entry[1] for entry in indexed]
+        with self._index_build_lock:
+            books = self.books
+            indexes = []
+            for name in names:
+                entry = self._indexed.get(name)
+                indexes.append(entry[1] if entry is not None and entry[0] is books
+                               else self._build_index(books, name))
+        return books, indexes
+
+    def _build_index(self, books: BookCatalog, name: str) -> CatalogIndex:
+        with self._lock.read():
+            entries = books.entries()
+        index = type(getattr(self, name))()
+        with _gc_paused():
+            for key, book in entries.items():
+                index.add(key, book)
+        with self._lock.write():
+            books.attach_index(index, entries)
+        setattr(self, name, index)
+        self._indexed[name] = (books, index)
+        return index
+
+    def _resolve(self, books: BookCatalog, keys: List[str]) -> List[Book]:
+        return [book for book in map(books.get, keys) if book is not None]
+
+    def _plan_batch(self, isbns: Iterable[str]):
+        """Splits input ISBNs into final results (invalid, duplicate) and the
+        ISBNs still to fetch, keyed by normalized ISBN. The caller syncs
+        first; lookups here go straight to the catalog.
+        """
+        results: Dict[str, AddResult] = {}
+        pending: Dict[str, str] = {}
+        with span("duplicate_check"):
+            for isbn in isbns:
+                if isbn in results:
+                    continue
+                if not Book._validate_isbn(isbn):
+                    results[isbn] = AddResult.INVALID
+                elif self.books.get(isbn) is not None or normalize_isbn(isbn) in pending:
+                    results[isbn] = AddResult.DUPLICATE
+                else:
+                    pending[normalize_isbn(isbn)] = isbn
+                    results[isbn] = AddResult.NOT_FOUND
+        return results, pending
+
+    def _apply_batch(self, results: Dict[str, AddResult], pending: Dict[str, str],
+                     fetched: Dict[str, Optional[BookMetadata]]) -> None:
+        """Inserts fetched books atomically and persists them with one write.
+
+        ISBNs added by someone else since planning are reported as DUPLICATE,
+        ISBNs Open Library could not answer for as UPSTREAM_ERROR.
+        """
+        for isbn in pending.values():
+            if isbn not in fetched:
+                results[isbn] = AddResult.UPSTREAM_ERROR
+        candidates = [Book(title=fetched[isbn][0], author=fetched[isbn][1], isbn=isbn)
+                      for isbn in pending.values() if fetched.get(isbn)]
+        with span("save"), self._writing(book.isbn for book in candidates):
+            added: List[Book] = []
+            with self._lock.write():
+                for book in candidates:
+                    if self.books.get(book.isbn) is not None:
+                        results[book.isbn] = AddResult.DUPLICATE
                         continue
+                    self.books.append(book)
+                    added.append(book)
+                    results[book.isbn] = AddResult.CREATED
+                self.changes.record_add_many(added)
+            if added:
+                with self._lock.read(), self.metrics.storage_timer("record_add_many", self.storage):
+                    self.storage.record_add_many(added, self.books)
 
-                author_joined = ", ".join(authors) if authors else ""
+    def _insert(self, isbn: str, fetched: Optional[BookMetadata]) -> AddResult:
+        if not fetched:
+            return AddResult.NOT_FOUND
+
+        title, author = fetched
+        book = Book(title=title, author=author, isbn=isbn)
+        with span("save"), self._writing([isbn]):
+            with self._lock.write():
+                if self.books.get(isbn) is not None:
+                    return AddResult.DUPLICATE
+                self.books.append(book)
+                self.changes.record_add(book)
+            with self._lock.read(), self.metrics.storage_timer("record_add", self.storage):
+                self.storage.record_add(book, self.books)
+        return AddResult.CREATED
 
-                if not title:
-                    return None
-                return title, author_joined
-        except httpx.HTTPStatusError:
-            return None
-        except httpx.RequestError:
-            return None
+    def _fetch_book_from_open_library(self, isbn: str) -> Optional[BookMetadata]:
+        return self.open_library.fetch_book(isbn)
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from services.storage import write_json_atomic
+
+# Sentinel for "not cached"; a cached None means "known not to exist" (404).
+MISSING = object()
+
+
+class MetadataCache:
+    """LRU cache with TTLs for Open Library records, including negative results.
+
+    Values are JSON-serializable (lists are returned as tuples). Positive
+    entries live for ``ttl`` seconds, cached 404s (value ``None``) for the
+    shorter ``negative_ttl``. With ``path`` set, entries are loaded on
+    start-up, so a restarted process starts warm. A background thread writes
+    them back (compact JSON, atomically) every ``save_interval`` seconds if
+    anything changed, and ``close()`` saves once more; ``put`` itself never
+    touches the disk, so request handlers and the event loop do not wait
+    for a rewrite of the whole cache.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 24 * 3600,
+                 negative_ttl: float = 600, path: Optional[str] = None,
+                 save_interval: float = 30.0, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = path
+        self.save_interval = save_interval
+        self.clock = clock
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._saver: Optional[threading.Thread] = None
+        if path:
+            self._load()
+            if save_interval > 0:
+                self._saver = threading.Thread(target=self._save_periodically, name="metadata-cache-saver",
+                                               daemon=True)
+                self._saver.start()
+
+    def get(self, key: str) -> Any:
+        """Returns the cached value (possibly None) or MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            if entry[1] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        ttl = self.negative_ttl if value is None else self.ttl
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+
+    def put_many(self, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None) -> int:
+        """Bulk store (e.g. seeding from a dump) with a single save at the end.
+
+        ``ttl`` overrides the positive-entry TTL so seeded records can outlive
+        the usual fetch TTL; the LRU bound still applies.
+        """
+        count = 0
+        with self._lock:
+            now = self.clock()
+            for key, value in items:
+                entry_ttl = self.negative_ttl if value is None else (self.ttl if ttl is None else ttl)
+                self._entries[key] = (now + entry_ttl, value)
+                self._entries.move_to_end(key)
+                count += 1
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._unsaved += count
+        self.save()
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+            }
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        # Eşzamanlı iki kayıtta eski kopyanın yenisinin üzerine yazılmaması için sıralanır
+        with self._save_lock:
+            with self._lock:
+                now = self.clock()
+                data = {key: [expires, value] for key, (expires, value) in self._entries.items() if expires > now}
+                self._unsaved = 0
+            write_json_atomic(self.path, data, compact=True)
+
+    def close(self) -> None:
+        self._stopping.set()
+        if self._saver is not None:
+            self._saver.join()
+            self._saver = None
+        self.save()
+
+    def _save_periodically(self) -> None:
+        while not self._stopping.wait(self.save_interval):
+            if self._unsaved:
+                self.save()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (json.JSONDecodeError, OSError):
+            return
+        now = self.clock()
+        for key, (expires, value) in sorted(data.items(), key=lambda item: item[1][0]):
+            if expires > now:
+                self._entries[key] = (expires, tuple(value) if isinstance(value, list) else value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,191 @@
+"""Latency histograms and gauges exposed in the Prometheus text format.
+
+Written against the exposition format directly instead of pulling in
+prometheus_client: the service only needs histograms and gauges. A
+``Metrics(enabled=False)`` instance (``NO_METRICS``) is the default
+everywhere; its methods return before reading the clock or taking a lock.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Saniye cinsinden; önbellekten dönen isteklerden büyük bir snapshot yazımına kadar
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total, count)
+                              for labels, (counts, total, count) in self._series.items())
+        for labels, counts, total, count in snapshot:
+            pairs = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {count}")
+        return lines
+
+
+class Gauge:
+    """Last-value gauge; an unlabeled gauge may instead read a function at scrape time."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def value(self, *labels: str) -> Optional[float]:
+        if self._function is not None and not labels:
+            return self._function()
+        return self._values.get(labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        if self._function is not None:
+            lines.append(f"{self.name} {_number(self._function())}")
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(list(zip(self.labelnames, labels)))} {_number(value)}")
+        return lines
+
+
+class Metrics:
+    """The instruments of this service.
+
+    - ``library_http_request_duration_seconds{method, route, status}``: per
+      route template, so ``/books/{isbn}`` is one series
+    - ``library_upstream_request_duration_seconds{kind, status}``: every Open
+      Library call; kind is isbn, author or batch, status the HTTP code or
+      ``error`` for connection failures and timeouts
+    - ``library_storage_operation_duration_seconds{operation, backend}`` and
+      ``library_storage_size_bytes{backend}``: load/save/record_* calls and
+      the on-disk size afterwards
+    - ``library_catalog_books``: books in the in-memory catalog
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.http_requests = Histogram(
+            "library_http_request_duration_seconds", "HTTP request latency by route.",
+            ("method", "route", "status"))
+        self.upstream_requests = Histogram(
+            "library_upstream_request_duration_seconds", "Open Library request latency.",
+            ("kind", "status"))
+        self.storage_operations = Histogram(
+            "library_storage_operation_duration_seconds", "Storage backend call duration.",
+            ("operation", "backend"))
+        self.storage_size = Gauge(
+            "library_storage_size_bytes", "Size of the data files after the last storage call.",
+            ("backend",))
+        self.catalog_books = Gauge("library_catalog_books", "Books in the in-memory catalog.")
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        if self.enabled:
+            self.http_requests.observe(seconds, method, route, str(status))
+
+    def observe_upstream(self, kind: str, status: str, seconds: float) -> None:
+        if self.enabled:
+            self.upstream_requests.observe(seconds, kind, status)
+
+    def storage_timer(self, operation: str, storage):
+        """Context manager timing one storage call; a shared no-op when disabled."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StorageTimer(self, operation, storage)
+
+    def track_catalog(self, size: Callable[[], int]) -> None:
+        if self.enabled:
+            self.catalog_books.set_function(size)
+
+    def render(self) -> str:
+        families = (self.http_requests, self.upstream_requests, self.storage_operations,
+                    self.storage_size, self.catalog_books)
+        return "\n".join(line for family in families for line in family.render()) + "\n"
+
+
+NO_METRICS = Metrics(enabled=False)
+
+
+class _StorageTimer:
+    def __init__(self, metrics: Metrics, operation: str, storage):
+        self.metrics = metrics
+        self.operation = operation
+        self.storage = storage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        backend = type(self.storage).__name__
+        self.metrics.storage_operations.observe(time.perf_counter() - self.start, self.operation, backend)
+        self.metrics.storage_size.set(_storage_size(self.storage), backend)
+
+
+def _storage_size(storage) -> int:
+    shards = getattr(storage, "shards", None)
+    if shards:
+        return sum(map(_storage_size, shards))
+    size = 0
+    for path in (storage.path, getattr(storage, "journal_path", None)):
+        try:
+            size += os.path.getsize(path) if path else 0
+        except OSError:
+            pass
+    return size
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(value) if isinstance(value, int) else repr(value)
@@ -0,0 +1,535 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from models.book_model import normalize_isbn
+from services.metadata_cache import MISSING, MetadataCache
+from services.metrics import NO_METRICS, Metrics
+from services.profiling import span
+from services.resilience import CircuitBreaker, Deadline, RetryPolicy, UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+OPEN_LIBRARY_URL = "https://openlibrary.org"
+
+HEADERS = {
+    "User-Agent": "python-202-library-api/1.0",
+    "Accept": "application/json",
+}
+
+# (title, comma-joined author names)
+BookMetadata = Tuple[str, str]
+
+# Geçici sayılan yanıtlar; 404 ve diğer 4xx'ler tekrar denenmez
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class OpenLibraryClient:
+    """Long-lived, connection-pooled client for the Open Library API.
+
+    The sync ``httpx.Client`` is created on first use and reused for every
+    ISBN and author request, so keep-alive connections skip TCP/TLS setup.
+    ``fetch_book_async`` uses an ``httpx.AsyncClient`` and resolves all
+    author keys of a book concurrently. ``fetch_books`` resolves many ISBNs
+    through the multi-bibkey ``/api/books`` endpoint, ``batch_size`` at a time.
+
+    With a ``cache`` every resolved ISBN and ``/authors/*`` record (and every
+    404) is remembered, so repeated lookups need no network call. Every
+    request is timed into ``metrics`` by kind (isbn, author, batch) and status.
+
+    Failure handling: one ISBN lookup and its author lookups share a
+    ``deadline`` budget (seconds, None for unlimited); each request gets at
+    most ``timeout`` of it. Transport errors and RETRYABLE_STATUSES are
+    retried per ``retry`` with jittered backoff while the budget allows.
+    ``breaker`` rejects calls while Open Library keeps failing. With
+    ``hedge_after`` set, a request still unanswered after that many seconds
+    is sent a second time and the first answer wins. When no usable answer
+    can be obtained, ``fetch_book`` raises UpstreamUnavailable instead of
+    returning None, which stays reserved for "no such book".
+    """
+
+    def __init__(self, base_url: str = OPEN_LIBRARY_URL, timeout: float = 10.0,
+                 max_connections: int = 20, batch_size: int = 50,
+                 cache: Optional[MetadataCache] = None, metrics: Metrics = NO_METRICS,
+                 deadline: Optional[float] = None, retry: RetryPolicy = RetryPolicy(),
+                 breaker: Optional[CircuitBreaker] = None, hedge_after: Optional[float] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.cache = cache
+        self.metrics = metrics
+        self.deadline = deadline
+        self.retry = retry
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_after = hedge_after
+        self.hedges = 0
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self.max_connections = max_connections
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_connections)
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def fetch_book(self, isbn: str) -> Optional[BookMetadata]:
+        """Returns (title, authors) for an ISBN, or None if Open Library has no
+        such book; raises UpstreamUnavailable if Open Library cannot be reached.
+        """
+        cached = self._cache_get(self._isbn_key(isbn))
+        if cached is not MISSING:
+            return cached
+        return self._fetch_book_remote(isbn)
+
+    async def fetch_book_async(self, isbn: str) -> Optional[BookMetadata]:
+        """Async variant of fetch_book; author lookups run concurrently."""
+        cached = self._cache_get(self._isbn_key(isbn))
+        if cached is not MISSING:
+            return cached
+        return await self._fetch_book_remote_async(isbn)
+
+    def fetch_books(self, isbns: Iterable[str],
+                    batch_size: Optional[int] = None) -> Dict[str, Optional[BookMetadata]]:
+        """Resolves many ISBNs with one ``/api/books`` request per batch.
+
+        ISBNs missing from a batch response (or from a failed batch) fall back
+        to the per-ISBN ``fetch_book`` path. Keys of the result are the ISBNs
+        exactly as given; ISBNs that failed with UpstreamUnavailable are left out.
+        """
+        results, remaining = self._split_cached(isbns)
+        for chunk in self._chunks(remaining, batch_size):
+            found = self._fetch_batch(chunk)
+            for isbn in chunk:
+                if isbn in found:
+                    results[isbn] = found[isbn]
+                    continue
+                try:
+                    results[isbn] = self._fetch_book_remote(isbn)
+                except UpstreamUnavailable:
+                    pass
+        return results
+
+    async def fetch_books_async(self, isbns: Iterable[str], batch_size: Optional[int] = None,
+                                concurrency: int = 4) -> Dict[str, Optional[BookMetadata]]:
+        """Async variant of fetch_books.
+
+        Batches and per-ISBN fallbacks run concurrently, with at most
+        ``concurrency`` requests to Open Library in flight at once.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def limited(fetch, arg):
+            async with semaphore:
+                return await fetch(arg)
+
+        async def resolve(chunk: List[str]) -> Dict[str, Optional[BookMetadata]]:
+            found: Dict[str, Optional[BookMetadata]] = dict(await limited(self._fetch_batch_async, chunk))
+            misses = [isbn for isbn in chunk if isbn not in found]
+            fetched = await asyncio.gather(*(limited(self._fetch_book_remote_async, isbn) for isbn in misses),
+                                           return_exceptions=True)
+            for isbn, result in zip(misses, fetched):
+                if isinstance(result, UpstreamUnavailable):
+                    continue
+                if isinstance(result, BaseException):
+                    raise result
+                found[isbn] = result
+            return found
+
+        results, remaining = self._split_cached(isbns)
+        for found in await asyncio.gather(*map(resolve, self._chunks(remaining, batch_size))):
+            results.update(found)
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=False)
+                self._hedge_pool = None
+        if self.cache is not None:
+            self.cache.close()
+
+    async def aclose(self) -> None:
+        """Closes the async client; call it on the event loop that used the
+        client, before that loop ends (its connections belong to it).
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+
+    def _get_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(timeout=self.timeout, headers=HEADERS,
+                                            follow_redirects=True, limits=self.limits)
+            return self._client
+
+    def _discard_async_client(self) -> None:
+        """Closes the client of a previous event loop on that loop."""
+        client, loop = self._async_client, self._async_loop
+        self._async_client = None
+        self._async_loop = None
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            # Kapanmış bir loop'un bağlantıları başka bir loop'tan kapatılamaz
+            logger.warning("Open Library async istemcisi aclose() çağrılmadan bırakıldı; "
+                           "bağlantıları açık kalabilir")
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # AsyncClient bağlantıları oluşturuldukları event loop'a bağlıdır;
+        # loop değişirse (ör. testlerde) yeni bir istemci açılır.
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_loop is not loop:
+            self._discard_async_client()
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout, headers=HEADERS,
+                                                   follow_redirects=True, limits=self.limits)
+            self._async_loop = loop
+        return self._async_client
+
+    def _fetch_book_remote(self, isbn: str) -> Optional[BookMetadata]:
+        client = self._get_client()
+        deadline = Deadline(self.deadline)
+        try:
+            resp = self._get(client, "isbn", self._isbn_url(isbn), deadline)
+            data = self._parse_json(resp)
+            if data is None:
+                self._cache_not_found(self._isbn_key(isbn), resp)
+                return None
+
+            authors: List[str] = []
+            with span("author_resolution"):
+                for key in self._author_keys(data):
+                    name = self._fetch_author(client, key, deadline)
+                    if name:
+                        authors.append(name)
+        except httpx.HTTPStatusError:
+            return None
+        return self._cache_put(self._isbn_key(isbn), self._metadata(data, authors))
+
+    async def _fetch_book_remote_async(self, isbn: str) -> Optional[BookMetadata]:
+        client = self._get_async_client()
+        deadline = Deadline(self.deadline)
+        try:
+            resp = await self._get_async(client, "isbn", self._isbn_url(isbn), deadline)
+            data = self._parse_json(resp)
+            if data is None:
+                self._cache_not_found(self._isbn_key(isbn), resp)
+                return None
+
+            with span("author_resolution"):
+                names = await asyncio.gather(
+                    *(self._fetch_author_async(client, key, deadline) for key in self._author_keys(data))
+                )
+        except httpx.HTTPStatusError:
+            return None
+        return self._cache_put(self._isbn_key(isbn), self._metadata(data, [n for n in names if n]))
+
+    def _fetch_author(self, client: httpx.Client, key: str, deadline: Deadline) -> Optional[str]:
+        cached = self._cache_get(self._author_key(key))
+        if cached is not MISSING:
+            return cached
+        return self._store_author(key, self._get(client, "author", self._author_url(key), deadline))
+
+    async def _fetch_author_async(self, client: httpx.AsyncClient, key: str,
+                                  deadline: Deadline) -> Optional[str]:
+        cached = self._cache_get(self._author_key(key))
+        if cached is not MISSING:
+            return cached
+        return self._store_author(key, await self._get_async(client, "author", self._author_url(key), deadline))
+
+    def _store_author(self, key: str, resp) -> Optional[str]:
+        name = self._parse_author(resp)
+        if name:
+            self._cache_put(self._author_key(key), name)
+        else:
+            self._cache_not_found(self._author_key(key), resp)
+        return name
+
+    def _fetch_batch(self, chunk: List[str]) -> Dict[str, BookMetadata]:
+        try:
+            resp = self._get(self._get_client(), "batch", self._batch_url(), Deadline(self.deadline),
+                             params=self._batch_params(chunk))
+            return self._cache_batch(self._parse_batch(resp, chunk))
+        except (httpx.HTTPStatusError, UpstreamUnavailable):
+            return {}
+
+    async def _fetch_batch_async(self, chunk: List[str]) -> Dict[str, BookMetadata]:
+        try:
+            resp = await self._get_async(self._get_async_client(), "batch", self._batch_url(),
+                                         Deadline(self.deadline), params=self._batch_params(chunk))
+            return self._cache_batch(self._parse_batch(resp, chunk))
+        except (httpx.HTTPStatusError, UpstreamUnavailable):
+            return {}
+
+    def _get(self, client: httpx.Client, kind: str, url: str, deadline: Deadline, **kwargs) -> httpx.Response:
+        """One logical GET: guarded by the breaker, retried within ``deadline``,
+        optionally hedged. Returns the first non-retryable response.
+        """
+        attempt = 0
+        while True:
+            timeout = deadline.timeout(self.timeout)
+            probe = self.breaker.check()
+            error: Optional[Exception] = None
+            try:
+                resp = self._send(client, kind, url, timeout, **kwargs)
+            except httpx.TransportError as exc:
+                error = exc
+            except httpx.RequestError as exc:
+                self.breaker.record_failure()
+                raise UpstreamUnavailable(str(exc)) from exc
+            except BaseException:
+                # İptal (hedge, deadline) veya beklenmeyen hata: sonuç kaydedilmedi, deneme hakkı bırakılır
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            else:
+                if resp.status_code not in RETRYABLE_STATUSES:
+                    self._record_outcome(resp)
+                    return resp
+            attempt += 1
+            time.sleep(self._backoff(attempt, deadline, kind, error))
+
+    async def _get_async(self, client: httpx.AsyncClient, kind: str, url: str, deadline: Deadline,
+                         **kwargs) -> httpx.Response:
+        attempt = 0
+        while True:
+            timeout = deadline.timeout(self.timeout)
+            probe = self.breaker.check()
+            error: Optional[Exception] = None
+            try:
+                resp = await self._send_async(client, kind, url, timeout, **kwargs)
+            except httpx.TransportError as exc:
+                error = exc
+            except httpx.RequestError as exc:
+                self.breaker.record_failure()
+                raise UpstreamUnavailable(str(exc)) from exc
+            except BaseException:
+                # İptal (hedge, deadline) veya beklenmeyen hata: sonuç kaydedilmedi, deneme hakkı bırakılır
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            else:
+                if resp.status_code not in RETRYABLE_STATUSES:
+                    self._record_outcome(resp)
+                    return resp
+            attempt += 1
+            await asyncio.sleep(self._backoff(attempt, deadline, kind, error))
+
+    def _record_outcome(self, resp: httpx.Response) -> None:
+        # Tekrar denenmeyen 5xx de Open Library hatasıdır, devre kesiciye başarı sayılmaz
+        if resp.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _backoff(self, attempt: int, deadline: Deadline, kind: str, error: Optional[Exception]) -> float:
+        """Records a failed attempt; returns the delay before the next one or
+        raises UpstreamUnavailable when no retry is left or fits the budget.
+        """
+        self.breaker.record_failure()
+        delay = self.retry.delay(attempt)
+        if attempt >= self.retry.attempts or delay >= deadline.remaining():
+            raise UpstreamUnavailable(f"Open Library yanıt vermedi ({kind})") from error
+        return delay
+
+    def _send(self, client: httpx.Client, kind: str, url: str, timeout: float, **kwargs) -> httpx.Response:
+        if self.hedge_after is None or timeout <= self.hedge_after:
+            return self._request(client, kind, url, timeout=timeout, **kwargs)
+
+        pool = self._get_hedge_pool()
+        first = pool.submit(self._request, client, kind, url, timeout=timeout, **kwargs)
+        try:
+            return first.result(timeout=self.hedge_after)
+        except FutureTimeout:
+            pass
+        # İlk istek geç kaldı: ikincisi gönderilir, hangisi önce dönerse o kullanılır
+        self.hedges += 1
+        second = pool.submit(self._request, client, kind, url, timeout=timeout - self.hedge_after, **kwargs)
+        error: Optional[Exception] = None
+        for future in as_completed((first, second)):
+            try:
+                return future.result()
+            except httpx.TransportError as exc:
+                error = exc
+        raise error
+
+    async def _send_async(self, client: httpx.AsyncClient, kind: str, url: str, timeout: float,
+                          **kwargs) -> httpx.Response:
+        if self.hedge_after is None or timeout <= self.hedge_after:
+            return await self._request_async(client, kind, url, timeout=timeout, **kwargs)
+
+        tasks = {asyncio.ensure_future(self._request_async(client, kind, url, timeout=timeout, **kwargs))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(
+                    self._request_async(client, kind, url, timeout=timeout - self.hedge_after, **kwargs)))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                    if not isinstance(error, httpx.TransportError):
+                        raise error
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self.max_connections,
+                                                      thread_name_prefix="open-library-hedge")
+            return self._hedge_pool
+
+    def _request(self, client: httpx.Client, kind: str, url: str, **kwargs) -> httpx.Response:
+        if not self.metrics.enabled:
+            return client.get(url, **kwargs)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            resp = client.get(url, **kwargs)
+            status = str(resp.status_code)
+            return resp
+        finally:
+            self.metrics.observe_upstream(kind, status, time.perf_counter() - start)
+
+    async def _request_async(self, client: httpx.AsyncClient, kind: str, url: str, **kwargs) -> httpx.Response:
+        if not self.metrics.enabled:
+            return await client.get(url, **kwargs)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            resp = await client.get(url, **kwargs)
+            status = str(resp.status_code)
+            return resp
+        finally:
+            self.metrics.observe_upstream(kind, status, time.perf_counter() - start)
+
+    def _split_cached(self, isbns: Iterable[str]):
+        """Returns (cached results, ISBNs still to fetch)."""
+        results: Dict[str, Optional[BookMetadata]] = {}
+        remaining: List[str] = []
+        for isbn in dict.fromkeys(isbns):
+            cached = self._cache_get(self._isbn_key(isbn))
+            if cached is MISSING:
+                remaining.append(isbn)
+            else:
+                results[isbn] = cached
+        return results, remaining
+
+    def _cache_get(self, key: str):
+        return self.cache.get(key) if self.cache is not None else MISSING
+
+    def _cache_put(self, key: str, value):
+        if self.cache is not None:
+            self.cache.put(key, value)
+        return value
+
+    def _cache_not_found(self, key: str, resp) -> None:
+        # Yalnızca gerçek 404'ler negatif önbelleğe alınır; 5xx/ağ hataları tekrar denenir
+        if resp.status_code == 404:
+            self._cache_put(key, None)
+
+    def _cache_batch(self, found: Dict[str, BookMetadata]) -> Dict[str, BookMetadata]:
+        for isbn, metadata in found.items():
+            self._cache_put(self._isbn_key(isbn), metadata)
+        return found
+
+    @staticmethod
+    def _isbn_key(isbn: str) -> str:
+        return f"isbn:{normalize_isbn(isbn)}"
+
+    @staticmethod
+    def _author_key(key: str) -> str:
+        return f"author:{key}"
+
+    def _chunks(self, isbns: Iterable[str], batch_size: Optional[int]) -> Iterable[List[str]]:
+        size = max(1, batch_size or self.batch_size)
+        chunk: List[str] = []
+        for isbn in dict.fromkeys(isbns):
+            chunk.append(isbn)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _batch_url(self) -> str:
+        return f"{self.base_url}/api/books"
+
+    @staticmethod
+    def _batch_params(chunk: List[str]) -> dict:
+        bibkeys = ",".join(f"ISBN:{normalize_isbn(isbn)}" for isbn in chunk)
+        return {"bibkeys": bibkeys, "jscmd": "data", "format": "json"}
+
+    @staticmethod
+    def _parse_batch(resp, chunk: List[str]) -> Dict[str, BookMetadata]:
+        """Maps the ``{"ISBN:<isbn>": {...}}`` response back onto the given ISBNs."""
+        data = OpenLibraryClient._parse_json(resp) or {}
+        found: Dict[str, BookMetadata] = {}
+        for isbn in chunk:
+            entry = data.get(f"ISBN:{normalize_isbn(isbn)}")
+            if not entry or not entry.get("title"):
+                continue
+            names = [a.get("name") for a in entry.get("authors", []) if a.get("name")]
+            found[isbn] = (entry["title"], ", ".join(names))
+        return found
+
+    def _isbn_url(self, isbn: str) -> str:
+        return f"{self.base_url}/isbn/{isbn}.json"
+
+    def _author_url(self, key: str) -> str:
+        return f"{self.base_url}{key}.json"
+
+    @staticmethod
+    def _parse_json(resp) -> Optional[dict]:
+        if resp.status_code == 404:
+            return None
+        if resp.status_code >= 500:
+            raise UpstreamUnavailable(f"Open Library hatası: HTTP {resp.status_code}")
+        resp.raise_for_status()
+        try:
+            return resp.json()
+        except json.JSONDecodeError:
+            return None
+
+    @staticmethod
+    def _author_keys(data: dict) -> List[str]:
+        return [a["key"] for a in data.get("authors", []) if a.get("key")]
+
+    @staticmethod
+    def _parse_author(resp) -> Optional[str]:
+        if resp.status_code == 404:
+            return None
+        if resp.status_code >= 500:
+            raise UpstreamUnavailable(f"Open Library hatası: HTTP {resp.status_code}")
+        try:
+            resp.raise_for_status()
+            return resp.json().get("name")
+        except (httpx.HTTPError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _metadata(data: dict, authors: List[str]) -> Optional[BookMetadata]:
+        title = data.get("title")
+        if not title:
+            return None
+        return title, ", ".join(authors)
@@ -0,0 +1,309 @@
+"""On-demand profiling hooks: request traces, cProfile and tracemalloc.
+
+Everything here is off unless ``LIBRARY_PROFILING=1``. A disabled
+``Profiler`` (``NO_PROFILER``) never creates a trace, so ``span`` finds no
+current trace and returns a shared no-op context manager; the instrumented
+code pays one context variable lookup. tracemalloc only runs while a memory
+window is open.
+
+The current trace lives in a context variable. Starlette's threadpool and
+``asyncio.to_thread`` copy the context, so spans recorded in worker threads
+land in the trace of the request that started them. A profiled request runs
+a cProfile profiler in each worker thread that executes one of its sync
+endpoints or spans; the per-thread profiles are merged when the request ends.
+Spans on the event loop thread are timed but not profiled, since other
+requests' coroutines run there while a span awaits.
+"""
+import asyncio
+import cProfile
+import functools
+import hmac
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Deque, Iterator, List, NamedTuple, Optional
+
+SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls", "time")
+
+_NULL_SPAN = nullcontext()
+_current: ContextVar[Optional["Trace"]] = ContextVar("library_trace", default=None)
+# Bir iş parçacığında aynı anda tek profil çalışabilir (sys.setprofile iş parçacığı başınadır)
+_thread = threading.local()
+
+
+class ProfilerBusy(Exception):
+    """Another profiling window of the same kind is already open."""
+
+
+class Span(NamedTuple):
+    name: str
+    start: float  # isteğin başından itibaren, sn
+    duration: float
+
+
+class Trace:
+    """Spans of one HTTP request; ``cpu`` is True when it is CPU-profiled."""
+
+    def __init__(self, method: str, path: str, cpu: bool = False, requested: bool = False,
+                 window: Optional["_CpuWindow"] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.status = 500
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Span] = []
+        self.cpu = cpu
+        self.requested = requested
+        self.window = window
+        self.profiles: List[cProfile.Profile] = []
+
+    def profiling(self):
+        """Runs the block under a CPU profiler in the current thread if this
+        trace is profiled and the thread is not profiling already.
+
+        Never on an event loop thread: a span there may ``await``, and the
+        profiler would record every other coroutine that runs meanwhile.
+        Async paths are profiled only in the worker threads they hand work to.
+        """
+        if not self.cpu or getattr(_thread, "profile", None) is not None or _on_event_loop():
+            return _NULL_SPAN
+        return self._profile_thread()
+
+    @contextmanager
+    def _profile_thread(self) -> Iterator[None]:
+        profile = cProfile.Profile()
+        _thread.profile = profile
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            _thread.profile = None
+            self.profiles.append(profile)
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "method": self.method, "path": self.path, "status": self.status,
+                "started_at": self.started_at, "duration": self.duration,
+                "spans": [span._asdict() for span in self.spans]}
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def span(name: str):
+    """Times a block as a span of the current request's trace; a shared
+    no-op outside traced requests.
+    """
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _timed(trace, name)
+
+
+@contextmanager
+def _timed(trace: Trace, name: str) -> Iterator[None]:
+    with trace.profiling():
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace.spans.append(Span(name, start - trace.start, time.perf_counter() - start))
+
+
+@contextmanager
+def tracing(trace: Trace) -> Iterator[Trace]:
+    """Makes ``trace`` the current trace for the block (and the threads it
+    hands work to).
+    """
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def profiled(endpoint):
+    """Wraps a sync route endpoint so a profiled request is also profiled in
+    the threadpool thread that runs the endpoint.
+    """
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        trace = _current.get()
+        if trace is None:
+            return endpoint(*args, **kwargs)
+        with trace.profiling():
+            return endpoint(*args, **kwargs)
+    return wrapper
+
+
+class Profiler:
+    """Request traces and profiling windows of this process.
+
+    - Requests slower than ``slow_threshold`` seconds keep their trace; the
+      last ``max_traces`` are returned by ``slow_traces``.
+    - A request sent with ``X-Profile: cpu`` and the admin token is
+      CPU-profiled; its stats stay available under the trace id (the last
+      ``max_profiles`` of them).
+    - ``profile_cpu`` profiles every request that starts within a window,
+      ``trace_memory`` diffs two tracemalloc snapshots taken around one.
+
+    Admin endpoints need ``admin_token``; without one they stay closed.
+    """
+
+    def __init__(self, enabled: bool = True, admin_token: Optional[str] = None,
+                 slow_threshold: float = 1.0, max_traces: int = 100, max_profiles: int = 20):
+        self.enabled = enabled
+        self.admin_token = admin_token
+        self.slow_threshold = slow_threshold
+        self.max_profiles = max_profiles
+        self._slow: Deque[Trace] = deque(maxlen=max_traces)
+        self._profiles: "OrderedDict[str, pstats.Stats]" = OrderedDict()
+        self._window: Optional[_CpuWindow] = None
+        self._tracing_memory = False
+        self._lock = threading.Lock()
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        if not self.enabled or not self.admin_token or token is None:
+            return False
+        return hmac.compare_digest(token.encode("utf-8"), self.admin_token.encode("utf-8"))
+
+    def start_trace(self, method: str, path: str, cpu: bool = False) -> Trace:
+        """A new trace; it is CPU-profiled if ``cpu`` is requested or a CPU
+        window is open.
+        """
+        window = self._window
+        return Trace(method, path, cpu=cpu or window is not None, requested=cpu, window=window)
+
+    def finish(self, trace: Trace) -> None:
+        trace.duration = time.perf_counter() - trace.start
+        if trace.duration >= self.slow_threshold:
+            self._slow.append(trace)
+        if not trace.profiles:
+            return
+        if trace.requested:
+            stats = _merge(None, trace.profiles)
+            if stats is not None:
+                with self._lock:
+                    self._profiles[trace.id] = stats
+                    while len(self._profiles) > self.max_profiles:
+                        self._profiles.popitem(last=False)
+        if trace.window is not None:
+            trace.window.add(trace.profiles)
+        trace.profiles = []
+
+    def slow_traces(self) -> List[Trace]:
+        """Kept slow traces, newest first."""
+        return list(reversed(self._slow))
+
+    def profile(self, trace_id: str) -> Optional[pstats.Stats]:
+        with self._lock:
+            return self._profiles.get(trace_id)
+
+    async def profile_cpu(self, seconds: float) -> "_CpuWindow":
+        """Profiles the requests that start in the next ``seconds``."""
+        with self._lock:
+            if self._window is not None:
+                raise ProfilerBusy("CPU profili zaten ölçülüyor")
+            window = self._window = _CpuWindow()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            with self._lock:
+                self._window = None
+            window.close()
+        return window
+
+    async def trace_memory(self, seconds: float, limit: int = 25,
+                           frames: int = 1) -> List[tracemalloc.StatisticDiff]:
+        """Allocation growth by source line (or by traceback with ``frames``
+        > 1) over the next ``seconds``, largest first.
+
+        Snapshots are taken in a worker thread; on a large heap they take a
+        while and would otherwise stall the event loop.
+        """
+        with self._lock:
+            if self._tracing_memory:
+                raise ProfilerBusy("Bellek izleme zaten sürüyor")
+            self._tracing_memory = True
+        started = not tracemalloc.is_tracing()
+        try:
+            if started:
+                tracemalloc.start(frames)
+            before = await asyncio.to_thread(_snapshot)
+            await asyncio.sleep(seconds)
+            after = await asyncio.to_thread(_snapshot)
+            diff = await asyncio.to_thread(after.compare_to, before, "traceback" if frames > 1 else "lineno")
+        finally:
+            if started:
+                tracemalloc.stop()
+            with self._lock:
+                self._tracing_memory = False
+        return diff[:limit]
+
+
+NO_PROFILER = Profiler(enabled=False)
+
+
+class _CpuWindow:
+    def __init__(self):
+        self.requests = 0
+        self.stats: Optional[pstats.Stats] = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def add(self, profiles: List[cProfile.Profile]) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self.requests += 1
+            self.stats = _merge(self.stats, profiles)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+
+
+def format_stats(stats: Optional[pstats.Stats], sort: str = "cumulative", limit: int = 40) -> str:
+    """pstats table of the ``limit`` top functions, as printed by cProfile."""
+    if stats is None:
+        return "Profillenen çağrı yok\n"
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def format_memory(diff: List[tracemalloc.StatisticDiff]) -> str:
+    if not diff:
+        return "Bellek değişikliği yok\n"
+    return "".join(f"{stat}\n" for stat in diff)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    # tracemalloc'un kendi ayırmaları farkta görünmesin
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def _merge(stats: Optional[pstats.Stats], profiles: List[cProfile.Profile]) -> Optional[pstats.Stats]:
+    for profile in profiles:
+        profile.create_stats()
+        if not profile.stats:
+            continue
+        if stats is None:
+            stats = pstats.Stats(profile)
+        else:
+            stats.add(profile)
+    return stats
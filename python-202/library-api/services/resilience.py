@@ -0,0 +1,108 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+class UpstreamUnavailable(Exception):
+    """Open Library could not answer: retries exhausted, deadline exceeded or
+    circuit open. Unlike a 404 this says nothing about the ISBN itself.
+    """
+
+
+class Deadline:
+    """Time budget shared by all requests of one operation (e.g. an ISBN
+    lookup and its author lookups); ``None`` means unlimited.
+    """
+
+    def __init__(self, budget: Optional[float], clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.expires = None if budget is None else clock() + budget
+
+    def remaining(self) -> float:
+        if self.expires is None:
+            return float("inf")
+        return max(0.0, self.expires - self.clock())
+
+    def timeout(self, cap: float) -> float:
+        """Per-request timeout: ``cap``, shortened to what is left of the budget."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise UpstreamUnavailable("Open Library süre sınırı aşıldı")
+        return min(cap, remaining)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """``attempts`` tries in total with full-jitter exponential backoff
+    (a random delay between 0 and ``base_delay * 2**n``, at most ``max_delay``).
+    """
+
+    attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 1.0
+
+    def delay(self, attempt: int, rng: random.Random = random) -> float:
+        return rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Fails fast while the upstream looks down.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call is rejected for ``reset_timeout`` seconds. Then a single probe
+    is let through (half-open): success closes the breaker, failure opens it
+    again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def check(self) -> bool:
+        """Raises UpstreamUnavailable unless a call may go out now; returns
+        True if the call is the half-open probe.
+        """
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+        raise UpstreamUnavailable("Open Library devre kesici açık")
+
+    def release_probe(self) -> None:
+        """Lets the next call probe again when a probe ended without a
+        recorded outcome (cancelled, or an unexpected exception).
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
@@ -0,0 +1,392 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from models.book_catalog import CatalogIndex
+from models.book_model import Book
+from services.catalog_indexes import TitleIndex
+
+_TOKEN = re.compile(r"\w+")
+
+# Bu uzunluğa kadar olan önekler için kitap sayısı ve en iyi sonuçlar hazır tutulur
+SHORT_PREFIX = 2
+# API'nin izin verdiği en büyük limit (100) ve silmeler için pay
+SHORT_PREFIX_TOP = 128
+SHORT_PREFIX_REFILL = 100
+_SHORT_SIZES = range(1, SHORT_PREFIX + 1)
+# Maliyetler aday kümesine bir anahtar eklemeye göre: kelime kontrolüyle bir
+# tarama adımı ~150, birleşime bir kelimenin postings'ini katmak ~30 kat sürer
+SCAN_COST = 150
+UNION_TOKEN_COST = 30
+
+# (tam kelime değil mi, küçük harfli başlık, ISBN anahtarı)
+Rank = Tuple[bool, str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into case-folded word tokens without diacritics.
+
+    "İstanbul", "istanbul" and "Istanbul" all become "istanbul", so a query
+    typed without Turkish characters still matches.
+    """
+    if text.isascii():
+        return _TOKEN.findall(text.lower())
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    return _TOKEN.findall("".join(ch for ch in folded if not unicodedata.combining(ch)))
+
+
+@lru_cache(maxsize=65536)
+def _author_tokens(author: str) -> FrozenSet[str]:
+    # Aynı yazar binlerce kitapta tekrar eder; her seferinde yeniden ayrıştırılmaz
+    return frozenset(tokenize(author))
+
+
+def book_tokens(book: Book) -> Set[str]:
+    return _author_tokens(book.author).union(tokenize(book.title))
+
+
+def short_prefixes(tokens: Iterable[str]) -> Dict[str, bool]:
+    """Maps every prefix of up to SHORT_PREFIX characters of ``tokens`` to
+    whether it is also a whole token.
+    """
+    prefixes = dict.fromkeys({token[:size] for token in tokens for size in _SHORT_SIZES}, False)
+    for token in tokens:
+        if len(token) <= SHORT_PREFIX:
+            prefixes[token] = True
+    return prefixes
+
+
+class PrefixTop:
+    """Number of books with a word starting with one short prefix, and the
+    best ranked of them in search order.
+
+    ``top`` holds at most SHORT_PREFIX_TOP ranks; ``complete`` means it
+    holds all of them. Once removals leave fewer than SHORT_PREFIX_REFILL
+    of an incomplete list, ``top`` is dropped and rebuilt on the next query.
+    """
+
+    __slots__ = ("count", "top", "complete")
+
+    def __init__(self, count: int, top: List[Rank]):
+        self.count = count
+        self.top: Optional[List[Rank]] = top
+        self.complete = count <= len(top)
+
+    def add(self, rank: Rank) -> None:
+        self.count += 1
+        top = self.top
+        if top is None or (len(top) == SHORT_PREFIX_TOP and rank > top[-1]):
+            self.complete = False
+        else:
+            insort(top, rank)
+            if len(top) > SHORT_PREFIX_TOP:
+                top.pop()
+                self.complete = False
+
+    def remove(self, rank: Rank) -> None:
+        self.count -= 1
+        top = self.top
+        if top is None:
+            return
+        position = bisect_left(top, rank)
+        if position < len(top) and top[position] == rank:
+            del top[position]
+            if not self.complete and len(top) < SHORT_PREFIX_REFILL:
+                self.top = None
+
+
+class SearchIndex(CatalogIndex):
+    """Inverted index over the words of ``Book.title`` and ``Book.author``.
+
+    Every query term is matched as a prefix ("dun herb" finds "Dune" by
+    "Frank Herbert"); all terms must match. Postings are kept per token and
+    a sorted vocabulary turns a prefix into a contiguous token range. The
+    most selective term seeds the candidates; other terms are intersected
+    with them, or checked against each candidate's own tokens when their
+    postings are much larger than the candidate set. Like BookCatalog's key
+    list, the vocabulary is sorted on the first search and then kept up to
+    date.
+
+    Prefixes of one or two characters match a large part of the catalog.
+    For those a PrefixTop keeps the book count and the best ranked books,
+    so a one-term query like "d" is answered from that list. It is built
+    the first time the prefix is searched (or by ``prepare``) and kept up
+    to date afterwards; loading a catalog does no per-prefix work.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None
+        self._short: Dict[str, PrefixTop] = {}
+
+    def add(self, key: str, book: Book) -> None:
+        tokens = book_tokens(book)
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                if self._vocabulary is not None:
+                    insort(self._vocabulary, token)
+            posting.add(key)
+        if self._short:
+            title = book.title.casefold()
+            for prefix, whole in short_prefixes(tokens).items():
+                top = self._short.get(prefix)
+                if top is not None:
+                    top.add((not whole, title, key))
+
+    def remove(self, key: str, book: Book) -> None:
+        tokens = book_tokens(book)
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(key)
+            if not posting:
+                del self._postings[token]
+                if self._vocabulary is not None:
+                    del self._vocabulary[bisect_left(self._vocabulary, token)]
+        if self._short:
+            title = book.title.casefold()
+            for prefix, whole in short_prefixes(tokens).items():
+                top = self._short.get(prefix)
+                if top is None:
+                    continue
+                top.remove((not whole, title, key))
+                if not top.count:
+                    del self._short[prefix]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._vocabulary = None
+        self._short.clear()
+
+    def search(self, query: str, lookup: Callable[[str], Optional[Book]], limit: int = 20,
+               titles: Optional[TitleIndex] = None) -> List[Book]:
+        """Returns up to ``limit`` books matching every term of ``query``.
+
+        Books where all terms match whole words rank first, then by title.
+        With ``titles`` (a TitleIndex over the same catalog), a large
+        candidate set is not ranked as a whole: the candidates are visited in
+        title order and the walk stops at the ``limit``-th whole-word match.
+        When even the most selective term matches too many books to collect
+        them, the walk checks every book's own words instead.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        if len(terms) == 1 and len(terms[0]) <= SHORT_PREFIX:
+            top = self.prepare(terms[0], lookup, titles)
+            if top is None:
+                return []
+            if limit <= len(top.top) or top.complete:
+                return [book for book in map(lookup, (key for _, _, key in top.top[:limit])) if book is not None]
+
+        vocabulary = self._sorted_vocabulary()
+        ranges = {term: self._prefix_range(vocabulary, term) for term in terms}
+        sizes = {term: self._prefix_size(vocabulary, term, ranges[term], lookup, titles) for term in terms}
+        if not all(sizes.values()):
+            return []
+
+        terms.sort(key=sizes.__getitem__)
+        exact_postings = sorted((self._postings.get(term, set()) for term in terms), key=len)
+
+        def whole(key: str) -> bool:
+            return all(key in posting for posting in exact_postings)
+
+        # Tüm terimlerin tam kelime eşleşmeleri az ise önce onlar bulunur;
+        # ``limit`` kadar varsa kısmi eşleşmelere hiç bakılmaz
+        exact_keys: Optional[Set[str]] = None
+        if titles is None or len(exact_postings[0]) ** 2 <= limit * len(titles):
+            exact_keys = exact_postings[0].intersection(*exact_postings[1:])
+            if len(exact_keys) >= limit:
+                return self._rank(exact_keys, lookup, limit)
+
+        # Tarama ortalama limit * n / (eşleşen kitap sayısı) adım sürer
+        seed_size = sizes[terms[0]]
+        start, end = ranges[terms[0]]
+        if titles is not None and \
+                (seed_size + UNION_TOKEN_COST * (end - start)) * seed_size > SCAN_COST * limit * len(titles):
+            return self._scan(titles, terms, exact_keys, whole, lookup, limit)
+
+        # En seçici terimden başla; kalan terimler küçükse küme kesişimi,
+        # az sayıda kelimeye denk geliyorsa üyelik testi, aksi halde
+        # adayların kendi kelimeleri üzerinden kontrol edilir.
+        candidates = self._union(vocabulary, *ranges[terms[0]])
+        unchecked = []
+        for term in terms[1:]:
+            start, end = ranges[term]
+            if sizes[term] <= 4 * len(candidates):
+                candidates &= self._union(vocabulary, start, end)
+            elif end - start <= 16:
+                candidates = set().union(*(candidates & self._postings[token] for token in vocabulary[start:end]))
+            else:
+                unchecked.append(term)
+
+        def matches(book: Book) -> bool:
+            return not unchecked or _matches_all(book, unchecked)
+
+        # Başlık sırasında yürüyüş ortalama limit * n / aday sayısı adım sürer;
+        # aday azsa hepsini sıralamak daha ucuzdur
+        if titles is None or len(candidates) ** 2 <= limit * len(titles):
+            ranked = []
+            for key in candidates:
+                book = lookup(key)
+                if book is not None and matches(book):
+                    ranked.append((not whole(key), book.title.casefold(), key, book))
+            return [entry[-1] for entry in heapq.nsmallest(limit, ranked)]
+
+        if exact_keys is not None:
+            # Tam kelime eşleşmeleri sıralandı; kalan yer başlık sırasıyla doldurulur
+            found = self._rank(exact_keys, lookup, limit)
+            return found + self._walk(titles, candidates.__contains__, exact_keys, lookup, matches,
+                                      limit - len(found))
+
+        # Tam kelime eşleşmeleri çok: ilk ``limit`` tanesi bulununca durulur
+        return self._title_order(titles, candidates.__contains__, whole, lookup, matches, limit)
+
+    def _scan(self, titles: TitleIndex, terms: List[str], exact_keys: Optional[Set[str]],
+              whole: Callable[[str], bool], lookup: Callable[[str], Optional[Book]], limit: int) -> List[Book]:
+        """search() for queries whose every term matches a large share of the
+        catalog: books are visited in title order and checked one by one, so
+        about ``limit`` divided by the share of matching books are read.
+        """
+        def matches(book: Book) -> bool:
+            return _matches_all(book, terms)
+
+        if exact_keys is not None:
+            found = self._rank(exact_keys, lookup, limit)
+            return found + self._walk(titles, None, exact_keys, lookup, matches, limit - len(found))
+        return self._title_order(titles, None, whole, lookup, matches, limit)
+
+    @staticmethod
+    def _title_order(titles: TitleIndex, member: Optional[Callable[[str], bool]], whole: Callable[[str], bool],
+                     lookup: Callable[[str], Optional[Book]], check: Callable[[Book], bool],
+                     limit: int) -> List[Book]:
+        """Whole-word matches, then the rest, among ``member``s (all books
+        when None) in title order; stops at the ``limit``-th whole-word match.
+        """
+        exact: List[Book] = []
+        partial: List[Book] = []
+        for key in titles.keys():
+            if member is not None and not member(key):
+                continue
+            is_whole = whole(key)
+            if not is_whole and len(partial) == limit:
+                continue
+            book = lookup(key)
+            if book is None or not (is_whole or check(book)):
+                continue
+            (exact if is_whole else partial).append(book)
+            if len(exact) == limit:
+                break
+        return (exact + partial)[:limit]
+
+    @staticmethod
+    def _rank(keys: Iterable[str], lookup: Callable[[str], Optional[Book]], limit: int) -> List[Book]:
+        """The first ``limit`` books of ``keys`` in title order."""
+        ranked = [(book.title.casefold(), key, book) for key, book in
+                  ((key, lookup(key)) for key in keys) if book is not None]
+        return [entry[-1] for entry in heapq.nsmallest(limit, ranked)]
+
+    @staticmethod
+    def _walk(titles: TitleIndex, member: Optional[Callable[[str], bool]], skip: Set[str],
+              lookup: Callable[[str], Optional[Book]], check: Callable[[Book], bool], limit: int) -> List[Book]:
+        """The first ``limit`` books in title order that are ``member``s (all
+        books when None), are not in ``skip`` and pass ``check``.
+        """
+        found: List[Book] = []
+        for key in titles.keys():
+            if (member is None or member(key)) and key not in skip:
+                book = lookup(key)
+                if book is not None and check(book):
+                    found.append(book)
+                    if len(found) == limit:
+                        break
+        return found
+
+    def prepare(self, prefix: str, lookup: Callable[[str], Optional[Book]],
+                titles: Optional[TitleIndex] = None) -> Optional[PrefixTop]:
+        """The PrefixTop of a short ``prefix``, built now if it is missing or
+        was dropped; None when no book matches.
+        """
+        top = self._short.get(prefix)
+        if top is not None and top.top is not None:
+            return top
+        vocabulary = self._sorted_vocabulary()
+        keys = self._union(vocabulary, *self._prefix_range(vocabulary, prefix))
+        if not keys:
+            return None
+        exact = self._postings.get(prefix, set())
+        ranks = [(False, book.title.casefold(), key) for book, key in
+                 self._first_by_title(exact, None, lookup, titles, SHORT_PREFIX_TOP)]
+        ranks += [(True, book.title.casefold(), key) for book, key in
+                  self._first_by_title(keys, exact, lookup, titles, SHORT_PREFIX_TOP - len(ranks))]
+        top = self._short[prefix] = PrefixTop(len(keys), ranks)
+        return top
+
+    def all_short_prefixes(self) -> List[str]:
+        """Every prefix of up to SHORT_PREFIX characters of an indexed word,
+        e.g. to ``prepare`` them all once the index is built.
+        """
+        return sorted({token[:size] for token in self._postings for size in _SHORT_SIZES})
+
+    def _first_by_title(self, keys: Set[str], skip: Optional[Set[str]], lookup: Callable[[str], Optional[Book]],
+                        titles: Optional[TitleIndex], limit: int) -> List[Tuple[Book, str]]:
+        """The first ``limit`` (book, key) pairs of ``keys`` minus ``skip`` in title order."""
+        if limit <= 0:
+            return []
+        if titles is None or len(keys) ** 2 <= limit * len(titles):
+            ranked = [(book.title.casefold(), key, book) for key, book in
+                      ((key, lookup(key)) for key in keys if skip is None or key not in skip)
+                      if book is not None]
+            return [(book, key) for _, key, book in heapq.nsmallest(limit, ranked)]
+        found: List[Tuple[Book, str]] = []
+        for key in titles.keys():
+            if key in keys and (skip is None or key not in skip):
+                book = lookup(key)
+                if book is not None:
+                    found.append((book, key))
+                    if len(found) == limit:
+                        break
+        return found
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    @staticmethod
+    def _prefix_range(vocabulary: List[str], prefix: str) -> Tuple[int, int]:
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_left(vocabulary, prefix + "\U0010ffff", lo=start)
+        return start, end
+
+    def _prefix_size(self, vocabulary: List[str], prefix: str, prefix_range: Tuple[int, int],
+                     lookup: Callable[[str], Optional[Book]], titles: Optional[TitleIndex]) -> int:
+        """Books matching ``prefix``; for a long one, the sum of its postings."""
+        if len(prefix) <= SHORT_PREFIX:
+            top = self.prepare(prefix, lookup, titles)
+            return top.count if top is not None else 0
+        start, end = prefix_range
+        return sum(len(self._postings[token]) for token in vocabulary[start:end])
+
+    def _union(self, vocabulary: List[str], start: int, end: int) -> Set[str]:
+        keys: Set[str] = set()
+        for token in vocabulary[start:end]:
+            keys.update(self._postings[token])
+        return keys
+
+
+@lru_cache(maxsize=65536)
+def _author_words(author: str) -> str:
+    return " " + " ".join(_author_tokens(author))
+
+
+def _matches_all(book: Book, terms: List[str]) -> bool:
+    # Kelimeler boşlukla birleştirilir: " " + terim bulunuyorsa bir kelime o terimle başlar
+    words = f"{_author_words(book.author)} {' '.join(tokenize(book.title))}"
+    return all(f" {term}" in words for term in terms)
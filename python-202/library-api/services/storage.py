@@ -0,0 +1,860 @@
+import json
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import IO, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from models.book_catalog import BookCatalog
+from models.book_model import Book, create_book_from_dict, normalize_isbn
+from services.change_log import ChangeLog
+
+
+def write_json_atomic(path: str, data, compact: bool = False) -> None:
+    """Writes JSON to a temp file in the same directory and renames it over path.
+
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+    ``compact`` drops the indentation for large machine-read files.
+    """
+    layout = {"separators": (",", ":")} if compact else {"indent": 2}
+    _write_atomic(path, ".json", 'w', lambda file: json.dump(data, file, ensure_ascii=False, **layout))
+
+
+def write_bytes_atomic(path: str, data: bytes) -> None:
+    """Binary counterpart of write_json_atomic."""
+    _write_atomic(path, ".bin", 'wb', lambda file: file.write(data))
+
+
+def _write_atomic(path: str, suffix: str, mode: str, write: Callable[[IO], object]) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class StorageBackend(ABC):
+    """Persistence strategy that LibraryService delegates to.
+
+    ``save`` writes the whole catalog. ``record_add``/``record_remove`` are
+    called after every single mutation together with the current catalog,
+    ``record_add_many`` once after a bulk import; the defaults fall back to
+    a full save, incremental backends override them.
+    """
+
+    path: str
+
+    @abstractmethod
+    def load(self) -> BookCatalog:
+        ...
+
+    @abstractmethod
+    def save(self, books: Iterable[Book]) -> None:
+        ...
+
+    def record_add(self, book: Book, books: Iterable[Book]) -> None:
+        self.save(books)
+
+    def record_remove(self, isbn: str, books: Iterable[Book]) -> None:
+        self.save(books)
+
+    def record_add_many(self, added: List[Book], books: Iterable[Book]) -> None:
+        self.save(books)
+
+    # True if writers of different parts of the catalog may run at once (see locked_for)
+    partitioned = False
+
+    def locked(self) -> ContextManager:
+        """Held around read-modify-write cycles; backends shared between
+        processes take a cross-process lock here.
+        """
+        return nullcontext()
+
+    def locked_for(self, isbns: Iterable[str]) -> ContextManager:
+        """Like ``locked`` for a write that only touches ``isbns``.
+        Partitioned backends lock just the parts holding them, in this
+        process and across processes; others lock everything.
+        """
+        return self.locked()
+
+    def has_changes(self) -> bool:
+        """Cheap check whether another process changed the stored catalog."""
+        return False
+
+    def refresh(self, catalog: BookCatalog, changes: Optional[ChangeLog] = None) -> bool:
+        """Applies other processes' changes to ``catalog`` in place and
+        records each one in ``changes``.
+
+        Returns False when that is not possible and the catalog must be
+        reloaded with ``load``. Called with ``locked()`` held.
+        """
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class JsonFileStorage(StorageBackend):
+    """The original format: the whole catalog as one JSON array."""
+
+    def __init__(self, path: str = "library.json"):
+        self.path = path
+
+    def load(self) -> BookCatalog:
+        if not os.path.exists(self.path):
+            return BookCatalog()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return BookCatalog()
+        return BookCatalog(create_book_from_dict(book_data, trusted=True) for book_data in data)
+
+    def save(self, books: Iterable[Book]) -> None:
+        write_json_atomic(self.path, [book.to_dict() for book in books])
+
+
+class JournalStorage(JsonFileStorage):
+    """JSON snapshot plus an append-only log of mutations.
+
+    Each add/remove is appended as one JSON line to ``<path>.journal``.
+    Once the journal grows past ``compact_every`` records or ``compact_bytes``
+    bytes, a fresh snapshot is written atomically and the journal is emptied.
+    The snapshot keeps the plain ``library.json`` format.
+    """
+
+    def __init__(self, path: str = "library.json", compact_every: int = 1000,
+                 compact_bytes: int = 4 * 1024 * 1024, fsync: bool = False):
+        super().__init__(path)
+        self.journal_path = path + ".journal"
+        self.compact_every = compact_every
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self.entries = 0
+        self._size = 0
+        self._file: Optional[IO[bytes]] = None
+
+    def load(self) -> BookCatalog:
+        """Loads the snapshot and applies every complete journal record on top."""
+        catalog = super().load()
+        self.entries = 0
+        self._size = 0
+        if not os.path.exists(self.journal_path):
+            return catalog
+
+        with open(self.journal_path, 'rb') as file:
+            self._replay(catalog, file)
+        self._drop_torn_tail()
+        return catalog
+
+    def save(self, books: Iterable[Book]) -> None:
+        """Writes a full snapshot atomically, then empties the journal.
+
+        Replaying an old journal over the new snapshot is harmless because
+        adds and removes are keyed by ISBN, so a crash between the two steps
+        loses nothing.
+        """
+        super().save(books)
+        self._close_journal()
+        with open(self.journal_path, 'wb'):
+            pass
+        self.entries = 0
+        self._size = 0
+
+    def record_add(self, book: Book, books: Iterable[Book]) -> None:
+        self._append({"op": "add", "book": book.to_dict()})
+        self._maybe_compact(books)
+
+    def record_remove(self, isbn: str, books: Iterable[Book]) -> None:
+        self._append({"op": "remove", "isbn": isbn})
+        self._maybe_compact(books)
+
+    def record_add_many(self, added: List[Book], books: Iterable[Book]) -> None:
+        self._append_many({"op": "add", "book": book.to_dict()} for book in added)
+        self._maybe_compact(books)
+
+    def needs_compaction(self) -> bool:
+        return self.entries >= self.compact_every or self._size >= self.compact_bytes
+
+    def close(self) -> None:
+        self._close_journal()
+
+    def _close_journal(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _maybe_compact(self, books: Iterable[Book]) -> None:
+        if self.needs_compaction():
+            self.save(books)
+
+    def _append(self, record: dict) -> None:
+        self._append_many([record])
+
+    def _append_many(self, records: Iterable[dict]) -> None:
+        if self._file is None:
+            self._file = open(self.journal_path, 'ab')
+        lines = [json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n" for record in records]
+        data = b"".join(lines)
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.entries += len(lines)
+        self._size += len(data)
+
+    def _replay(self, catalog: BookCatalog, file: IO[bytes], changes: Optional[ChangeLog] = None) -> None:
+        """Applies the journal records from the file's position on, stopping
+        at the first incomplete or unreadable one.
+        """
+        for line in file:
+            # Yarım kalmış son kayıt (ör. yazma sırasında çökme) atlanır ve kesilir
+            if not line.endswith(b"\n"):
+                break
+            try:
+                self._apply(catalog, json.loads(line), changes)
+            except (json.JSONDecodeError, KeyError, ValueError):
+                break
+            self.entries += 1
+            self._size += len(line)
+
+    def _drop_torn_tail(self) -> None:
+        if self._size != os.path.getsize(self.journal_path):
+            self._close_journal()
+            with open(self.journal_path, 'r+b') as file:
+                file.truncate(self._size)
+
+    @staticmethod
+    def _apply(catalog: BookCatalog, record: dict, changes: Optional[ChangeLog] = None) -> None:
+        if record["op"] == "add":
+            book = create_book_from_dict(record["book"], trusted=True)
+            catalog.append(book)
+            if changes is not None:
+                changes.record_add(book)
+        elif record["op"] == "remove":
+            if catalog.pop(record["isbn"]) is not None and changes is not None:
+                changes.record_remove(record["isbn"])
+        else:
+            raise ValueError(f"Bilinmeyen journal kaydı: {record['op']}")
+
+
+# (snapshot identity, journal size in bytes)
+_Stamp = Tuple[Optional[Tuple[int, int, int]], int]
+
+
+class SharedJournalStorage(JournalStorage):
+    """JournalStorage for several processes (e.g. ``uvicorn --workers N``)
+    sharing one library.json.
+
+    Every write happens under an exclusive ``flock`` on ``<path>.lock``.
+    Before changing anything, a process replays the journal records other
+    processes appended since its last look. Change detection is two
+    ``stat`` calls: the snapshot's inode/mtime/size and the journal size.
+    A grown journal is applied incrementally. A replaced snapshot
+    (another process compacted) requires a full reload.
+    """
+
+    def __init__(self, path: str = "library.json", **kwargs):
+        if fcntl is None:
+            raise RuntimeError("Paylaşımlı depolama bu platformda desteklenmiyor (fcntl yok)")
+        super().__init__(path, **kwargs)
+        self.lock_path = path + ".lock"
+        self._lock_file = open(self.lock_path, 'a+b')
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._seen: _Stamp = (None, 0)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        # flock bir dosya tanımlayıcısına bağlıdır; aynı süreçte iç içe çağrılar sayılır
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def load(self) -> BookCatalog:
+        with self.locked():
+            catalog = super().load()
+            self._seen = self._stamp()
+        return catalog
+
+    def save(self, books: Iterable[Book]) -> None:
+        with self.locked():
+            super().save(books)
+            self._seen = self._stamp()
+
+    def record_add(self, book: Book, books: Iterable[Book]) -> None:
+        with self.locked():
+            super().record_add(book, books)
+            self._seen = self._stamp()
+
+    def record_remove(self, isbn: str, books: Iterable[Book]) -> None:
+        with self.locked():
+            super().record_remove(isbn, books)
+            self._seen = self._stamp()
+
+    def record_add_many(self, added: List[Book], books: Iterable[Book]) -> None:
+        with self.locked():
+            super().record_add_many(added, books)
+            self._seen = self._stamp()
+
+    def has_changes(self) -> bool:
+        return self._stamp() != self._seen
+
+    def refresh(self, catalog: BookCatalog, changes: Optional[ChangeLog] = None) -> bool:
+        with self.locked():
+            snapshot, journal_size = self._stamp()
+            if snapshot != self._seen[0] or journal_size < self._size:
+                return False
+            if journal_size > self._size:
+                with open(self.journal_path, 'rb') as file:
+                    file.seek(self._size)
+                    self._replay(catalog, file, changes)
+                # Yazanlar kilidi tutar; kilit altında görülen yarım kayıt çöken bir yazandan kalmıştır.
+                # load() gibi kesilir, yoksa sonraki kayıt onun arkasına eklenip bozulurdu
+                self._drop_torn_tail()
+            self._seen = self._stamp()
+        return True
+
+    def close(self) -> None:
+        super().close()
+        self._lock_file.close()
+
+    def _stamp(self) -> _Stamp:
+        try:
+            stat = os.stat(self.path)
+            snapshot = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            snapshot = None
+        try:
+            journal_size = os.stat(self.journal_path).st_size
+        except FileNotFoundError:
+            journal_size = 0
+        return snapshot, journal_size
+
+
+_SNAPSHOT_MAGIC = b"LIBBIN1\n"
+_SNAPSHOT_HEADER = struct.Struct("<8sII")  # magic, book count, distinct author count
+_SECTION_SIZE = struct.Struct("<Q")
+
+
+def encode_snapshot(books: Iterable[Book]) -> bytes:
+    """Encodes books column by column: titles, ISBNs, a table of distinct
+    authors and one author index per book.
+
+    Each text column is one UTF-8 blob joined with a control character that
+    does not occur in it, so loading is a single decode and split per column.
+    """
+    titles: List[str] = []
+    isbns: List[str] = []
+    authors: Dict[str, int] = {}
+    author_ids = array('I')
+    for book in books:
+        titles.append(book.title)
+        isbns.append(book.isbn)
+        author_ids.append(authors.setdefault(book.author, len(authors)))
+
+    sections = [_text_column(titles), _text_column(isbns), _text_column(list(authors)),
+                _little_endian(author_ids)]
+    parts = [_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, len(titles), len(authors))]
+    for section in sections:
+        parts.append(_SECTION_SIZE.pack(len(section)))
+        parts.append(section)
+    return b"".join(parts)
+
+
+def decode_snapshot(data: bytes) -> List[Book]:
+    if len(data) < _SNAPSHOT_HEADER.size:
+        raise ValueError("Geçersiz ikili anlık görüntü")
+    magic, count, author_count = _SNAPSHOT_HEADER.unpack_from(data)
+    if magic != _SNAPSHOT_MAGIC:
+        raise ValueError("Geçersiz ikili anlık görüntü")
+
+    view = memoryview(data)
+    sections = []
+    offset = _SNAPSHOT_HEADER.size
+    for _ in range(4):
+        (size,) = _SECTION_SIZE.unpack_from(data, offset)
+        offset += _SECTION_SIZE.size
+        sections.append(view[offset:offset + size])
+        offset += size
+
+    titles = _split_text(sections[0], count)
+    isbns = _split_text(sections[1], count)
+    authors = [sys.intern(name) for name in _split_text(sections[2], author_count)]
+    author_ids = _read_array(sections[3])
+    if not len(titles) == len(isbns) == len(author_ids) == count or len(authors) != author_count:
+        raise ValueError("Geçersiz ikili anlık görüntü")
+    return [Book.trusted(title, authors[author_id], isbn)
+            for title, author_id, isbn in zip(titles, author_ids, isbns)]
+
+
+def _text_column(values: List[str]) -> bytes:
+    text = "".join(values)
+    separator = next((chr(code) for code in range(32) if chr(code) not in text), None)
+    if separator is None:
+        raise ValueError("Metin sütunu için ayırıcı bulunamadı")
+    return (separator + separator.join(values)).encode('utf-8')
+
+
+def _split_text(blob, count: int) -> List[str]:
+    if count == 0:
+        return []
+    text = str(blob, 'utf-8')
+    return text[1:].split(text[0])
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(data) -> array:
+    values = array('I')
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class BinarySnapshotStorage(JsonFileStorage):
+    """The whole catalog as one compact columnar file (see encode_snapshot).
+
+    The file is read in a single pass and decoded without per-record JSON
+    parsing or ISBN validation. If it does not exist yet, the JSON catalog
+    next to it (``library.bin`` -> ``library.json``, plus its journal) is
+    loaded and converted once; the JSON file is left untouched.
+    """
+
+    def __init__(self, path: str = "library.bin"):
+        super().__init__(path)
+        self.json_path = os.path.splitext(path)[0] + ".json"
+
+    def load(self) -> BookCatalog:
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as file:
+                return BookCatalog(decode_snapshot(file.read()))
+        if self.json_path == self.path or not os.path.exists(self.json_path):
+            return BookCatalog()
+
+        catalog = JournalStorage(self.json_path).load()
+        BinarySnapshotStorage.save(self, catalog)
+        return catalog
+
+    def save(self, books: Iterable[Book]) -> None:
+        write_bytes_atomic(self.path, encode_snapshot(books))
+
+
+class BinaryJournalStorage(JournalStorage, BinarySnapshotStorage):
+    """JournalStorage whose snapshots use the binary format."""
+
+    def __init__(self, path: str = "library.bin", **kwargs):
+        super().__init__(path, **kwargs)
+
+
+class SqliteStorage(StorageBackend):
+    """Stores one row per book keyed by normalized ISBN.
+
+    Adds and removes are single-row transactions, so nothing is rewritten
+    wholesale. LibraryService still loads every row into its in-memory
+    catalog and serves reads from there; only ``get`` and ``iter_books``
+    (for tools working on the file) query the database, and ``iter_books``
+    reads ``chunk_size`` rows at a time.
+
+    The catalog therefore still has to fit in RAM. Serving lookups and
+    pages from the table is deferred: the title, author and search indexes
+    and the change log are all built on the in-memory catalog.
+    """
+
+    _UPSERT = """
+        INSERT INTO books VALUES (?, ?, ?, ?)
+        ON CONFLICT(isbn_key) DO UPDATE SET
+            isbn = excluded.isbn, title = excluded.title, author = excluded.author
+    """
+
+    def __init__(self, path: str = "library.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS books (
+                isbn_key TEXT PRIMARY KEY,
+                isbn TEXT NOT NULL,
+                title TEXT NOT NULL,
+                author TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def load(self) -> BookCatalog:
+        return BookCatalog(self.iter_books())
+
+    def iter_books(self, chunk_size: int = 10_000) -> Iterator[Book]:
+        """Yields the books in insertion order without reading the whole
+        table at once.
+        """
+        last = 0
+        while True:
+            # Bağlantı paylaşılıyor; imleç kilit dışında açık bırakılmaz, her parça rowid'den devam eder
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, title, author, isbn FROM books WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last, chunk_size),
+                ).fetchall()
+            for _, title, author, isbn in rows:
+                yield Book.trusted(title, author, isbn)
+            if len(rows) < chunk_size:
+                return
+            last = rows[-1][0]
+
+    def get(self, isbn: str) -> Optional[Book]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, author, isbn FROM books WHERE isbn_key = ?", (normalize_isbn(isbn),)
+            ).fetchone()
+        return Book.trusted(*row) if row else None
+
+    def save(self, books: Iterable[Book]) -> None:
+        rows = [self._row(book) for book in books]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM books")
+            self._conn.executemany("INSERT INTO books VALUES (?, ?, ?, ?)", rows)
+
+    def record_add(self, book: Book, books: Iterable[Book]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(self._UPSERT, self._row(book))
+
+    def record_remove(self, isbn: str, books: Iterable[Book]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM books WHERE isbn_key = ?", (normalize_isbn(isbn),))
+
+    def record_add_many(self, added: List[Book], books: Iterable[Book]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(self._UPSERT, [self._row(book) for book in added])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row(book: Book) -> tuple:
+        return normalize_isbn(book.isbn), book.isbn, book.title, book.author
+
+
+def shard_of(isbn: str, shards: int) -> int:
+    """Shard number of an ISBN. Uses crc32 of the normalized ISBN, which
+    unlike ``hash`` is the same in every process.
+    """
+    return _key_shard(normalize_isbn(isbn), shards)
+
+
+def _key_shard(key: str, shards: int) -> int:
+    return zlib.crc32(key.encode('utf-8')) % shards
+
+
+class _ShardView:
+    """The books of one shard of the whole catalog, read only when iterated
+    (i.e. when the shard compacts).
+
+    ``members`` holds the keys of each shard in insertion order. A shard
+    whose entry is None (other processes changed it) is found by filtering
+    the catalog once, and the result is kept for the next compaction.
+    """
+
+    def __init__(self, books: Iterable[Book], index: int, members: List[Optional[Dict[str, None]]]):
+        self.books = books
+        self.index = index
+        self.members = members
+
+    def __iter__(self) -> Iterator[Book]:
+        shards = len(self.members)
+        if not isinstance(self.books, BookCatalog):
+            return (book for book in self.books if shard_of(book.isbn, shards) == self.index)
+        keys = self.members[self.index]
+        if keys is None:
+            # BookCatalog anahtarları zaten normalize; her kitap için tekrar normalize edilmez
+            keys = self.members[self.index] = dict.fromkeys(
+                key for key, _ in self.books.items() if _key_shard(key, shards) == self.index)
+        return (book for book in map(self.books.get, list(keys)) if book is not None)
+
+
+_SHARD_SUFFIXES = {"sqlite": ".db", "binary": ".bin", "binary-journal": ".bin"}
+
+
+class ShardedStorage(StorageBackend):
+    """Partitions the catalog by ISBN hash across ``shards`` backends of
+    kind ``backend`` (any other STORAGE_BACKENDS key).
+
+    A single add or remove goes to one shard only, and a compaction or
+    bulk write rewrites only the shards it touches. Shard files are named
+    ``<stem>.<backend>.<i>-of-<n><suffix>`` and are spread round-robin
+    over ``directories`` (default: next to ``path``), e.g. one per disk.
+    ``<path>.shards.json`` records the current layout.
+
+    When the configured layout (shard count, backend or directories) does
+    not match the recorded one, ``load`` rebalances: the catalog is read
+    from the old shards, written to the new ones, the manifest is switched
+    and only then are the old files deleted, so a crash leaves the old
+    layout intact. Without a manifest, an existing single-file catalog at
+    ``path`` (plus its journal) is split once and left untouched.
+    Rebalancing must run in one process while the others are stopped.
+
+    Writes lock only the shards they touch (``locked_for``), so point
+    writes to different shards do not wait for each other, within a
+    process or across processes. ``refresh`` then applies other processes'
+    changes to the held shards only; a shard another process compacted is
+    reloaded on its own. ``locked`` takes every shard, in index order, for
+    full saves and for readers catching up.
+    """
+
+    partitioned = True
+
+    def __init__(self, path: str = "library.json", shards: int = 4, backend: str = "journal",
+                 directories: Optional[List[str]] = None):
+        if shards < 1:
+            raise ValueError("Shard sayısı en az 1 olmalı")
+        if backend not in STORAGE_BACKENDS or backend == "sharded":
+            raise ValueError(f"Bilinmeyen shard depolama türü: {backend}")
+        self.path = path
+        self.manifest_path = path + ".shards.json"
+        self.shard_count = shards
+        self.backend = backend
+        self.directories = directories
+        self.shards: List[StorageBackend] = []
+        # Shard başına anahtarlar; sıkıştırma tüm katalogu yeniden süzmesin
+        self._members: List[Optional[Dict[str, None]]] = []
+        self._shard_locks: List[threading.RLock] = []
+        self._held = threading.local()
+
+    def shard_paths(self) -> List[str]:
+        stem, _ = os.path.splitext(os.path.basename(self.path))
+        suffix = _SHARD_SUFFIXES.get(self.backend, ".json")
+        directories = self.directories or [os.path.dirname(self.path)]
+        n = self.shard_count
+        names = (f"{stem}.{self.backend}.{i:02d}-of-{n:02d}{suffix}" for i in range(n))
+        return [os.path.join(directories[i % len(directories)], name) for i, name in enumerate(names)]
+
+    def load(self) -> BookCatalog:
+        layout = {"backend": self.backend, "paths": self.shard_paths()}
+        manifest = self._read_manifest()
+        if manifest == layout:
+            # Açık shard'lar yeniden kullanılır; kilitleri tutulurken de yeniden yüklenebilir
+            if not self.shards:
+                self._use(self._open(layout))
+            self._members = [{} for _ in self.shards]
+            return BookCatalog(self._load_shards())
+
+        self.close()
+        if manifest is not None:
+            old = self._open(manifest)
+            catalog = BookCatalog(book for shard in old for book in shard.load())
+        elif os.path.exists(self.path):
+            old = []
+            catalog = JournalStorage(self.path).load()
+        else:
+            old = []
+            catalog = BookCatalog()
+        self._use(self._open(layout))
+        self.save(catalog)
+        write_json_atomic(self.manifest_path, layout)
+        for shard in old:
+            shard.close()
+            if shard.path not in layout["paths"]:
+                _remove_shard_files(shard.path)
+        return catalog
+
+    def rebalance(self, shards: int) -> BookCatalog:
+        """Moves the stored catalog to ``shards`` shards and returns it."""
+        self.shard_count = shards
+        return self.load()
+
+    def save(self, books: Iterable[Book]) -> None:
+        groups: List[List[Book]] = [[] for _ in self.shards]
+        members: List[Optional[Dict[str, None]]] = [{} for _ in self.shards]
+        for book in books:
+            key = normalize_isbn(book.isbn)
+            index = _key_shard(key, len(self.shards))
+            groups[index].append(book)
+            members[index][key] = None
+        self._members = members
+        for shard, group in zip(self.shards, groups):
+            shard.save(group)
+
+    def record_add(self, book: Book, books: Iterable[Book]) -> None:
+        key = normalize_isbn(book.isbn)
+        index = _key_shard(key, len(self.shards))
+        self._remember(index, [key])
+        self.shards[index].record_add(book, _ShardView(books, index, self._members))
+
+    def record_remove(self, isbn: str, books: Iterable[Book]) -> None:
+        key = normalize_isbn(isbn)
+        index = _key_shard(key, len(self.shards))
+        if self._members[index] is not None:
+            self._members[index].pop(key, None)
+        self.shards[index].record_remove(isbn, _ShardView(books, index, self._members))
+
+    def record_add_many(self, added: List[Book], books: Iterable[Book]) -> None:
+        groups: Dict[int, List[Book]] = {}
+        keys: Dict[int, List[str]] = {}
+        for book in added:
+            key = normalize_isbn(book.isbn)
+            index = _key_shard(key, len(self.shards))
+            groups.setdefault(index, []).append(book)
+            keys.setdefault(index, []).append(key)
+        for index, group in sorted(groups.items()):
+            self._remember(index, keys[index])
+            self.shards[index].record_add_many(group, _ShardView(books, index, self._members))
+
+    def locked(self) -> ContextManager:
+        return self._locking(range(len(self.shards)))
+
+    def locked_for(self, isbns: Iterable[str]) -> ContextManager:
+        return self._locking(sorted({shard_of(isbn, len(self.shards)) for isbn in isbns}))
+
+    @contextmanager
+    def _locking(self, indexes: Iterable[int]) -> Iterator[None]:
+        # Kilitler hep artan shard sırasıyla alınır ve tutulurken başka shard kilidi istenmez;
+        # bu yüzden süreçler ve iş parçacıkları arasında kilitlenme olmaz
+        held = self._held_shards()
+        taken = [index for index in indexes if index not in held]
+        with ExitStack() as stack:
+            for index in taken:
+                stack.enter_context(self._shard_locks[index])
+                stack.enter_context(self.shards[index].locked())
+            held.update(taken)
+            try:
+                yield
+            finally:
+                held.difference_update(taken)
+
+    def has_changes(self) -> bool:
+        return any(shard.has_changes() for shard in self.shards)
+
+    def refresh(self, catalog: BookCatalog, changes: Optional[ChangeLog] = None) -> bool:
+        held = self._held_shards()
+        for index, shard in enumerate(self.shards):
+            # Tutulmayan shard'lar sonraki tam eşitlemeye kalır
+            if index not in held or not shard.has_changes():
+                continue
+            # Başka süreçlerin eklediği anahtarlar bilinmiyor; gerekirse yeniden süzülür
+            self._members[index] = None
+            if not shard.refresh(catalog, changes):
+                self._reload_shard(index, catalog, changes)
+        return True
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+        self.shards = []
+        self._members = []
+        self._shard_locks = []
+
+    def _use(self, shards: List[StorageBackend]) -> None:
+        self.shards = shards
+        self._shard_locks = [threading.RLock() for _ in shards]
+
+    def _held_shards(self) -> Set[int]:
+        held = getattr(self._held, "indexes", None)
+        if held is None:
+            held = self._held.indexes = set()
+        return held
+
+    def _reload_shard(self, index: int, catalog: BookCatalog, changes: Optional[ChangeLog]) -> None:
+        """Replaces the books of one shard in ``catalog`` with the stored
+        ones (another process compacted it), recording the differences.
+        """
+        stored = self.shards[index].load()
+        stale = [key for key, _ in catalog.items()
+                 if _key_shard(key, len(self.shards)) == index and stored.get(key) is None]
+        for key in stale:
+            book = catalog.pop(key)
+            if book is not None and changes is not None:
+                changes.record_remove(book.isbn)
+        for key, book in stored.items():
+            current = catalog.get(key)
+            if current is None or (current.title, current.author, current.isbn) != (book.title, book.author, book.isbn):
+                catalog.append(book)
+                if changes is not None:
+                    changes.record_add(book)
+        self._members[index] = dict.fromkeys(key for key, _ in stored.items())
+
+    def _load_shards(self) -> Iterator[Book]:
+        # Shard katalogları sırayla okunup bırakılır; bellekte birleşik katalogla en fazla bir shard durur
+        for index, shard in enumerate(self.shards):
+            members = self._members[index]
+            for key, book in shard.load().items():
+                members[key] = None
+                yield book
+
+    def _remember(self, index: int, keys: List[str]) -> None:
+        members = self._members[index]
+        if members is not None:
+            for key in keys:
+                members[key] = None
+
+    def _read_manifest(self) -> Optional[dict]:
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    @staticmethod
+    def _open(layout: dict) -> List[StorageBackend]:
+        return [STORAGE_BACKENDS[layout["backend"]](path) for path in layout["paths"]]
+
+
+def _remove_shard_files(path: str) -> None:
+    for name in (path, path + ".journal", path + ".lock", path + "-wal", path + "-shm"):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+STORAGE_BACKENDS = {
+    "json": JsonFileStorage,
+    "journal": JournalStorage,
+    "shared": SharedJournalStorage,
+    "sqlite": SqliteStorage,
+    "binary": BinarySnapshotStorage,
+    "binary-journal": BinaryJournalStorage,
+    "sharded": ShardedStorage,
+}
+
+
+def create_storage(kind: str, path: str, **options) -> StorageBackend:
+    """Builds the storage backend named by configuration (a STORAGE_BACKENDS
+    key); ``options`` go to its constructor (e.g. ``shards`` for "sharded").
+    """
+    try:
+        backend = STORAGE_BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen depolama türü: {kind}") from None
+    return backend(path, **options)
@@ -0,0 +1,22 @@
+import pytest
+
+from services.library_service import LibraryService
+from services.open_library import OpenLibraryClient
+from tests.stub_server import OpenLibraryStub
+
+
+def make_library(tmp_path, stub: OpenLibraryStub, journal: bool = False, **client_options) -> LibraryService:
+    """A LibraryService on ``tmp_path/lib.json`` that fetches from ``stub``."""
+    return LibraryService(str(tmp_path / "lib.json"), journal=journal,
+                          open_library=OpenLibraryClient(base_url=stub.base_url, **client_options))
+
+
+@pytest.fixture
+def open_library_stub():
+    """A running local Open Library stub with one book by two authors."""
+    stub = OpenLibraryStub(
+        books={"9780441172719": {"title": "Dune", "authors": ["/authors/OL1A", "/authors/OL2A"]}},
+        authors={"/authors/OL1A": "Frank Herbert", "/authors/OL2A": "Brian Herbert"},
+    )
+    with stub:
+        yield stub
@@ -0,0 +1,155 @@
+"""Local stand-in for openlibrary.org used by tests and benchmarks.
+
+Serves ``/isbn/{isbn}.json``, ``/authors/{key}.json`` and the multi-bibkey
+``/api/books`` endpoint from in-memory dicts with an optional per-request
+latency and error rate, over HTTP/1.1 keep-alive so connection reuse can be
+observed.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+_ISBN_PATH = re.compile(r"^/isbn/([^/]+)\.json$")
+_AUTHOR_PATH = re.compile(r"^(/authors/[^/]+)\.json$")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Zaman aşımı ve hedge testlerinde istemcinin bağlantıyı kesmesi beklenir
+        pass
+
+
+class OpenLibraryStub:
+    """Threaded HTTP server mimicking the Open Library endpoints we use.
+
+    ``books`` maps ISBN -> {"title": ..., "authors": [author keys]} and
+    ``authors`` maps author key (e.g. "/authors/OL1A") -> name. ISBNs in
+    ``batch_exclude`` are left out of ``/api/books`` responses, like records
+    the bibkeys API does not know about.
+
+    A fraction ``error_rate`` of requests is answered with ``error_status``
+    instead; the draws come from a seeded generator so runs are repeatable.
+    ``faults`` scripts the next requests in order: each (status, delay) pair
+    delays one request by ``delay`` seconds and, unless status is None,
+    answers it with that status.
+    """
+
+    def __init__(self, books: Optional[Dict[str, dict]] = None,
+                 authors: Optional[Dict[str, str]] = None, latency: float = 0.0,
+                 batch_exclude: Optional[Set[str]] = None, error_rate: float = 0.0,
+                 error_status: int = 503, seed: int = 0):
+        self.books = books or {}
+        self.authors = authors or {}
+        self.latency = latency
+        self.batch_exclude = batch_exclude or set()
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.faults: List[Tuple[Optional[int], float]] = []
+        self.requests: List[str] = []
+        self.connections = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OpenLibraryStub":
+        self._server = _Server(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "OpenLibraryStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def respond(self, path: str):
+        """Returns (status, body) for a request path."""
+        url = urlsplit(path)
+        if url.path == "/api/books":
+            return 200, self._batch(parse_qs(url.query).get("bibkeys", [""])[0])
+        match = _ISBN_PATH.match(path)
+        if match:
+            book = self.books.get(match.group(1))
+            if book is None:
+                return 404, {"error": "notfound"}
+            return 200, {"title": book["title"],
+                         "authors": [{"key": key} for key in book.get("authors", [])]}
+        match = _AUTHOR_PATH.match(path)
+        if match and match.group(1) in self.authors:
+            return 200, {"name": self.authors[match.group(1)]}
+        return 404, {"error": "notfound"}
+
+    def _batch(self, bibkeys: str) -> dict:
+        result = {}
+        for bibkey in filter(None, bibkeys.split(",")):
+            isbn = bibkey.split(":", 1)[-1]
+            book = self.books.get(isbn)
+            if book is None or isbn in self.batch_exclude:
+                continue
+            result[bibkey] = {
+                "title": book["title"],
+                "authors": [{"url": f"https://openlibrary.org{key}", "name": self.authors[key]}
+                            for key in book.get("authors", []) if key in self.authors],
+            }
+        return result
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append(self.path)
+                    fault_status, delay = stub.faults.pop(0) if stub.faults else (None, 0.0)
+                    failed = stub.error_rate and stub._random.random() < stub.error_rate
+                    if failed or fault_status is not None:
+                        stub.errors += 1
+                if stub.latency or delay:
+                    time.sleep(stub.latency + delay)
+                if fault_status is not None:
+                    status, body = fault_status, {"error": "unavailable"}
+                elif failed:
+                    status, body = stub.error_status, {"error": "unavailable"}
+                else:
+                    status, body = stub.respond(self.path)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
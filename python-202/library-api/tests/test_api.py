@@ -3,6 +3,7 @@ from unittest.mock import patch, Mock
 import httpx
 import tempfile
 import os
+import time
 
 from api import app
 from services.library_service import LibraryService
@@ -108,3 +109,240 @@ def test_delete_books_ok_and_404(tmp_path):
     assert resp_del2.status_code == 404
 
 
+
+
+def test_post_and_get_with_sqlite_storage(tmp_path):
+    from services.storage import SqliteStorage
+
+    app.state.library = LibraryService(storage=SqliteStorage(str(tmp_path / "api_lib.db")))
+    client = TestClient(app)
+
+    book_resp = Mock(); book_resp.status_code = 200; book_resp.json.return_value = {
+        "title": "Dune", "authors": []
+    }
+    client_mock = Mock(); client_mock.get.side_effect = [book_resp]
+    client_mock.__enter__ = Mock(return_value=client_mock)
+    client_mock.__exit__ = Mock(return_value=None)
+
+    with patch("httpx.Client", return_value=client_mock):
+        resp = client.post("/books", json={"isbn": "9780000000003"})
+        assert resp.status_code == 201
+
+    assert client.get("/books").json() == [{"title": "Dune", "author": "", "isbn": "9780000000003"}]
+    assert client.delete("/books/9780000000003").status_code == 204
+    assert app.state.library.storage.get("9780000000003") is None
+
+
+# ---- Sayfalama ve NDJSON ----
+import json
+
+from models.book_model import Book
+
+
+def _fill(library, count):
+    for i in reversed(range(count)):
+        library.books.append(Book(f"Kitap {i}", "Yazar", f"978{i:010d}"))
+
+
+def test_get_books_offset_pagination_in_isbn_order(tmp_path):
+    library = override_library(tmp_path)
+    _fill(library, 5)
+    client = TestClient(app)
+
+    resp = client.get("/books", params={"limit": 2, "offset": 1})
+    assert resp.status_code == 200
+    assert [b["isbn"] for b in resp.json()] == ["9780000000001", "9780000000002"]
+    assert resp.headers["X-Total-Count"] == "5"
+    assert resp.headers["X-Next-After"] == "9780000000002"
+
+
+def test_get_books_cursor_pagination_survives_deletes(tmp_path):
+    library = override_library(tmp_path)
+    _fill(library, 5)
+    client = TestClient(app)
+
+    first = client.get("/books", params={"limit": 2})
+    cursor = first.headers["X-Next-After"]
+    library.remove_book(cursor)
+
+    second = client.get("/books", params={"limit": 2, "after": cursor})
+    third = client.get("/books", params={"limit": 2, "after": second.headers["X-Next-After"]})
+    assert [b["isbn"] for b in second.json()] == ["9780000000002", "9780000000003"]
+    assert [b["isbn"] for b in third.json()] == ["9780000000004"]
+    assert "X-Next-After" not in third.headers
+
+
+def test_get_books_rejects_oversized_limit(tmp_path):
+    override_library(tmp_path)
+    client = TestClient(app)
+    assert client.get("/books", params={"limit": 100000}).status_code == 422
+
+
+def test_get_books_ndjson_stream(tmp_path):
+    library = override_library(tmp_path)
+    _fill(library, 3)
+    client = TestClient(app)
+
+    resp = client.get("/books", params={"format": "ndjson"})
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines[0] == {"title": "Kitap 0", "author": "Yazar", "isbn": "9780000000000"}
+    assert len(lines) == 3
+
+    resp = client.get("/books", headers={"Accept": "application/x-ndjson"})
+    assert len(resp.text.splitlines()) == 3
+
+
+# ---- ETag / 304 ----
+
+def test_get_books_etag_and_not_modified(tmp_path):
+    library = override_library(tmp_path)
+    _fill(library, 2)
+    client = TestClient(app)
+
+    first = client.get("/books")
+    etag = first.headers["ETag"]
+    assert len(first.json()) == 2
+
+    not_modified = client.get("/books", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    library.remove_book("9780000000000")
+    changed = client.get("/books", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [b["isbn"] for b in changed.json()] == ["9780000000001"]
+
+
+def test_get_books_reuses_serialized_body_per_version(tmp_path):
+    library = override_library(tmp_path)
+    _fill(library, 2)
+    client = TestClient(app)
+
+    with patch.object(library, "list_books", wraps=library.list_books) as list_books:
+        client.get("/books")
+        client.get("/books")
+        assert list_books.call_count == 1
+
+        library.books.append(Book("Yeni", "Yazar", "9781111111111"))
+        assert len(client.get("/books").json()) == 3
+        assert list_books.call_count == 2
+
+
+# ---- Başlık/yazar araması ----
+
+def test_search_books_endpoint(tmp_path):
+    library = override_library(tmp_path)
+    library.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    library.books.append(Book("Foundation", "Isaac Asimov", "9780553293357"))
+    client = TestClient(app)
+
+    resp = client.get("/books/search", params={"q": "herb"})
+    assert resp.status_code == 200
+    assert resp.json() == [{"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719"}]
+    assert client.get("/books/search", params={"q": "tolkien"}).json() == []
+    assert client.get("/books/search").status_code == 422
+
+
+# ---- Yazar indeksi ve başlık sıralaması ----
+
+def test_get_books_sorted_by_title_with_cursor(tmp_path):
+    library = override_library(tmp_path)
+    for title, isbn in [("Zeytin", "9780000000001"), ("elma", "9780000000002"), ("Armut", "9780000000003")]:
+        library.books.append(Book(title, "Yazar", isbn))
+    client = TestClient(app)
+
+    first = client.get("/books", params={"sort": "title", "limit": 2})
+    assert [b["title"] for b in first.json()] == ["Armut", "elma"]
+    assert first.headers["X-Total-Count"] == "3"
+
+    second = client.get("/books", params={"sort": "title", "limit": 2, "after": first.headers["X-Next-After"]})
+    assert [b["title"] for b in second.json()] == ["Zeytin"]
+    assert "X-Next-After" not in second.headers
+    assert client.get("/books", params={"sort": "title", "after": "bozuk"}).status_code == 400
+
+
+def test_get_author_books(tmp_path):
+    library = override_library(tmp_path)
+    library.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    library.books.append(Book("The Road to Dune", "Brian Herbert, Frank Herbert", "9780765353702"))
+    client = TestClient(app)
+
+    resp = client.get("/authors/frank herbert/books", params={"limit": 1})
+    assert [b["title"] for b in resp.json()] == ["Dune"]
+    assert resp.headers["X-Total-Count"] == "2"
+    nxt = client.get("/authors/frank herbert/books", params={"after": resp.headers["X-Next-After"]})
+    assert [b["title"] for b in nxt.json()] == ["The Road to Dune"]
+
+    assert client.get("/authors/Tolkien/books").status_code == 404
+
+
+def test_title_cursor_pages_past_non_latin1_titles(tmp_path):
+    library = override_library(tmp_path)
+    for title, isbn in [("Şeker Portakalı", "9780000000001"), ("Çalıkuşu", "9780000000002"),
+                        ("İnce Memed", "9780000000003")]:
+        library.books.append(Book(title, "Reşat Nuri", isbn))
+    client = TestClient(app)
+
+    seen = []
+    params = {"sort": "title", "limit": 1}
+    while True:
+        resp = client.get("/books", params=params)
+        assert resp.status_code == 200
+        seen += [b["title"] for b in resp.json()]
+        if "X-Next-After" not in resp.headers:
+            break
+        params["after"] = resp.headers["X-Next-After"]
+    assert sorted(seen) == sorted(["Şeker Portakalı", "Çalıkuşu", "İnce Memed"]) and len(seen) == 3
+
+    first = client.get("/authors/reşat nuri/books", params={"limit": 1})
+    assert first.status_code == 200
+    rest = client.get("/authors/reşat nuri/books", params={"after": first.headers["X-Next-After"]})
+    assert len(rest.json()) == 2
+
+
+# ---- Lifespan ----
+
+def test_lifespan_loads_library_on_startup_and_closes_it(tmp_path):
+    from config import Settings
+
+    path = tmp_path / "lifespan.json"
+    path.write_text(json.dumps([{"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719"}]))
+    previous = app.state.settings
+    app.state.library = None
+    app.state.settings = Settings(storage="json", library_path=str(path), cache_size=0)
+    try:
+        with TestClient(app) as client:
+            assert [b["title"] for b in client.get("/books").json()] == ["Dune"]
+        assert app.state.library is None
+    finally:
+        app.state.settings = previous
+
+
+def test_lifespan_builds_indexes_in_the_background(tmp_path):
+    from config import Settings
+
+    path = tmp_path / "lifespan.json"
+    path.write_text(json.dumps([{"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719"}]))
+    previous = app.state.settings
+    app.state.library = None
+    app.state.settings = Settings(storage="json", library_path=str(path), cache_size=0)
+    try:
+        with TestClient(app) as client:
+            library = app.state.library
+            deadline = time.monotonic() + 5
+            while "d" not in library.search_index._short and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert set(library._indexed) == {"search_index", "title_index", "author_index"}
+            assert [b["title"] for b in client.get("/books/search", params={"q": "d"}).json()] == ["Dune"]
+    finally:
+        app.state.settings = previous
+
+
+def test_lifespan_keeps_preconfigured_library(tmp_path):
+    library = override_library(tmp_path)
+    with TestClient(app):
+        assert app.state.library is library
+    assert app.state.library is library
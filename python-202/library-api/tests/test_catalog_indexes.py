@@ -0,0 +1,70 @@
+import pytest
+
+from models.book_catalog import BookCatalog
+from models.book_model import Book
+from services.catalog_indexes import (
+    AuthorIndex,
+    TitleIndex,
+    parse_title_cursor,
+    split_authors,
+    title_cursor,
+)
+
+
+def _catalog():
+    catalog = BookCatalog([
+        Book("dune", "Frank Herbert", "9780441172719"),
+        Book("Children of Dune", "Frank Herbert", "9780593098240"),
+        Book("The Road to Dune", "Brian Herbert, Kevin J. Anderson, Frank Herbert", "9780765353702"),
+        Book("Foundation", "Isaac Asimov", "9780553293357"),
+    ])
+    titles, authors = TitleIndex(), AuthorIndex()
+    catalog.add_index(titles)
+    catalog.add_index(authors)
+    return catalog, titles, authors
+
+
+def _titles(catalog, keys):
+    return [catalog.get(key).title for key in keys]
+
+
+def test_split_authors_handles_joined_names():
+    assert split_authors("Brian Herbert, Kevin J. Anderson") == ["Brian Herbert", "Kevin J. Anderson"]
+    assert split_authors("") == []
+
+
+def test_title_index_pages_case_insensitively_and_follows_changes():
+    catalog, titles, _ = _catalog()
+
+    assert _titles(catalog, titles.page()) == ["Children of Dune", "dune", "Foundation", "The Road to Dune"]
+    assert _titles(catalog, titles.page(offset=1, limit=2)) == ["dune", "Foundation"]
+
+    catalog.append(Book("Emma", "Jane Austen", "9780141439587"))
+    catalog.pop("9780553293357")
+    assert _titles(catalog, titles.page()) == ["Children of Dune", "dune", "Emma", "The Road to Dune"]
+
+
+def test_title_cursor_survives_deleting_the_cursor_book():
+    catalog, titles, _ = _catalog()
+    first = titles.page(limit=2)
+    cursor = title_cursor(catalog.get(first[-1]))
+
+    catalog.pop(first[-1])
+    assert _titles(catalog, titles.page(after=parse_title_cursor(cursor))) == ["Foundation", "The Road to Dune"]
+
+    with pytest.raises(ValueError):
+        parse_title_cursor("imleç-yok")
+
+
+def test_author_index_lists_each_individual_author():
+    catalog, _, authors = _catalog()
+
+    assert authors.count("Frank Herbert") == 3
+    assert _titles(catalog, authors.page("frank  HERBERT")) == ["Children of Dune", "dune", "The Road to Dune"]
+    assert _titles(catalog, authors.page("Kevin J. Anderson")) == ["The Road to Dune"]
+    assert authors.page("Yok Böyle Biri") == []
+
+    catalog.append(Book("The Road to Dune", "Brian Herbert", "9780765353702"))
+    assert authors.count("Kevin J. Anderson") == 0
+    assert authors.count("Frank Herbert") == 2
+    assert authors.count("Brian Herbert") == 1
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+from models.book_model import Book
+from services.change_log import ChangeLog, ResyncRequired
+from services.library_service import LibraryService
+
+DUNE = Book("Dune", "Frank Herbert", "9780441172719")
+ULYSSES = Book("Ulysses", "James Joyce", "9780199535675")
+
+
+def test_since_returns_changes_after_position():
+    log = ChangeLog()
+    log.record_add(DUNE)
+    log.record_add_many([ULYSSES])
+    log.record_remove(DUNE.isbn)
+
+    batch = log.since(1)
+    assert [(c.seq, c.op, c.isbn) for c in batch.changes] == [(2, "add", ULYSSES.isbn), (3, "remove", DUNE.isbn)]
+    assert batch.latest == 3
+    assert [c.seq for c in log.since(0, limit=2).changes] == [1, 2]
+    assert log.since(3).changes == []
+
+
+def test_positions_outside_the_window_require_resync():
+    log = ChangeLog(max_entries=2)
+    for i in range(5):
+        log.record_add(Book(f"Kitap {i}", "Yazar", f"978{i:010d}"))
+
+    assert [c.seq for c in log.since(3).changes] == [4, 5]
+    with pytest.raises(ResyncRequired):
+        log.since(2)
+    with pytest.raises(ResyncRequired):
+        log.since(6)
+    with pytest.raises(ResyncRequired):
+        log.since(5, epoch="baska")
+
+
+def test_reset_starts_a_new_epoch():
+    log = ChangeLog()
+    log.record_add(DUNE)
+    epoch, seq = log.position()
+
+    log.reset()
+
+    with pytest.raises(ResyncRequired):
+        log.since(seq)  # epoch gönderilmese de
+    new_epoch, new_seq = log.position()
+    assert new_epoch != epoch
+    assert log.since(new_seq, epoch=new_epoch).changes == []
+
+
+def test_wait_wakes_on_change_from_another_thread():
+    log = ChangeLog()
+
+    async def wait():
+        threading.Timer(0.05, log.record_add, args=(DUNE,)).start()
+        start = time.perf_counter()
+        await log.wait(0, timeout=5)
+        return time.perf_counter() - start
+
+    assert asyncio.run(wait()) < 1
+    assert asyncio.run(log.wait(1, timeout=0.01)) is None
+
+
+def test_service_logs_adds_and_removes(tmp_path):
+    service = LibraryService(str(tmp_path / "lib.json"))
+    _, start = service.changes.position()
+    service.import_books([DUNE, ULYSSES])
+    service.remove_book(DUNE.isbn)
+    service.remove_book(DUNE.isbn)
+
+    assert [(c.op, c.isbn) for c in service.changes.since(start).changes] == [
+        ("add", DUNE.isbn), ("add", ULYSSES.isbn), ("remove", DUNE.isbn)]
+
+    service.load_books()
+    with pytest.raises(ResyncRequired):
+        service.changes.since(start + 3)
+
+
+def test_api_changes_feed_and_resync(tmp_path):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"), change_log_size=2)
+    app.state.library.import_books([DUNE])
+    client = TestClient(app)
+
+    full = client.get("/books")
+    epoch, seq = full.headers["x-change-epoch"], int(full.headers["x-change-seq"])
+    app.state.library.import_books([ULYSSES])
+    app.state.library.remove_book(DUNE.isbn)
+
+    body = client.get("/changes", params={"since": seq, "epoch": epoch}).json()
+    assert body["epoch"] == epoch
+    assert [(c["op"], c["isbn"]) for c in body["changes"]] == [("add", ULYSSES.isbn), ("remove", DUNE.isbn)]
+    assert body["changes"][0]["book"]["title"] == "Ulysses"
+    assert body["next"] == body["latest"] == seq + 2
+
+    assert client.get("/changes", params={"since": body["next"]}).json()["changes"] == []
+    resync = client.get("/changes", params={"since": seq - 1})
+    assert resync.status_code == 410
+    assert "Tam senkronizasyon" in resync.json()["detail"]
+
+
+def test_api_changes_long_poll(tmp_path):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+    _, seq = app.state.library.changes.position()
+    threading.Timer(0.1, app.state.library.import_books, args=([DUNE],)).start()
+
+    start = time.perf_counter()
+    body = TestClient(app).get("/changes", params={"since": seq, "wait": 5}).json()
+
+    assert time.perf_counter() - start < 2
+    assert [c["isbn"] for c in body["changes"]] == [DUNE.isbn]
@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from services.library_service import AddResult, LibraryService
+from services.rw_lock import ReadWriteLock
+
+
+def test_readers_share_the_lock_and_writers_wait_for_them():
+    lock = ReadWriteLock()
+    events = []
+
+    with lock.read():
+        with lock.read():
+            events.append("iki okuyucu")
+
+        def write():
+            with lock.write():
+                events.append("yazar")
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        time.sleep(0.05)
+        assert events == ["iki okuyucu"]
+    writer.join(1)
+    assert events == ["iki okuyucu", "yazar"]
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = ReadWriteLock()
+    order = []
+    first_reader = lock.read()
+    first_reader.__enter__()
+
+    def write():
+        with lock.write():
+            order.append("yazar")
+
+    def late_read():
+        with lock.read():
+            order.append("geç okuyucu")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    time.sleep(0.05)
+    reader = threading.Thread(target=late_read)
+    reader.start()
+    time.sleep(0.05)
+    assert order == []
+
+    first_reader.__exit__(None, None, None)
+    writer.join(1)
+    reader.join(1)
+    assert order == ["yazar", "geç okuyucu"]
+
+
+def _slow_client(delay: float = 0.005):
+    client = Mock()
+
+    def fetch(isbn):
+        time.sleep(delay)
+        return f"Kitap {isbn}", f"Yazar {int(isbn) % 7}"
+
+    client.fetch_book.side_effect = fetch
+    return client
+
+
+def test_concurrent_readers_and_writers_lose_no_updates(tmp_path):
+    path = tmp_path / "library.json"
+    service = LibraryService(str(path), open_library=_slow_client())
+    isbns = [f"978{i:010d}" for i in range(120)]
+    stop = threading.Event()
+    read_errors = []
+
+    def read_loop():
+        while not stop.is_set():
+            try:
+                books = service.list_books()
+                assert len(service.page_books(limit=50)) <= 50
+                service.search_books("kitap")
+                service.books_by_author("Yazar 3")
+                assert len(books) <= len(isbns)
+                time.sleep(0.001)
+            except Exception as exc:  # pragma: no cover - yalnız hata durumunda
+                read_errors.append(exc)
+
+    readers = [threading.Thread(target=read_loop) for _ in range(6)]
+    for reader in readers:
+        reader.start()
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(service.add_book_result, isbns + isbns[:30]))
+        removed = list(pool.map(service.remove_book, isbns[:20]))
+    stop.set()
+    for reader in readers:
+        reader.join(5)
+
+    assert read_errors == []
+    assert results.count(AddResult.CREATED) == len(isbns)
+    assert all(removed)
+    expected = sorted(isbns[20:])
+    assert sorted(b.isbn for b in service.list_books()) == expected
+    assert sorted(b.isbn for b in LibraryService(str(path)).list_books()) == expected
+
+
+def test_reads_do_not_wait_for_open_library_fetches(tmp_path):
+    release = threading.Event()
+    client = Mock()
+    client.fetch_book.side_effect = lambda isbn: (release.wait(5), ("Dune", "Frank Herbert"))[1]
+    service = LibraryService(str(tmp_path / "library.json"), open_library=client)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(service.add_book_result, "9780441172719")
+        time.sleep(0.05)
+        start = time.perf_counter()
+        assert service.list_books() == []
+        assert service.search_books("dune") == []
+        assert time.perf_counter() - start < 0.5
+        release.set()
+        assert pending.result(5) is AddResult.CREATED
+    assert [b.title for b in service.list_books()] == ["Dune"]
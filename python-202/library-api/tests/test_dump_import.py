@@ -0,0 +1,115 @@
+import gzip
+import json
+from unittest.mock import Mock
+
+from models.book_model import Book
+from services.dump_import import (
+    AUTHOR_TYPE,
+    AuthorLookup,
+    import_into_cache,
+    import_into_library,
+    iter_dump,
+    iter_editions,
+    main,
+)
+from services.library_service import LibraryService
+from services.metadata_cache import MetadataCache
+from services.open_library import OpenLibraryClient
+from services.storage import JournalStorage
+
+
+def _write_dump(path, rows):
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        for kind, key, record in rows:
+            file.write(f"{kind}\t{key}\t1\t2024-01-01T00:00:00\t{json.dumps(record)}\n")
+
+
+def _dumps(tmp_path):
+    authors = tmp_path / "authors.txt.gz"
+    editions = tmp_path / "editions.txt.gz"
+    _write_dump(authors, [
+        ("/type/author", "/authors/OL1A", {"key": "/authors/OL1A", "name": "Frank Herbert"}),
+        ("/type/author", "/authors/OL2A", {"key": "/authors/OL2A", "name": "Brian Herbert"}),
+        ("/type/author", "/authors/OL3A", {"key": "/authors/OL3A", "name": "James Joyce"}),
+        ("/type/redirect", "/authors/OL4A", {"location": "/authors/OL3A"}),
+    ])
+    _write_dump(editions, [
+        ("/type/edition", "/books/OL1M", {
+            "title": "Dune", "isbn_13": ["9780441172719"], "isbn_10": ["0441172717"],
+            "authors": [{"key": "/authors/OL1A"}, {"key": "/authors/OL2A"}],
+        }),
+        ("/type/edition", "/books/OL2M", {
+            "title": "Ulysses", "isbn_13": ["978-0199535675"], "authors": [{"key": "/authors/OL3A"}],
+        }),
+        ("/type/edition", "/books/OL3M", {"title": "No ISBN", "authors": [{"key": "/authors/OL3A"}]}),
+        ("/type/edition", "/books/OL4M", {"title": "Bad ISBN", "isbn_10": ["12"]}),
+    ])
+    with open(editions, 'ab') as raw:
+        raw.write(gzip.compress(b"/type/edition\t/books/OL5M\t1\t2024\t{broken\n"))
+    lookup = AuthorLookup(str(tmp_path / "authors.db"))
+    lookup.build(iter_dump(str(authors), AUTHOR_TYPE))
+    return str(authors), str(editions), lookup
+
+
+def test_iter_editions_resolves_authors_and_skips_unusable_records(tmp_path):
+    _, editions, lookup = _dumps(tmp_path)
+
+    result = list(iter_editions(editions, lookup, chunk_size=1))
+
+    assert len(lookup) == 3
+    assert [(e.isbns, e.title, e.authors) for e in result] == [
+        (["9780441172719", "0441172717"], "Dune", "Frank Herbert, Brian Herbert"),
+        (["9780199535675"], "Ulysses", "James Joyce"),
+    ]
+    wanted = list(iter_editions(editions, lookup, wanted={"0441172717"}))
+    assert [e.isbns for e in wanted] == [["0441172717"]]
+
+
+def test_import_into_library_skips_existing_books(tmp_path):
+    _, editions, lookup = _dumps(tmp_path)
+    service = LibraryService(str(tmp_path / "lib.json"), journal=True)
+
+    assert import_into_library(service, iter_editions(editions, lookup), chunk_size=1) == 2
+    assert import_into_library(service, iter_editions(editions, lookup)) == 0
+
+    reloaded = LibraryService(str(tmp_path / "lib.json"), journal=True)
+    assert reloaded.find_book("9780441172719").author == "Frank Herbert, Brian Herbert"
+    assert reloaded.count_books() == 2
+
+
+def test_import_books_keeps_journal_compactions_logarithmic(tmp_path):
+    storage = JournalStorage(str(tmp_path / "lib.json"), compact_every=10)
+    storage.save = Mock(wraps=storage.save)
+    service = LibraryService(storage=storage)
+
+    books = (Book(f"Kitap {i}", "Yazar", f"978{i:010d}") for i in range(1000))
+    assert service.import_books(books, chunk_size=10) == 1000
+
+    assert storage.save.call_count <= 8
+    assert LibraryService(storage=JournalStorage(str(tmp_path / "lib.json"))).count_books() == 1000
+
+
+def test_seeded_cache_serves_fetch_book_without_network(tmp_path):
+    _, editions, lookup = _dumps(tmp_path)
+    cache_path = str(tmp_path / "cache.json")
+    assert import_into_cache(MetadataCache(path=cache_path), iter_editions(editions, lookup), ttl=3600) == 3
+
+    client = OpenLibraryClient(base_url="http://127.0.0.1:9", cache=MetadataCache(path=cache_path))
+    client._fetch_book_remote = Mock(side_effect=AssertionError("network"))
+
+    assert client.fetch_book("0-441-17271-7") == ("Dune", "Frank Herbert, Brian Herbert")
+    assert client.fetch_book("9780199535675") == ("Ulysses", "James Joyce")
+
+
+def test_cli_seeds_library_with_isbn_filter(tmp_path, monkeypatch, capsys):
+    authors, editions, lookup = _dumps(tmp_path)
+    lookup.close()
+    isbns = tmp_path / "isbns.txt"
+    isbns.write_text("# seed\n978-0199535675\n", encoding='utf-8')
+    monkeypatch.setenv("LIBRARY_PATH", str(tmp_path / "cli.json"))
+
+    main(["--authors", authors, "--editions", editions, "--lookup", str(tmp_path / "cli.db"),
+          "--isbns", str(isbns)])
+
+    assert "1 kitap eklendi" in capsys.readouterr().out
+    assert [book.title for book in LibraryService(str(tmp_path / "cli.json")).list_books()] == ["Ulysses"]
@@ -0,0 +1,189 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+from services.ingest import Ingestor, JobStatus, JobStore
+from services.library_service import AddResult
+from tests.conftest import make_library
+
+
+def wait_for(store: JobStore, job_id: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job.status in (JobStatus.DONE, JobStatus.FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"iş bitmedi: {job_id}")
+
+
+def test_store_deduplicates_unfinished_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first = store.enqueue("978-0441172719")
+
+    assert store.enqueue("9780441172719").id == first.id
+    store.claim(10)
+    store.finish({first.id: AddResult.CREATED})
+    assert store.enqueue("9780441172719").id != first.id
+    store.close()
+
+
+def test_store_requeues_interrupted_jobs_on_reopen(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    interrupted = store.enqueue("9780441172719")
+    queued = store.enqueue("9780000000000")
+    assert [job.id for job in store.claim(1)] == [interrupted.id]
+    store.close()
+
+    store = JobStore(path)
+    assert store.get(interrupted.id).status is JobStatus.QUEUED
+    assert store.pending() == 2
+    assert [job.id for job in store.claim(10)] == [interrupted.id, queued.id]
+    store.close()
+
+
+def test_opening_a_store_leaves_live_claims_alone(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first = JobStore(path)
+    job = first.enqueue("9780441172719")
+    assert [claimed.id for claimed in first.claim(10)] == [job.id]
+
+    second = JobStore(path)  # ör. yeniden başlayan başka bir worker
+    assert second.get(job.id).status is JobStatus.RUNNING
+    assert second.claim(10) == []
+
+    first.close()
+    assert [claimed.id for claimed in second.claim(10)] == [job.id]
+    second.close()
+
+
+def _claim_and_die(path):
+    JobStore(path).claim(10)
+    os._exit(0)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork gerektirir")
+def test_claims_of_a_dead_process_or_an_expired_lease_are_requeued(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    job = store.enqueue("9780441172719")
+    worker = multiprocessing.get_context("fork").Process(target=_claim_and_die, args=(path,))
+    worker.start()
+    worker.join(10)
+    assert store.get(job.id).status is JobStatus.RUNNING
+
+    assert [claimed.id for claimed in store.claim(10)] == [job.id]
+    assert store.claim(10) == []
+
+    expired = JobStore(path, lease=0)
+    assert [claimed.id for claimed in expired.claim(10)] == [job.id]
+    expired.close()
+    store.close()
+
+
+def test_ingestor_adds_queued_isbns_in_batches(tmp_path, open_library_stub):
+    library = make_library(tmp_path, open_library_stub)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    ingestor = Ingestor(library, store, batch_size=10)
+    found = ingestor.submit("9780441172719")
+    missing = ingestor.submit("9780000000000")
+
+    assert ingestor.run_once() == 2
+    assert store.get(found.id).result is AddResult.CREATED
+    assert store.get(missing.id).result is AddResult.NOT_FOUND
+    assert library.find_book("9780441172719").title == "Dune"
+    # Tek bir /api/books isteği, ardından bulunamayan ISBN için tek istek
+    assert sum(path.startswith("/api/books") for path in open_library_stub.requests) == 1
+    store.close()
+
+
+def test_queue_survives_restart(tmp_path, open_library_stub):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    job = Ingestor(make_library(tmp_path, open_library_stub), store).submit("9780441172719")
+    store.close()
+
+    library = make_library(tmp_path, open_library_stub)
+    ingestor = Ingestor(library, JobStore(path), poll_interval=0.01).start()
+    try:
+        assert wait_for(ingestor.store, job.id).result is AddResult.CREATED
+    finally:
+        ingestor.stop()
+        ingestor.store.close()
+    assert library.find_book("9780441172719") is not None
+
+
+def test_api_post_books_enqueues_and_reports_job(tmp_path, open_library_stub):
+    app.state.library = make_library(tmp_path, open_library_stub)
+    app.state.ingest = Ingestor(app.state.library, JobStore(str(tmp_path / "jobs.db")), poll_interval=0.01).start()
+    try:
+        client = TestClient(app)
+        resp = client.post("/books", json={"isbn": "9780441172719"})
+        assert resp.status_code == 202
+        job_id = resp.json()["id"]
+        assert resp.headers["location"] == f"/jobs/{job_id}"
+        assert resp.json()["status"] in ("queued", "running", "done")
+
+        wait_for(app.state.ingest.store, job_id)
+        body = client.get(f"/jobs/{job_id}").json()
+        assert body["status"] == "done"
+        assert body["result"] == "created"
+        assert body["book"]["title"] == "Dune"
+
+        assert client.post("/books", json={"isbn": "12345"}).status_code == 400
+        assert client.post("/books", json={"isbn": "9780441172719"}).status_code == 409
+        assert client.get("/jobs/yok").status_code == 404
+    finally:
+        app.state.ingest.stop()
+        app.state.ingest.store.close()
+        app.state.ingest = None
+
+
+def test_upstream_errors_are_retried_until_attempts_run_out(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"), max_attempts=2, retry_delay=0.05)
+    job = store.enqueue("9780441172719")
+
+    assert store.claim(10)[0].attempts == 1
+    store.finish({job.id: AddResult.UPSTREAM_ERROR})
+    assert store.get(job.id).status is JobStatus.QUEUED
+    assert store.claim(10) == []  # bekleme süresi dolmadı
+    time.sleep(0.06)
+
+    assert [claimed.attempts for claimed in store.claim(10)] == [2]
+    store.finish({job.id: None})
+    failed = store.get(job.id)
+    assert failed.status is JobStatus.FAILED and failed.attempts == 2
+    store.close()
+
+
+def test_stores_sharing_a_file_never_claim_the_same_job(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first, second = JobStore(path), JobStore(path)
+    for i in range(200):
+        first.enqueue(f"978{i:010d}")
+    claimed = {0: [], 1: []}
+
+    def drain(index, store):
+        while True:
+            jobs = store.claim(3)
+            if not jobs:
+                return
+            claimed[index].extend(job.id for job in jobs)
+
+    threads = [threading.Thread(target=drain, args=item) for item in enumerate((first, second))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed[0]) + len(claimed[1]) == 200
+    assert not set(claimed[0]) & set(claimed[1])
+    first.close()
+    second.close()
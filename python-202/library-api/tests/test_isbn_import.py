@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from main import main
+from models.book_model import Book
+from services.isbn_import import Checkpoint, ImportSummary, export_books, import_isbns, iter_lines
+from services.library_service import AddResult, LibraryService
+from tests.conftest import make_library
+
+BOOKS = {f"978{i:010d}": {"title": f"Kitap {i}", "authors": ["/authors/OL9A"]} for i in range(1, 11)}
+
+
+@pytest.fixture
+def stub(open_library_stub):
+    open_library_stub.books.update(BOOKS)
+    open_library_stub.authors["/authors/OL9A"] = "Yazar"
+    return open_library_stub
+
+
+def test_import_validates_dedupes_and_reports_failures(tmp_path, stub):
+    library = make_library(tmp_path, stub, journal=True, batch_size=4)
+    source = io.StringIO("# liste\n9780000000001\n978-0000000001\nabc\n\n9780000000002\n9781111111111\n")
+    failures = io.StringIO()
+
+    summary = import_isbns(library, iter_lines(source), Checkpoint(None, "-"),
+                           batch_size=3, failures=failures)
+
+    assert summary.lines == 7
+    assert summary.counts[AddResult.CREATED] == 2
+    assert summary.counts[AddResult.DUPLICATE] == 1
+    assert summary.counts[AddResult.INVALID] == 1
+    assert summary.counts[AddResult.NOT_FOUND] == 1
+    assert failures.getvalue() == "abc\tinvalid\n9781111111111\tnot_found\n"
+    assert library.find_book("9780000000002").author == "Yazar"
+
+
+def test_import_writes_once_per_batch(tmp_path, stub):
+    library = make_library(tmp_path, stub, journal=True, batch_size=4)
+    lines = [f"978{i:010d}" for i in range(1, 11)]
+    record_add_many = Mock(wraps=library.storage.record_add_many)
+    library.storage.record_add_many = record_add_many
+
+    import_isbns(library, lines, Checkpoint(None, "-"), batch_size=5)
+
+    assert library.count_books() == 10
+    assert record_add_many.call_count == 2
+
+
+def test_import_resumes_from_checkpoint(tmp_path, stub):
+    path = tmp_path / "isbns.txt"
+    path.write_text("".join(f"978{i:010d}\n" for i in range(1, 7)), encoding="utf-8")
+    checkpoint = Checkpoint(str(tmp_path / "isbns.txt.checkpoint"), str(path))
+    done = ImportSummary(lines=4, elapsed=1.5)
+    done.counts[AddResult.CREATED] = 4
+    checkpoint.save(done)
+    library = make_library(tmp_path, stub, journal=True, batch_size=4)
+
+    with open(path, encoding="utf-8") as file:
+        summary = import_isbns(library, iter_lines(file, skip=checkpoint.load().lines), checkpoint)
+
+    assert [book.isbn for book in library.list_books()] == ["9780000000005", "9780000000006"]
+    assert summary.lines == 6
+    assert summary.counts[AddResult.CREATED] == 6
+    assert summary.elapsed >= 1.5
+    assert json.loads((tmp_path / "isbns.txt.checkpoint").read_text())["lines"] == 6
+
+
+def test_checkpoint_of_another_source_is_ignored(tmp_path):
+    path = str(tmp_path / "progress.json")
+    Checkpoint(path, "a.txt").save(ImportSummary(lines=10))
+
+    assert Checkpoint(path, "b.txt").load().lines == 0
+
+
+def test_export_streams_ndjson_and_csv(tmp_path):
+    library = LibraryService(str(tmp_path / "lib.json"))
+    library.import_books([Book("Dune", "Frank Herbert", "9780441172719"),
+                          Book("Ulysses", "James Joyce", "9780199535675")])
+
+    out = io.StringIO()
+    assert export_books(library, out) == 2
+    assert [json.loads(line)["title"] for line in out.getvalue().splitlines()] == ["Ulysses", "Dune"]
+
+    out = io.StringIO()
+    export_books(library, out, "csv")
+    assert list(csv.reader(io.StringIO(out.getvalue())))[1] == ["Ulysses", "James Joyce", "9780199535675"]
+
+
+def test_cli_import_and_export(tmp_path, stub, monkeypatch, capsys):
+    monkeypatch.setenv("LIBRARY_PATH", str(tmp_path / "cli.json"))
+    monkeypatch.setenv("OPEN_LIBRARY_URL", stub.base_url)
+    source = tmp_path / "isbns.txt"
+    source.write_text("9780000000001\n9780000000003\n9781111111111\n", encoding="utf-8")
+    failures = tmp_path / "failed.tsv"
+
+    assert main(["import", str(source), "--workers", "2", "--batch-size", "2",
+                 "--failures", str(failures)]) == 0
+    report = capsys.readouterr().err
+    assert "Eklendi: 2" in report and "bulunamadı: 1" in report
+    assert failures.read_text(encoding="utf-8") == "9781111111111\tnot_found\n"
+    assert not (tmp_path / "isbns.txt.checkpoint").exists()
+
+    assert main(["export", str(tmp_path / "out.ndjson")]) == 0
+    assert len((tmp_path / "out.ndjson").read_text(encoding="utf-8").splitlines()) == 2
@@ -205,3 +205,70 @@ def test_add_book_by_isbn_network_error(tmp_path):
         ok = service.add_book_by_isbn("9780441172719")
         assert ok is False
         assert len(service.books) == 0
+
+
+# ---- ISBN indeksi ----
+from models.book_catalog import BookCatalog
+from models.book_model import normalize_isbn
+
+
+def test_normalize_isbn_strips_separators():
+    assert normalize_isbn("978-0 441-17271-9") == "9780441172719"
+    assert normalize_isbn("0-306-40615-x") == "030640615X"
+
+
+def test_find_book_ignores_hyphens_and_spaces(tmp_path):
+    service = LibraryService(str(tmp_path / "lib.json"))
+    book = Book("Test Kitap", "Test Yazar", "978-1234567890")
+    service.books.append(book)
+
+    assert service.find_book("9781234567890") is book
+    assert service.find_book("978 1234567890") is book
+
+
+def test_remove_book_by_normalized_isbn(tmp_path):
+    service = LibraryService(str(tmp_path / "lib.json"))
+    service.books.append(Book("Test Kitap", "Test Yazar", "978-1234567890"))
+
+    assert service.remove_book("9781234567890") is True
+    assert service.find_book("978-1234567890") is None
+
+
+def test_book_catalog_keeps_insertion_order_and_replaces_duplicates():
+    first = Book("A", "Yazar", "9780000000001")
+    second = Book("B", "Yazar", "9780000000002")
+    replacement = Book("A2", "Yazar", "978-0000000001")
+    catalog = BookCatalog([first, second])
+    catalog.append(replacement)
+
+    assert len(catalog) == 2
+    assert [b.title for b in catalog] == ["A2", "B"]
+    assert catalog[-1] is second
+    with pytest.raises(ValueError):
+        catalog.remove(first)
+
+
+def test_iter_books_walks_catalog_in_chunks(tmp_path):
+    service = LibraryService(str(tmp_path / "lib.json"))
+    for i in range(7):
+        service.books.append(Book(f"Kitap {i}", "Yazar", f"978{i:010d}"))
+
+    assert [b.isbn for b in service.iter_books(chunk_size=3)] == [f"978{i:010d}" for i in range(7)]
+    assert [b.isbn for b in service.page_books(after="978-0000000004", limit=10)] == [
+        "9780000000005", "9780000000006",
+    ]
+
+
+def test_book_is_slotted_and_interns_author_names():
+    first = Book("A", "".join(["Frank ", "Herbert"]), "9780441172719")
+    second = create_book_from_dict({"title": "B", "author": "".join(["Frank ", "Herbert"]), "isbn": "9780593098233"})
+    assert first.author is second.author
+    assert not hasattr(first, "__dict__")
+
+
+def test_trusted_books_skip_validation_only_when_requested():
+    data = {"title": "Eski Kayıt", "author": "Yazar", "isbn": "123"}
+    with pytest.raises(ValueError):
+        create_book_from_dict(data)
+    assert create_book_from_dict(data, trusted=True).isbn == "123"
+    assert Book.trusted("Dune", "Frank Herbert", "9780441172719").to_dict()["title"] == "Dune"
@@ -0,0 +1,114 @@
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from api import app
+from services.library_service import LibraryService
+from services.metadata_cache import MISSING, MetadataCache
+from services.open_library import OpenLibraryClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_hits_misses_and_ttl():
+    clock = FakeClock()
+    cache = MetadataCache(ttl=60, negative_ttl=10, clock=clock)
+    cache.put("isbn:1", ("Dune", "Frank Herbert"))
+    cache.put("isbn:2", None)
+
+    assert cache.get("isbn:1") == ("Dune", "Frank Herbert")
+    assert cache.get("isbn:2") is None
+    assert cache.get("isbn:3") is MISSING
+
+    clock.now += 11
+    assert cache.get("isbn:2") is MISSING
+    assert cache.get("isbn:1") == ("Dune", "Frank Herbert")
+    assert cache.stats() == {"size": 1, "hits": 2, "negative_hits": 1, "misses": 2}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = MetadataCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = MetadataCache(path=path)
+    cache.put("isbn:9780441172719", ("Dune", "Frank Herbert"))
+    cache.put("isbn:0000000000", None)
+    cache.close()
+
+    warm = MetadataCache(path=path)
+    assert warm.get("isbn:9780441172719") == ("Dune", "Frank Herbert")
+    assert warm.get("isbn:0000000000") is None
+
+
+def test_cache_saves_in_the_background_not_on_put(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = MetadataCache(path=str(path), save_interval=0.05)
+    for i in range(500):
+        cache.put(f"isbn:{i}", ("Kitap", "Yazar"))
+    assert not path.exists()
+
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    cache.put("isbn:son", None)
+    cache.close()
+
+    assert "\n" not in path.read_text(encoding="utf-8")
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 501
+    assert cache._saver is None
+
+
+def test_client_caches_isbns_authors_and_404s(open_library_stub):
+    open_library_stub.books["9780000000001"] = {"title": "Children of Dune", "authors": ["/authors/OL1A"]}
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, cache=MetadataCache())
+
+    assert client.fetch_book("9780441172719") == ("Dune", "Frank Herbert, Brian Herbert")
+    assert client.fetch_book("978-0441172719") == ("Dune", "Frank Herbert, Brian Herbert")
+    assert client.fetch_book("9789999999999") is None
+    assert client.fetch_book("9789999999999") is None
+    assert client.fetch_book("9780000000001") == ("Children of Dune", "Frank Herbert")
+    client.close()
+
+    assert open_library_stub.requests == [
+        "/isbn/9780441172719.json", "/authors/OL1A.json", "/authors/OL2A.json",
+        "/isbn/9789999999999.json",
+        "/isbn/9780000000001.json",
+    ]
+
+
+def test_batch_lookups_skip_cached_isbns(open_library_stub):
+    cache = MetadataCache()
+    cache.put("isbn:9780441172719", ("Dune", "Frank Herbert"))
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, cache=cache)
+
+    assert client.fetch_books(["9780441172719"]) == {"9780441172719": ("Dune", "Frank Herbert")}
+    assert open_library_stub.requests == []
+    client.close()
+
+
+def test_cache_stats_endpoint(tmp_path):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+    client = TestClient(app)
+    assert client.get("/cache/stats").json() == {"enabled": False}
+
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"),
+                                       open_library=OpenLibraryClient(cache=MetadataCache()))
+    assert client.get("/cache/stats").json() == {
+        "enabled": True, "size": 0, "hits": 0, "negative_hits": 0, "misses": 0,
+    }
@@ -0,0 +1,86 @@
+from fastapi.testclient import TestClient
+
+from api import app
+from models.book_model import Book
+from services.library_service import LibraryService
+from services.metrics import NO_METRICS, Histogram, Metrics
+from services.open_library import OpenLibraryClient
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("op_seconds", "Op latency.", ("kind",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5, "a")
+
+    assert histogram.render() == [
+        "# HELP op_seconds Op latency.",
+        "# TYPE op_seconds histogram",
+        'op_seconds_bucket{kind="a",le="0.1"} 1',
+        'op_seconds_bucket{kind="a",le="1.0"} 2',
+        'op_seconds_bucket{kind="a",le="+Inf"} 3',
+        'op_seconds_sum{kind="a"} 5.55',
+        'op_seconds_count{kind="a"} 3',
+    ]
+
+
+def test_disabled_metrics_record_nothing(tmp_path):
+    service = LibraryService(str(tmp_path / "lib.json"))
+    service.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    service.save_books()
+    service.remove_book("9780441172719")
+
+    assert service.metrics is NO_METRICS
+    assert "_count" not in NO_METRICS.render()
+    assert NO_METRICS.catalog_books.value() is None
+
+
+def test_storage_and_upstream_metrics(tmp_path, open_library_stub):
+    metrics = Metrics()
+    service = LibraryService(str(tmp_path / "lib.json"), journal=True, metrics=metrics,
+                             open_library=OpenLibraryClient(base_url=open_library_stub.base_url,
+                                                            metrics=metrics))
+
+    assert service.add_book_by_isbn("9780441172719") is True
+    assert service.add_book_by_isbn("9780000000000") is False
+    service.save_books()
+
+    assert metrics.upstream_requests.count("isbn", "200") == 1
+    assert metrics.upstream_requests.count("isbn", "404") == 1
+    assert metrics.upstream_requests.count("author", "200") == 2
+    assert metrics.storage_operations.count("load", "JournalStorage") == 1
+    assert metrics.storage_operations.count("record_add", "JournalStorage") == 1
+    assert metrics.storage_operations.count("save", "JournalStorage") == 1
+    assert metrics.storage_size.value("JournalStorage") == (tmp_path / "lib.json").stat().st_size
+    assert metrics.catalog_books.value() == 1
+
+
+def test_metrics_endpoint_reports_routes(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.state, "metrics", Metrics())
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"), metrics=app.state.metrics)
+    app.state.library.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    client = TestClient(app)
+
+    client.get("/books")
+    client.delete("/books/9780441172719")
+    client.delete("/books/9780441172719")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'library_http_request_duration_seconds_count{method="GET",route="/books",status="200"} 1' in body
+    assert 'library_http_request_duration_seconds_count{method="DELETE",route="/books/{isbn}",status="204"} 1' in body
+    assert 'library_http_request_duration_seconds_count{method="DELETE",route="/books/{isbn}",status="404"} 1' in body
+    assert 'library_storage_operation_duration_seconds_count{operation="record_remove",backend="JsonFileStorage"} 1' in body
+    assert "library_catalog_books 0" in body
+
+
+def test_metrics_endpoint_is_hidden_when_disabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.state, "metrics", Metrics(enabled=False))
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Metrikler kapalı"}
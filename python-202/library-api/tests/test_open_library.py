@@ -0,0 +1,258 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+from config import Settings
+from services.library_service import AddResult, LibraryService
+from services.open_library import OpenLibraryClient
+from services.resilience import RetryPolicy, UpstreamUnavailable
+
+
+def test_fetch_book_resolves_authors(open_library_stub):
+    client = OpenLibraryClient(base_url=open_library_stub.base_url)
+
+    assert client.fetch_book("9780441172719") == ("Dune", "Frank Herbert, Brian Herbert")
+    assert client.fetch_book("9780000000000") is None
+    client.close()
+
+
+def test_sync_client_reuses_one_connection(open_library_stub):
+    client = OpenLibraryClient(base_url=open_library_stub.base_url)
+    for _ in range(3):
+        client.fetch_book("9780441172719")
+    client.close()
+
+    assert len(open_library_stub.requests) == 9
+    assert open_library_stub.connections == 1
+
+
+def test_async_fetch_resolves_authors_concurrently(open_library_stub):
+    open_library_stub.latency = 0.3
+    client = OpenLibraryClient(base_url=open_library_stub.base_url)
+
+    async def fetch():
+        try:
+            return await client.fetch_book_async("9780441172719")
+        finally:
+            await client.aclose()
+
+    start = time.perf_counter()
+    result = asyncio.run(fetch())
+    elapsed = time.perf_counter() - start
+
+    assert result == ("Dune", "Frank Herbert, Brian Herbert")
+    # Kitap + yazarlar paralel: seri akıştaki 3 tur (0.9s) yerine ~2 tur
+    assert elapsed < 0.8
+
+
+def test_service_add_book_by_isbn_async(tmp_path, open_library_stub):
+    service = LibraryService(str(tmp_path / "lib.json"),
+                             open_library=OpenLibraryClient(base_url=open_library_stub.base_url))
+
+    assert asyncio.run(service.add_book_by_isbn_async("9780441172719")) is True
+    assert asyncio.run(service.add_book_by_isbn_async("9780441172719")) is False
+    assert service.find_book("9780441172719").author == "Frank Herbert, Brian Herbert"
+
+
+def test_async_add_writes_storage_off_the_event_loop(tmp_path, open_library_stub):
+    service = LibraryService(str(tmp_path / "lib.json"),
+                             open_library=OpenLibraryClient(base_url=open_library_stub.base_url))
+    threads = []
+    record_add = service.storage.record_add
+    service.storage.record_add = lambda *args: (threads.append(threading.get_ident()), record_add(*args))
+
+    async def add():
+        result = await service.add_book_result_async("9780441172719")
+        return result, threading.get_ident()
+
+    result, loop_thread = asyncio.run(add())
+    assert result is AddResult.CREATED
+    assert threads and threads[0] != loop_thread
+
+
+def test_async_client_of_another_loop_is_closed(open_library_stub):
+    client = OpenLibraryClient(base_url=open_library_stub.base_url)
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(client.fetch_book_async("9780441172719"), other).result(5)
+        first = client._async_client
+
+        async def fetch_and_close():
+            assert await client.fetch_book_async("9780441172719") is not None
+            second = client._async_client
+            await client.aclose()
+            return second
+
+        second = asyncio.run(fetch_and_close())
+        deadline = time.monotonic() + 5
+        while not first.is_closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert first.is_closed and second.is_closed
+        assert client._async_client is None
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(5)
+        other.close()
+        client.close()
+
+
+def test_api_post_books_with_async_fetch(tmp_path, open_library_stub):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"),
+                                       open_library=OpenLibraryClient(base_url=open_library_stub.base_url))
+    app.state.settings = Settings(async_fetch=True)
+    try:
+        client = TestClient(app)
+        resp = client.post("/books", json={"isbn": "9780441172719"})
+        assert resp.status_code == 201
+        assert resp.json()["author"] == "Frank Herbert, Brian Herbert"
+        assert client.post("/books", json={"isbn": "9780000000000"}).status_code == 404
+    finally:
+        app.state.settings = Settings()
+
+
+# ---- Çoklu bibkey (/api/books) ----
+from tests.stub_server import OpenLibraryStub
+
+
+def _many_books_stub(count: int, **kwargs) -> OpenLibraryStub:
+    return OpenLibraryStub(
+        books={f"978{i:010d}": {"title": f"Kitap {i}", "authors": ["/authors/OL1A"]} for i in range(count)},
+        authors={"/authors/OL1A": "Yazar"},
+        **kwargs,
+    )
+
+
+def test_fetch_books_groups_isbns_into_bibkey_batches():
+    with _many_books_stub(5) as stub:
+        client = OpenLibraryClient(base_url=stub.base_url, batch_size=2)
+        isbns = [f"978{i:010d}" for i in range(5)]
+        results = client.fetch_books(isbns)
+        client.close()
+
+    assert results == {isbn: (f"Kitap {i}", "Yazar") for i, isbn in enumerate(isbns)}
+    assert len(stub.requests) == 3
+    assert all(path.startswith("/api/books?") for path in stub.requests)
+
+
+def test_fetch_books_falls_back_per_isbn_only_for_misses():
+    with _many_books_stub(3, batch_exclude={"9780000000001"}) as stub:
+        client = OpenLibraryClient(base_url=stub.base_url)
+        results = client.fetch_books(["978-0000000000", "9780000000001", "9789999999999"])
+        client.close()
+
+    assert results == {
+        "978-0000000000": ("Kitap 0", "Yazar"),
+        "9780000000001": ("Kitap 1", "Yazar"),
+        "9789999999999": None,
+    }
+    assert [path.split("?")[0] for path in stub.requests] == [
+        "/api/books", "/isbn/9780000000001.json", "/authors/OL1A.json", "/isbn/9789999999999.json",
+    ]
+
+
+def test_fetch_books_async_matches_sync():
+    with _many_books_stub(4, batch_exclude={"9780000000003"}) as stub:
+        client = OpenLibraryClient(base_url=stub.base_url, batch_size=3)
+        isbns = [f"978{i:010d}" for i in range(4)]
+
+        async def fetch():
+            try:
+                return await client.fetch_books_async(isbns)
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(fetch()) == client.fetch_books(isbns)
+        client.close()
+
+
+def test_add_books_by_isbn_batches_and_writes_once(tmp_path):
+    from unittest.mock import patch
+
+    with _many_books_stub(3) as stub:
+        service = LibraryService(str(tmp_path / "lib.json"),
+                                 open_library=OpenLibraryClient(base_url=stub.base_url))
+        service.add_books_by_isbn(["9780000000000"])
+        stub.requests.clear()
+
+        with patch.object(service.storage, "save", wraps=service.storage.save) as save:
+            results = service.add_books_by_isbn(
+                ["9780000000000", "9780000000001", "978-0000000001", "9780000000002", "123"]
+            )
+
+    assert results == {
+        "9780000000000": AddResult.DUPLICATE, "9780000000001": AddResult.CREATED,
+        "978-0000000001": AddResult.DUPLICATE, "9780000000002": AddResult.CREATED,
+        "123": AddResult.INVALID,
+    }
+    assert len(stub.requests) == 1
+    assert save.call_count == 1
+    assert len(LibraryService(str(tmp_path / "lib.json")).books) == 3
+
+
+def test_fetch_books_async_limits_concurrency():
+    with _many_books_stub(6, batch_exclude={f"978{i:010d}" for i in range(6)}, latency=0.05) as stub:
+        client = OpenLibraryClient(base_url=stub.base_url, batch_size=1)
+        active = 0
+        peak = 0
+        original = client._fetch_book_remote_async
+
+        async def tracked(isbn):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                return await original(isbn)
+            finally:
+                active -= 1
+
+        client._fetch_book_remote_async = tracked
+
+        async def fetch():
+            try:
+                return await client.fetch_books_async([f"978{i:010d}" for i in range(6)], concurrency=2)
+            finally:
+                await client.aclose()
+
+        results = asyncio.run(fetch())
+
+    assert all(results.values())
+    assert peak == 2
+
+
+def test_api_post_books_batch(tmp_path):
+    with _many_books_stub(3) as stub:
+        app.state.library = LibraryService(str(tmp_path / "api_lib.json"),
+                                           open_library=OpenLibraryClient(base_url=stub.base_url))
+        app.state.library.add_books_by_isbn(["9780000000000"])
+        client = TestClient(app)
+
+        resp = client.post("/books/batch", json={"isbns": [
+            "9780000000000", "9780000000001", " 9780000000001", "9789999999999", "abc",
+        ]})
+
+    assert resp.status_code == 200
+    assert [(r["isbn"], r["status"]) for r in resp.json()["results"]] == [
+        ("9780000000000", "duplicate"),
+        ("9780000000001", "created"),
+        ("9780000000001", "duplicate"),
+        ("9789999999999", "not_found"),
+        ("abc", "invalid"),
+    ]
+    assert resp.json()["results"][1]["book"] == {"title": "Kitap 1", "author": "Yazar", "isbn": "9780000000001"}
+    assert len(LibraryService(str(tmp_path / "api_lib.json")).books) == 2
+
+
+def test_stub_error_rate_surfaces_as_upstream_unavailable(open_library_stub):
+    open_library_stub.error_rate = 1.0
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, retry=RetryPolicy(base_delay=0.001))
+
+    with pytest.raises(UpstreamUnavailable):
+        client.fetch_book("9780441172719")
+    assert open_library_stub.errors == len(open_library_stub.requests) == 3
+    client.close()
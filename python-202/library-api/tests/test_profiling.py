@@ -0,0 +1,140 @@
+import threading
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+from config import Settings
+from models.book_model import Book
+from services.library_service import LibraryService
+from services.open_library import OpenLibraryClient
+from services.profiling import Profiler, span, tracing
+
+ADMIN = {"X-Admin-Token": "gizli"}
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    profiler = Profiler(admin_token="gizli", slow_threshold=0)
+    monkeypatch.setattr(app.state, "profiler", profiler)
+    return profiler
+
+
+def test_spans_are_a_shared_noop_without_a_trace():
+    assert span("save") is span("upstream_fetch")
+
+    profiler = Profiler(slow_threshold=0)
+    trace = profiler.start_trace("GET", "/books")
+    with tracing(trace), span("save"):
+        pass
+    profiler.finish(trace)
+
+    assert [s.name for s in trace.spans] == ["save"]
+    assert profiler.slow_traces() == [trace]
+    assert span("save") is span("upstream_fetch")
+
+
+def test_disabled_profiling_records_nothing(tmp_path):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+    client = TestClient(app)
+
+    response = client.get("/books", headers={"X-Profile": "cpu", **ADMIN})
+
+    assert app.state.profiler.enabled is False
+    assert "x-profile-id" not in response.headers
+    assert client.get("/admin/traces", headers=ADMIN).status_code == 404
+
+
+def test_admin_endpoints_require_the_token(tmp_path, profiler):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+    client = TestClient(app)
+
+    assert client.get("/admin/traces").status_code == 403
+    assert client.get("/admin/traces", headers={"X-Admin-Token": "yanlis"}).status_code == 403
+    assert "x-profile-id" not in client.get("/books", headers={"X-Profile": "cpu"}).headers
+    assert client.get("/admin/traces", headers=ADMIN).status_code == 200
+
+    profiler.admin_token = None
+    assert client.get("/admin/traces", headers=ADMIN).status_code == 403
+
+
+def test_slow_post_trace_has_library_phases(tmp_path, profiler, open_library_stub):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"),
+                                       open_library=OpenLibraryClient(base_url=open_library_stub.base_url))
+    client = TestClient(app)
+
+    assert client.post("/books", json={"isbn": "9780441172719"}).status_code == 201
+
+    traces = client.get("/admin/traces", headers=ADMIN).json()["traces"]
+    post = next(t for t in traces if t["method"] == "POST")
+    assert post["path"] == "/books" and post["status"] == 201
+    names = [s["name"] for s in post["spans"]]
+    assert {"duplicate_check", "upstream_fetch", "author_resolution", "save"} <= set(names)
+    fetch = next(s for s in post["spans"] if s["name"] == "upstream_fetch")
+    assert 0 <= fetch["start"] <= post["duration"]
+
+
+def test_profiled_request_returns_cprofile_stats(tmp_path, profiler):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+    app.state.library.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    client = TestClient(app)
+
+    response = client.get("/books", headers={"X-Profile": "cpu", **ADMIN})
+    profile_id = response.headers["x-profile-id"]
+    stats = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN, params={"sort": "tottime"})
+
+    assert stats.status_code == 200
+    assert "function calls" in stats.text and "list_books" in stats.text
+    assert client.get("/admin/profiles/yok", headers=ADMIN).status_code == 404
+
+
+def test_async_profile_leaves_out_other_requests_on_the_loop(tmp_path, profiler, open_library_stub, monkeypatch):
+    open_library_stub.faults = [(None, 0.5)]
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"),
+                                       open_library=OpenLibraryClient(base_url=open_library_stub.base_url))
+    monkeypatch.setattr(app.state, "settings", Settings(async_fetch=True))
+    result = {}
+    with TestClient(app) as client:
+        post = threading.Thread(target=lambda: result.update(response=client.post(
+            "/books", json={"isbn": "9780441172719"}, headers={"X-Profile": "cpu", **ADMIN})))
+        post.start()
+        time.sleep(0.1)
+        # Profillenen istek Open Library'yi beklerken döngüde başka istekler çalışır
+        while post.is_alive():
+            client.get("/changes", params={"since": 0})
+        post.join()
+        stats = client.get(f"/admin/profiles/{result['response'].headers['x-profile-id']}", headers=ADMIN,
+                           params={"limit": 500})
+
+    assert result["response"].status_code == 201
+    assert stats.status_code == 200 and "function calls" in stats.text
+    assert "get_changes" not in stats.text
+
+
+def test_cpu_window_profiles_requests_in_the_window(tmp_path, profiler):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+    client = TestClient(app)
+    result = {}
+    window = threading.Thread(target=lambda: result.update(
+        response=client.post("/admin/profile/cpu", params={"seconds": 0.5}, headers=ADMIN)))
+    window.start()
+    time.sleep(0.1)
+
+    client.get("/books")
+    assert client.post("/admin/profile/cpu", params={"seconds": 0.1}, headers=ADMIN).status_code == 409
+    window.join()
+
+    assert result["response"].status_code == 200
+    assert result["response"].text.startswith("Profillenen istek: ")
+    assert "get_books" in result["response"].text
+
+
+def test_memory_window_stops_tracemalloc(tmp_path, profiler):
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"))
+
+    response = TestClient(app).post("/admin/profile/memory", params={"seconds": 0.05}, headers=ADMIN)
+
+    assert response.status_code == 200
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,200 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+from services.library_service import AddResult, LibraryService
+from services.open_library import OpenLibraryClient
+from services.resilience import CircuitBreaker, Deadline, RetryPolicy, UpstreamUnavailable
+
+FAST_RETRY = RetryPolicy(base_delay=0.001)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_retries_transient_errors(open_library_stub):
+    open_library_stub.faults = [(503, 0.0), (429, 0.0)]
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, retry=FAST_RETRY)
+
+    assert client.fetch_book("9780441172719") == ("Dune", "Frank Herbert, Brian Herbert")
+    # 2 hatalı deneme + kitap + 2 yazar
+    assert len(open_library_stub.requests) == 5
+    client.close()
+
+
+def test_async_retries_transient_errors(open_library_stub):
+    open_library_stub.faults = [(502, 0.0)]
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, retry=FAST_RETRY)
+
+    async def fetch():
+        try:
+            return await client.fetch_book_async("9780441172719")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(fetch()) == ("Dune", "Frank Herbert, Brian Herbert")
+    assert len(open_library_stub.requests) == 4
+
+
+def test_not_found_is_not_retried(open_library_stub):
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, retry=FAST_RETRY)
+
+    assert client.fetch_book("9780000000000") is None
+    assert len(open_library_stub.requests) == 1
+    client.close()
+
+
+def test_deadline_bounds_a_slow_lookup(tmp_path, open_library_stub):
+    open_library_stub.faults = [(None, 1.0)]
+    service = LibraryService(str(tmp_path / "lib.json"),
+                             open_library=OpenLibraryClient(base_url=open_library_stub.base_url,
+                                                            deadline=0.2, retry=FAST_RETRY))
+
+    start = time.perf_counter()
+    assert service.add_book_result("9780441172719") is AddResult.UPSTREAM_ERROR
+    assert time.perf_counter() - start < 0.8
+    assert len(service.books) == 0
+
+
+def test_breaker_fails_fast_once_open(open_library_stub):
+    open_library_stub.error_rate = 1.0
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, retry=RetryPolicy(attempts=1),
+                               breaker=CircuitBreaker(failure_threshold=2))
+
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailable):
+            client.fetch_book("9780441172719")
+    with pytest.raises(UpstreamUnavailable, match="devre kesici"):
+        client.fetch_book("9780441172719")
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert len(open_library_stub.requests) == 2
+    client.close()
+
+
+def test_breaker_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    with pytest.raises(UpstreamUnavailable):
+        breaker.check()
+
+    clock.now = 30
+    breaker.check()
+    with pytest.raises(UpstreamUnavailable):
+        breaker.check()  # deneme sürerken ikinci çağrı reddedilir
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 60
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.check()
+
+
+def test_probe_ending_without_an_outcome_releases_the_breaker(open_library_stub):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, retry=FAST_RETRY, breaker=breaker)
+    breaker.record_failure()
+    clock.now = 30
+    send = client._send
+
+    def cancelled(*args, **kwargs):
+        client._send = send
+        raise asyncio.CancelledError()
+
+    client._send = cancelled
+    with pytest.raises(asyncio.CancelledError):
+        client.fetch_book("9780441172719")
+
+    assert breaker.check() is True  # yeni bir deneme geçebilir
+    breaker.release_probe()
+    assert client.fetch_book("9780441172719") == ("Dune", "Frank Herbert, Brian Herbert")
+    assert breaker.state == CircuitBreaker.CLOSED
+    client.close()
+
+
+def test_non_retryable_5xx_is_an_upstream_error_not_a_miss(open_library_stub):
+    open_library_stub.faults = [(501, 0.0)]
+    breaker = CircuitBreaker(failure_threshold=1)
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, retry=FAST_RETRY, breaker=breaker)
+
+    with pytest.raises(UpstreamUnavailable):
+        client.fetch_book("9780441172719")
+    assert len(open_library_stub.requests) == 1
+    assert breaker.state == CircuitBreaker.OPEN
+    client.close()
+
+
+def test_deadline_shortens_request_timeouts():
+    clock = FakeClock()
+    deadline = Deadline(1.0, clock=clock)
+
+    assert deadline.timeout(10) == 1.0
+    clock.now = 0.75
+    assert deadline.timeout(10) == 0.25
+    clock.now = 1.0
+    with pytest.raises(UpstreamUnavailable):
+        deadline.timeout(10)
+    assert Deadline(None).timeout(10) == 10
+
+
+def test_hedged_request_cuts_tail_latency(open_library_stub):
+    open_library_stub.faults = [(None, 1.0)]
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, hedge_after=0.05)
+
+    start = time.perf_counter()
+    assert client.fetch_book("9780441172719") == ("Dune", "Frank Herbert, Brian Herbert")
+    assert time.perf_counter() - start < 0.8
+    assert client.hedges == 1
+    client.close()
+
+
+def test_async_hedged_request_cuts_tail_latency(open_library_stub):
+    open_library_stub.faults = [(None, 1.0)]
+    client = OpenLibraryClient(base_url=open_library_stub.base_url, hedge_after=0.05)
+
+    async def fetch():
+        try:
+            return await client.fetch_book_async("9780441172719")
+        finally:
+            await client.aclose()
+
+    start = time.perf_counter()
+    assert asyncio.run(fetch()) == ("Dune", "Frank Herbert, Brian Herbert")
+    assert time.perf_counter() - start < 0.8
+    assert client.hedges == 1
+
+
+def test_batch_reports_upstream_errors(tmp_path, open_library_stub):
+    open_library_stub.error_rate = 1.0
+    service = LibraryService(str(tmp_path / "lib.json"),
+                             open_library=OpenLibraryClient(base_url=open_library_stub.base_url,
+                                                            retry=FAST_RETRY))
+
+    assert service.add_books_by_isbn(["9780441172719", "bad"]) == {
+        "9780441172719": AddResult.UPSTREAM_ERROR,
+        "bad": AddResult.INVALID,
+    }
+
+
+def test_api_post_books_returns_503_when_upstream_is_down(tmp_path, open_library_stub):
+    open_library_stub.error_rate = 1.0
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"),
+                                       open_library=OpenLibraryClient(base_url=open_library_stub.base_url,
+                                                                      retry=FAST_RETRY))
+
+    resp = TestClient(app).post("/books", json={"isbn": "9780441172719"})
+
+    assert resp.status_code == 503
+    assert "Open Library" in resp.json()["detail"]
@@ -0,0 +1,148 @@
+import time
+
+from models.book_catalog import BookCatalog
+from models.book_model import Book
+from services.catalog_indexes import TitleIndex
+from services.library_service import LibraryService
+from services.search_index import SearchIndex, tokenize
+
+
+def _catalog():
+    catalog = BookCatalog([
+        Book("Dune", "Frank Herbert", "9780441172719"),
+        Book("Dune Messiah", "Frank Herbert", "9780593098233"),
+        Book("Dune: House Atreides", "Brian Herbert", "9780553580273"),
+        Book("Foundation", "Isaac Asimov", "9780553293357"),
+    ])
+    index = SearchIndex()
+    catalog.add_index(index)
+    return catalog, index
+
+
+def _titles(books):
+    return [book.title for book in books]
+
+
+def test_tokenize_casefolds_and_splits_on_punctuation():
+    assert tokenize("Dune: House-Atreides") == ["dune", "house", "atreides"]
+    assert tokenize("İstanbul Çarşı") == tokenize("istanbul carsı") == ["istanbul", "carsı"]
+
+
+def test_search_matches_prefixes_of_title_and_author_words():
+    catalog, index = _catalog()
+
+    assert _titles(index.search("asim", catalog.get)) == ["Foundation"]
+    assert _titles(index.search("dune brian", catalog.get)) == ["Dune: House Atreides"]
+    assert _titles(index.search("HERB mess", catalog.get)) == ["Dune Messiah"]
+    assert index.search("dune asimov", catalog.get) == []
+    assert index.search("  ", catalog.get) == []
+
+
+def test_search_ranks_whole_word_matches_first_then_by_title():
+    catalog, index = _catalog()
+    catalog.append(Book("Dunes of Arrakis", "Anonim", "9781111111111"))
+
+    assert _titles(index.search("dune", catalog.get)) == [
+        "Dune", "Dune Messiah", "Dune: House Atreides", "Dunes of Arrakis",
+    ]
+    assert _titles(index.search("dune", catalog.get, limit=2)) == ["Dune", "Dune Messiah"]
+
+
+def test_index_follows_catalog_changes():
+    catalog, index = _catalog()
+    index.search("dune", catalog.get)  # sözlüğü sıralı hale getirir
+
+    catalog.pop("9780553293357")
+    assert index.search("asimov", catalog.get) == []
+    assert "asimov" not in index._postings
+
+    catalog.append(Book("Foundation and Empire", "Isaac Asimov", "9780553293371"))
+    catalog.append(Book("Dune (Yeni Baskı)", "Frank Herbert", "9780441172719"))
+    assert _titles(index.search("empire", catalog.get)) == ["Foundation and Empire"]
+    assert _titles(index.search("baskı", catalog.get)) == ["Dune (Yeni Baskı)"]
+
+    catalog.clear()
+    assert index.search("dune", catalog.get) == []
+
+
+def test_service_search_survives_reload(tmp_path):
+    service = LibraryService(str(tmp_path / "library.json"))
+    service.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    service.save_books()
+    service.load_books()
+
+    assert _titles(service.search_books("frank")) == ["Dune"]
+    service.remove_book("9780441172719")
+    assert service.search_books("frank") == []
+
+
+def test_service_builds_indexes_ahead_and_again_after_reload(tmp_path):
+    service = LibraryService(str(tmp_path / "library.json"))
+    service.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    service.build_indexes()
+
+    assert set(service._indexed) == {"search_index", "title_index", "author_index"}
+    assert set(service.search_index._short) == {"d", "du", "f", "fr", "h", "he"}
+
+    service.save_books()
+    service.load_books()
+    deadline = time.monotonic() + 5
+    while service._indexed["search_index"][0] is not service.books and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service._indexed["search_index"][0] is service.books
+    assert _titles(service.search_books("he")) == ["Dune"]
+
+
+def test_title_order_walk_matches_full_ranking():
+    books = [Book(f"Kitap {i % 97} {'cilt' if i % 3 else 'ciltler'}", f"Yazar {i % 13}", f"978{i:010d}")
+             for i in range(3000)]
+    catalog = BookCatalog(books)
+    index, titles = SearchIndex(), TitleIndex()
+    catalog.add_index(index)
+    catalog.add_index(titles)
+
+    for query in ("kitap", "cilt", "kitap 4 yazar", "cil yaz 1", "ki 9", "c", "1", "k c", "y 1", "9 1"):
+        for limit in (1, 5, 20, 5000):
+            assert index.search(query, catalog.get, limit=limit, titles=titles) == \
+                index.search(query, catalog.get, limit=limit)
+
+
+def test_index_is_built_from_a_copy_and_catches_up_on_attach():
+    catalog, _ = _catalog()
+    entries = catalog.entries()
+    index = SearchIndex()
+    for key, book in entries.items():
+        index.add(key, book)
+
+    catalog.pop("9780553293357")
+    catalog.append(Book("Dune", "Frank Herbert (yeni baskı)", "9780441172719"))
+    catalog.append(Book("Children of Dune", "Frank Herbert", "9780593098240"))
+    catalog.attach_index(index, entries)
+
+    assert index.search("asimov", catalog.get) == []
+    assert _titles(index.search("baskı", catalog.get)) == ["Dune"]
+    assert _titles(index.search("children", catalog.get)) == ["Children of Dune"]
+    assert len(index.search("herbert", catalog.get)) == 4
+
+
+def test_short_prefix_rankings_follow_catalog_changes():
+    books = [Book(f"{'A' if i % 4 else 'Ab'} Kitap {i}", f"Yazar {i % 7}", f"978{i:010d}") for i in range(400)]
+    catalog = BookCatalog(books)
+    index, titles = SearchIndex(), TitleIndex()
+    catalog.add_index(index)
+    catalog.add_index(titles)
+    for prefix in index.all_short_prefixes():
+        index.prepare(prefix, catalog.get, titles)
+
+    for i in range(0, 400, 3):
+        catalog.pop(f"978{i:010d}")
+    catalog.append(Book("Aa", "Yeni", "9781111111111"))
+    catalog.append(Book("Ab Kitap 5", "Yazar 1 (yeni baskı)", "9780000000005"))
+    fresh = SearchIndex()
+    catalog.add_index(fresh)
+
+    for query in ("a", "ab", "k", "y", "1", "ye"):
+        for limit in (1, 20, 100, 500):
+            assert index.search(query, catalog.get, limit=limit, titles=titles) == \
+                fresh.search(query, catalog.get, limit=limit)
+    assert index._short["a"].count == len(catalog)
@@ -0,0 +1,211 @@
+import asyncio
+import multiprocessing
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+from services.library_service import AddResult, LibraryService
+from services.storage import SharedJournalStorage, create_storage, shard_of
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="flock gerektirir")
+
+
+class FakeOpenLibrary:
+    def fetch_book(self, isbn):
+        return f"Kitap {isbn}", "Yazar"
+
+    def close(self):
+        pass
+
+
+def _service(path, **kwargs):
+    return LibraryService(storage=SharedJournalStorage(str(path), **kwargs), open_library=FakeOpenLibrary())
+
+
+def test_other_process_changes_are_applied_incrementally(tmp_path):
+    path = tmp_path / "library.json"
+    first, second = _service(path), _service(path)
+    catalog = second.books
+
+    assert first.add_book_result("9780441172719") is AddResult.CREATED
+    assert second.find_book("9780441172719").title == "Kitap 9780441172719"
+    assert second.books is catalog  # tüm dosya yeniden okunmadı
+
+    assert second.remove_book("9780441172719") is True
+    assert first.list_books() == []
+
+
+def test_other_process_changes_enter_the_change_log(tmp_path):
+    path = tmp_path / "library.json"
+    first, second = _service(path), _service(path)
+    app.state.library = second
+    client = TestClient(app)
+    epoch, seq = second.changes.position()
+
+    first.add_book_result("9780441172719")
+    first.remove_book("9780441172719")
+    first.add_book_result("9780199535675")
+    body = client.get("/changes", params={"since": seq, "epoch": epoch}).json()
+
+    assert body["epoch"] == epoch
+    assert [(change["op"], change["isbn"]) for change in body["changes"]] == [
+        ("add", "9780441172719"), ("remove", "9780441172719"), ("add", "9780199535675")]
+    assert body["changes"][2]["book"]["title"] == "Kitap 9780199535675"
+
+
+def test_async_add_catches_up_in_a_worker_thread(tmp_path):
+    path = tmp_path / "library.json"
+    first, second = _service(path), _service(path)
+    first.add_book_result("9780441172719")
+    threads = []
+    sync = second.sync
+    second.sync = lambda: (threads.append(threading.get_ident()), sync())
+
+    async def add():
+        result = await second.add_book_result_async("9780441172719")
+        return result, threading.get_ident()
+
+    result, loop_thread = asyncio.run(add())
+    assert result is AddResult.DUPLICATE
+    assert threads and loop_thread not in threads
+
+
+def test_refresh_stops_at_a_torn_journal_tail(tmp_path):
+    path = tmp_path / "library.json"
+    first, second = _service(path), _service(path)
+    first.add_book_result("9780441172719")
+    first.storage.close()
+    journal = tmp_path / "library.json.journal"
+    complete = journal.read_bytes()
+    # Kaydın ortasında çöken bir yazan
+    journal.write_bytes(complete + b'{"op": "add", "book": {"title": "Yar')
+
+    assert [b.isbn for b in second.list_books()] == ["9780441172719"]
+    assert journal.read_bytes() == complete
+    assert not second.storage.has_changes()
+
+    journal.write_bytes(complete + b"bozuk\n")
+    assert second.find_book("9780441172719") is not None
+    assert second.add_book_result("9780199535675") is AddResult.CREATED
+    assert [b.isbn for b in _service(path).list_books()] == ["9780441172719", "9780199535675"]
+
+
+def test_writer_catches_up_before_writing_so_no_update_is_lost(tmp_path):
+    path = tmp_path / "library.json"
+    first, second = _service(path), _service(path)
+
+    first.add_book_result("9780441172719")
+    # second henüz okumadı; yazarken önce first'in kaydını uygular
+    assert second.add_book_result("9780441172719") is AddResult.DUPLICATE
+    second.add_book_result("9780199535675")
+    second.save_books()
+
+    reloaded = LibraryService(str(path))
+    assert sorted(b.isbn for b in reloaded.list_books()) == ["9780199535675", "9780441172719"]
+
+
+def test_compaction_by_another_process_triggers_a_full_reload(tmp_path):
+    path = tmp_path / "library.json"
+    first, second = _service(path, compact_every=2), _service(path)
+    catalog = second.books
+
+    for isbn in ("9780441172719", "9780199535675", "9780553293357"):
+        first.add_book_result(isbn)
+
+    assert second.count_books() == 3
+    assert second.books is not catalog
+
+
+def _add_range(path, start, count):
+    # Sık sıkıştırma, süreçlerin birbirinin snapshot'ını değiştirdiği durumu da dener
+    service = _service(path, compact_every=10)
+    for i in range(start, start + count):
+        service.add_book_result(f"978{i:010d}")
+    service.close()
+
+
+def test_worker_processes_share_one_catalog(tmp_path):
+    path = str(tmp_path / "library.json")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_add_range, args=(path, n * 25, 25)) for n in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    storage = create_storage("shared", path)
+    books = storage.load()
+    storage.close()
+    assert len(books) == 100
+
+
+def test_sharded_shared_journals_sync_between_services(tmp_path):
+    path = str(tmp_path / "library.json")
+    first, second = (LibraryService(storage=create_storage("sharded", path, shards=3, backend="shared"),
+                                    open_library=FakeOpenLibrary()) for _ in range(2))
+    catalog = second.books
+
+    assert first.add_book_result("9780441172719") is AddResult.CREATED
+    assert first.add_book_result("9780199535675") is AddResult.CREATED
+    assert second.find_book("9780199535675").title == "Kitap 9780199535675"
+    assert second.books is catalog
+
+    assert second.remove_book("9780441172719") is True
+    assert [book.isbn for book in first.list_books()] == ["9780199535675"]
+
+
+def _sharded_service(path):
+    return LibraryService(storage=create_storage("sharded", path, shards=4, backend="shared"),
+                          open_library=FakeOpenLibrary())
+
+
+def _isbns_in_other_shards(count):
+    isbns, shards = [], set()
+    for i in range(1000):
+        isbn = f"978{i:010d}"
+        if shard_of(isbn, 4) not in shards:
+            shards.add(shard_of(isbn, 4))
+            isbns.append(isbn)
+        if len(isbns) == count:
+            return isbns
+
+
+def test_sharded_point_writes_lock_only_their_shard(tmp_path):
+    path = str(tmp_path / "library.json")
+    first, second = _sharded_service(path), _sharded_service(path)
+    held, other = _isbns_in_other_shards(2)
+    added = threading.Event()
+
+    with first.storage.locked_for([held]):
+        # Başka bir süreç ve aynı süreçteki başka bir iş parçacığı diğer shard'a yazabilir
+        assert second.add_book_result(other) is AddResult.CREATED
+        thread = threading.Thread(target=lambda: (first.remove_book(other), added.set()))
+        thread.start()
+        assert added.wait(5)
+        thread.join()
+    assert first.add_book_result(held) is AddResult.CREATED
+    assert [book.isbn for book in second.list_books()] == [held]
+
+
+def test_sharded_shard_compacted_elsewhere_is_reloaded_alone(tmp_path):
+    path = str(tmp_path / "library.json")
+    first, second = _sharded_service(path), _sharded_service(path)
+    isbns = _isbns_in_other_shards(3)
+    first.add_book_result(isbns[0])
+    second.sync()
+    catalog = second.books
+    epoch, seq = second.changes.position()
+
+    first.add_book_result(isbns[1])
+    first.remove_book(isbns[0])
+    first.save_books()  # her shard'ın snapshot'ı yeniden yazılır
+    assert second.add_book_result(isbns[2]) is AddResult.CREATED
+
+    assert second.books is catalog
+    assert sorted(book.isbn for book in second.list_books()) == sorted(isbns[1:])
+    ops = [(change.op, change.isbn) for change in second.changes.since(seq, epoch=epoch).changes]
+    assert ("add", isbns[1]) in ops and ("remove", isbns[0]) in ops and ("add", isbns[2]) in ops
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+from services.library_service import AddResult, LibraryService
+from services.open_library import OpenLibraryClient
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_result_between_concurrent_callers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "sonuç"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, "k", slow)
+        started.wait(5)
+        followers = [pool.submit(flight.do, "k", slow) for _ in range(3)]
+        time.sleep(0.1)
+        release.set()
+        assert leader.result() == "sonuç"
+        assert [f.result() for f in followers] == ["sonuç"] * 3
+
+    assert len(calls) == 1
+    assert flight.do("k", lambda: "yeni") == "yeni"
+
+
+def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("hata")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_async_single_flight_coalesces_coroutines():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "sonuç"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", slow) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["sonuç"] * 5
+    assert len(calls) == 1
+
+
+def test_concurrent_adds_for_same_isbn_fetch_once(tmp_path, open_library_stub):
+    open_library_stub.latency = 0.2
+    service = LibraryService(str(tmp_path / "lib.json"),
+                             open_library=OpenLibraryClient(base_url=open_library_stub.base_url))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(service.add_book_result, ["9780441172719", "978-0441172719"] * 4))
+
+    assert results.count(AddResult.CREATED) == 1
+    assert results.count(AddResult.DUPLICATE) == 7
+    assert open_library_stub.requests.count("/isbn/9780441172719.json") == 1
+    assert len(service.books) == 1
+    assert len(LibraryService(str(tmp_path / "lib.json")).books) == 1
+
+
+def test_concurrent_posts_return_one_created_rest_conflict(tmp_path, open_library_stub):
+    open_library_stub.latency = 0.1
+    app.state.library = LibraryService(str(tmp_path / "api_lib.json"),
+                                       open_library=OpenLibraryClient(base_url=open_library_stub.base_url))
+    client = TestClient(app)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        statuses = list(pool.map(
+            lambda _: client.post("/books", json={"isbn": "9780441172719"}).status_code, range(6)
+        ))
+
+    assert sorted(statuses) == [201] + [409] * 5
+    assert open_library_stub.requests.count("/isbn/9780441172719.json") == 1
@@ -0,0 +1,286 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from config import Settings
+from models.book_model import Book
+from services import storage as storage_module
+from services.library_service import LibraryService
+from services.storage import (
+    BinarySnapshotStorage,
+    JournalStorage,
+    JsonFileStorage,
+    ShardedStorage,
+    SqliteStorage,
+    create_storage,
+    decode_snapshot,
+    encode_snapshot,
+    shard_of,
+)
+
+
+def _add(service: LibraryService, book: Book) -> None:
+    service.books.append(book)
+    service.storage.record_add(book, service.books)
+
+
+@pytest.mark.parametrize("kind, filename", [
+    ("json", "lib.json"),
+    ("journal", "lib.json"),
+    ("sqlite", "lib.db"),
+    ("binary", "lib.bin"),
+    ("binary-journal", "lib.bin"),
+    ("sharded", "lib.json"),
+])
+def test_service_round_trip_on_every_backend(tmp_path, kind, filename):
+    path = str(tmp_path / filename)
+    service = LibraryService(storage=create_storage(kind, path))
+    _add(service, Book("Dune", "Frank Herbert", "9780441172719"))
+    _add(service, Book("Ulysses", "James Joyce", "978-0199535675"))
+    assert service.remove_book("9780441172719") is True
+    assert service.remove_book("9780441172719") is False
+    service.close()
+
+    reloaded = LibraryService(storage=create_storage(kind, path))
+    assert [b.title for b in reloaded.books] == ["Ulysses"]
+    assert reloaded.find_book("9780199535675").author == "James Joyce"
+    reloaded.close()
+
+
+def test_settings_from_env_selects_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("LIBRARY_STORAGE", "sqlite")
+    monkeypatch.delenv("LIBRARY_PATH", raising=False)
+    assert Settings.from_env() == Settings(storage="sqlite", library_path="library.db")
+
+    monkeypatch.setenv("LIBRARY_PATH", str(tmp_path / "x.db"))
+    service = LibraryService.from_settings(Settings.from_env())
+    assert isinstance(service.storage, SqliteStorage)
+    service.close()
+
+
+def test_create_storage_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        create_storage("csv", "library.csv")
+
+
+# ---- SQLite ----
+
+def test_sqlite_writes_single_rows(tmp_path):
+    db = tmp_path / "lib.db"
+    storage = SqliteStorage(str(db))
+    service = LibraryService(storage=storage)
+    _add(service, Book("Dune", "Frank Herbert", "978-0441172719"))
+
+    assert storage.get("9780441172719").title == "Dune"
+    storage.close()
+
+    rows = sqlite3.connect(str(db)).execute("SELECT isbn_key, isbn FROM books").fetchall()
+    assert rows == [("9780441172719", "978-0441172719")]
+
+
+def test_sqlite_iter_books_reads_in_chunks(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "lib.db"))
+    books = [Book(f"Kitap {i}", "Yazar", f"978{i:010d}") for i in range(5)]
+    storage.save(books)
+
+    iterator = storage.iter_books(chunk_size=2)
+    assert next(iterator).isbn == books[0].isbn
+    storage.record_remove(books[3].isbn, [])  # henüz okunmamış parçadaki satır
+    assert [book.isbn for book in iterator] == [books[i].isbn for i in (1, 2, 4)]
+    storage.close()
+
+
+# ---- Journal ----
+
+def test_journal_appends_instead_of_rewriting_snapshot(tmp_path):
+    db = tmp_path / "lib.json"
+    service = LibraryService(str(db), journal=True)
+
+    _add(service, Book("Dune", "Frank Herbert", "9780441172719"))
+    _add(service, Book("Ulysses", "James Joyce", "978-0199535675"))
+    service.remove_book("9780441172719")
+
+    assert not db.exists()
+    lines = (tmp_path / "lib.json.journal").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["op"] for line in lines] == ["add", "add", "remove"]
+
+    reloaded = LibraryService(str(db), journal=True)
+    assert [b.title for b in reloaded.books] == ["Ulysses"]
+
+
+def test_journal_compacts_into_snapshot(tmp_path):
+    db = tmp_path / "lib.json"
+    service = LibraryService(str(db), journal=True)
+    service.storage.compact_every = 2
+
+    _add(service, Book("Dune", "Frank Herbert", "9780441172719"))
+    _add(service, Book("Ulysses", "James Joyce", "978-0199535675"))
+
+    assert len(json.loads(db.read_text(encoding="utf-8"))) == 2
+    assert (tmp_path / "lib.json.journal").read_bytes() == b""
+    assert len(LibraryService(str(db), journal=True).books) == 2
+
+
+def test_journal_ignores_and_truncates_torn_last_record(tmp_path):
+    db = tmp_path / "lib.json"
+    journal_path = tmp_path / "lib.json.journal"
+    good = json.dumps({"op": "add", "book": {"title": "Dune", "author": "", "isbn": "9780441172719"}})
+    journal_path.write_text(good + "\n" + '{"op": "add", "bo', encoding="utf-8")
+
+    storage = JournalStorage(str(db))
+    catalog = storage.load()
+
+    assert len(catalog) == 1
+    assert journal_path.read_text(encoding="utf-8") == good + "\n"
+
+    storage.record_remove("9780441172719", catalog)
+    storage.close()
+    assert len(JournalStorage(str(db)).load()) == 0
+
+
+def test_json_save_writes_snapshot_atomically(tmp_path):
+    db = tmp_path / "lib.json"
+    service = LibraryService(storage=JsonFileStorage(str(db)))
+    service.books.append(Book("Dune", "Frank Herbert", "9780441172719"))
+    service.save_books()
+
+    assert json.loads(db.read_text(encoding="utf-8"))[0]["title"] == "Dune"
+    assert [p.name for p in tmp_path.iterdir()] == ["lib.json"]
+
+
+def test_binary_snapshot_round_trips_unicode_and_shared_authors():
+    books = [
+        Book("Çalıkuşu", "Reşat Nuri Güntekin", "9789750719387"),
+        Book("Yaprak Dökümü", "Reşat Nuri Güntekin", "978-975-07-1939-4"),
+        Book("", "", "0306406152"),
+    ]
+    loaded = decode_snapshot(encode_snapshot(books))
+    assert [b.to_dict() for b in loaded] == [b.to_dict() for b in books]
+    assert loaded[0].author is loaded[1].author
+
+    with pytest.raises(ValueError):
+        decode_snapshot(b"[]")
+
+
+def test_binary_storage_converts_existing_json_catalog(tmp_path):
+    json_path = tmp_path / "library.json"
+    journal = JournalStorage(str(json_path))
+    journal.save([Book("Dune", "Frank Herbert", "9780441172719")])
+    journal.record_add(Book("Ulysses", "James Joyce", "9780199535675"), [])
+    journal.close()
+    before = json_path.read_bytes()
+
+    storage = BinarySnapshotStorage(str(tmp_path / "library.bin"))
+    assert [b.title for b in storage.load()] == ["Dune", "Ulysses"]
+    assert (tmp_path / "library.bin").exists()
+    assert json_path.read_bytes() == before
+
+    # İkinci açılışta JSON değil ikili dosya okunur
+    json_path.unlink()
+    assert [b.title for b in BinarySnapshotStorage(str(tmp_path / "library.bin")).load()] == ["Dune", "Ulysses"]
+
+
+# ---- Sharded ----
+
+def _books(count):
+    return [Book(f"Kitap {i}", "Yazar", f"978{i:010d}") for i in range(count)]
+
+
+def _shard_isbns(storage):
+    return [sorted(book.isbn for book in shard.load()) for shard in storage.shards]
+
+
+def test_sharded_point_writes_touch_one_shard(tmp_path):
+    storage = ShardedStorage(str(tmp_path / "lib.json"), shards=4)
+    service = LibraryService(storage=storage)
+    book = Book("Dune", "Frank Herbert", "9780441172719")
+    _add(service, book)
+
+    index = shard_of(book.isbn, 4)
+    journals = [os.path.getsize(shard.journal_path) > 0 for shard in storage.shards]
+    assert journals == [i == index for i in range(4)]
+    assert service.remove_book("9780441172719") is True
+    assert [shard.entries for shard in storage.shards] == [2 if i == index else 0 for i in range(4)]
+
+
+def test_sharded_bulk_write_and_compaction_stay_per_shard(tmp_path):
+    storage = ShardedStorage(str(tmp_path / "lib.json"), shards=3, backend="json")
+    service = LibraryService(storage=storage)
+    service.import_books(_books(30))
+
+    assert sorted(isbn for shard in _shard_isbns(storage) for isbn in shard) == sorted(b.isbn for b in _books(30))
+    for index, isbns in enumerate(_shard_isbns(storage)):
+        assert all(shard_of(isbn, 3) == index for isbn in isbns)
+
+
+def test_sharded_compaction_reads_only_its_shard(tmp_path, monkeypatch):
+    storage = ShardedStorage(str(tmp_path / "lib.json"), shards=4, backend="json")
+    service = LibraryService(storage=storage)
+    service.import_books(_books(40))
+    calls = []
+    key_shard = storage_module._key_shard
+    monkeypatch.setattr(storage_module, "_key_shard", lambda key, shards: calls.append(key) or key_shard(key, shards))
+
+    book = Book("Dune", "Frank Herbert", "9780441172719")
+    _add(service, book)  # json parçası her eklemede yeniden yazılır
+
+    assert calls == ["9780441172719"]
+    expected = [sorted(b.isbn for b in service.books if shard_of(b.isbn, 4) == i) for i in range(4)]
+    assert _shard_isbns(storage) == expected
+
+    # Başka bir sürecin değiştirdiği parça bilinmez; bir kez süzülür
+    index = shard_of(book.isbn, 4)
+    storage._members[index] = None
+    assert service.remove_book(book.isbn) is True
+    expected[index].remove(book.isbn)
+    assert _shard_isbns(storage) == expected
+
+
+def test_sharded_rebalances_when_shard_count_changes(tmp_path):
+    path = str(tmp_path / "lib.json")
+    service = LibraryService(storage=ShardedStorage(path, shards=2))
+    service.import_books(_books(20))
+    old_files = [shard.path for shard in service.storage.shards]
+    service.close()
+
+    storage = ShardedStorage(path, shards=5, backend="sqlite")
+    reloaded = LibraryService(storage=storage)
+
+    assert reloaded.count_books() == 20
+    assert len(storage.shards) == 5
+    assert all(shard_of(isbn, 5) == i for i, isbns in enumerate(_shard_isbns(storage)) for isbn in isbns)
+    assert not any(os.path.exists(name) for name in old_files)
+    assert json.loads((tmp_path / "lib.json.shards.json").read_text())["backend"] == "sqlite"
+
+    storage.rebalance(1)
+    assert len(_shard_isbns(storage)[0]) == 20
+    reloaded.close()
+
+
+def test_sharded_splits_existing_single_file_catalog(tmp_path):
+    path = tmp_path / "lib.json"
+    JsonFileStorage(str(path)).save(_books(5))
+    directories = [str(tmp_path / "disk1"), str(tmp_path / "disk2")]
+    for directory in directories:
+        os.mkdir(directory)
+
+    service = LibraryService(storage=ShardedStorage(str(path), shards=2, directories=directories))
+
+    assert service.count_books() == 5
+    assert [os.path.dirname(shard.path) for shard in service.storage.shards] == directories
+    assert len(json.loads(path.read_text())) == 5  # eski dosyaya dokunulmaz
+
+
+def test_settings_configure_sharded_storage(monkeypatch, tmp_path):
+    monkeypatch.setenv("LIBRARY_STORAGE", "sharded")
+    monkeypatch.setenv("LIBRARY_PATH", str(tmp_path / "lib.json"))
+    monkeypatch.setenv("LIBRARY_SHARDS", "3")
+    monkeypatch.setenv("LIBRARY_SHARD_BACKEND", "binary-journal")
+
+    service = LibraryService.from_settings(Settings.from_env())
+    assert isinstance(service.storage, ShardedStorage)
+    assert [os.path.basename(shard.path) for shard in service.storage.shards] == [
+        f"lib.binary-journal.{i:02d}-of-03.bin" for i in range(3)]
+    service.close()